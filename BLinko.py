@@ -1,16 +1,21 @@
-import hashlib
-import os
-import time
-import math
+import sys
 import pygame
 
+from plinko_engine import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, BALL_RADIUS, PEG_RADIUS,
+    Ball, BallPool, KickStream, PlinkoEngine, generate_pegs, define_payout_bins, generate_seed, hash_seed, round_hash,
+)
+from plinko_seeds import SeedPool
+from plinko_trajectory import Trajectory, TrajectoryRecorder
+
+try:
+    from plinko_batch import PlinkoBatch, BatchBallPool
+except ImportError:  # Multi-ball falls back to stepping balls one by one without NumPy
+    BatchBallPool = None
+
 # --- Pygame and Color Configuration ---
 pygame.init()
 
-# Screen dimensions (pixels)
-SCREEN_WIDTH = 800
-SCREEN_HEIGHT = 600
-
 # Colors
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -24,109 +29,17 @@ BALL_COLOR = (255, 200, 0)
 FONT_MAIN = pygame.font.SysFont('Arial', 24)
 FONT_RESULT = pygame.font.SysFont('Arial', 48, bold=True)
 
-# --- Game Physics Configuration ---
-BALL_RADIUS = 8
-PEG_RADIUS = 5
-INITIAL_THROW_SPEED = 2.0
-GRAVITY_X = 0.05  # Reduced horizontal gravity
-GRAVITY_Y = 0.0  # No vertical gravity
-BOUNCE_ENERGY_RETENTION = 0.6  # Much less bouncy
-MAX_SPEED = 6.0  # Slower max speed
-
-# --- Game Components ---
-
-class Ball:
-    """A simple class to hold the state of the ball."""
-    def __init__(self, start_x, start_y):
-        self.x = float(start_x)
-        self.y = float(start_y)
-        self.vx = INITIAL_THROW_SPEED  # Initial horizontal velocity
-        self.vy = 0.0  # Start with no vertical velocity
-
-def generate_pegs(rows=15):
-    """Creates pegs uniformly filling the 30-60-90 triangle space."""
-    pegs = []
-    
-    # Establish clear triangle boundaries - lower positioning
-    point_a_x = 80   # Bottom-left (30-degree angle, start point)
-    point_a_y = SCREEN_HEIGHT - 30  # Lower - establish proper base level
-    
-    point_b_x = SCREEN_WIDTH - 150  # Top-right (90-degree angle)
-    point_b_y = 60   # Higher up
-    
-    # Point C forms the proper 30-60-90 triangle base
-    triangle_height = point_a_y - point_b_y
-    triangle_base = triangle_height / math.tan(math.radians(30))  # 30-60-90 triangle geometry
-    point_c_x = point_a_x + triangle_base  # Bottom-right (60-degree angle)
-    point_c_y = point_a_y  # Same height as A
-    
-    # Simple uniform row generation - no complex logic
-    peg_spacing_x = 35
-    peg_spacing_y = 30
-    
-    # Start from top and work down to establish proper base
-    current_y = point_b_y + 25
-    row = 0
-    
-    while current_y <= point_a_y - 25:  # Go all the way to base level
-        # Calculate triangle width at this Y level
-        progress = (current_y - point_b_y) / (point_a_y - point_b_y)
-        left_x = point_a_x
-        right_x = point_b_x + progress * (point_c_x - point_b_x)
-        
-        # Alternate row staggering
-        offset_x = (peg_spacing_x / 2) if row % 2 == 1 else 0
-        
-        # Place pegs across the row
-        current_x = left_x + peg_spacing_x + offset_x
-        while current_x < right_x - 15:
-            if is_point_in_triangle(current_x, current_y, point_a_x, point_a_y, point_b_x, point_b_y, point_c_x, point_c_y):
-                pegs.append((current_x, current_y))
-            current_x += peg_spacing_x
-        
-        current_y += peg_spacing_y
-        row += 1
-    
-    return pegs
-
-def is_point_in_triangle(px, py, ax, ay, bx, by, cx, cy):
-    """Check if point P is inside triangle ABC using barycentric coordinates."""
-    denom = (by - cy) * (ax - cx) + (cx - bx) * (ay - cy)
-    if abs(denom) < 1e-10:  # Avoid division by zero
-        return False
-    
-    a = ((by - cy) * (px - cx) + (cx - bx) * (py - cy)) / denom
-    b = ((cy - ay) * (px - cx) + (ax - cx) * (py - cy)) / denom
-    c = 1 - a - b
-    
-    return a >= 0 and b >= 0 and c >= 0
-
-def define_payout_bins():
-    """Defines bins for 30-60-90 triangle - higher Y (toward point B) = better payout."""
-    point_b_y = 60   # Top-right (90-degree angle, best payout)
-    point_a_y = SCREEN_HEIGHT - 30  # Bottom-left (30-degree angle, start point)
-    
-    bins = [
-        # Near Point B (top) - 1000x (hardest to reach)
-        {'range': (point_b_y, point_b_y + 90), 'multiplier': 1000, 'label': '1000x', 'color': (255, 215, 0)},
-        
-        # Upper area - decreasing as we go down toward Point A
-        {'range': (point_b_y + 90, point_b_y + 180), 'multiplier': 130, 'label': '130x', 'color': (255, 140, 0)},
-        {'range': (point_b_y + 180, point_b_y + 270), 'multiplier': 26, 'label': '26x', 'color': (255, 100, 100)},
-        {'range': (point_b_y + 270, point_b_y + 360), 'multiplier': 10, 'label': '10x', 'color': (200, 200, 100)},
-        {'range': (point_b_y + 360, point_a_y - 30), 'multiplier': 2, 'label': '2x', 'color': (180, 180, 180)},
-        
-        # Near Point A (bottom) - lowest multiplier (most common)
-        {'range': (point_a_y - 30, SCREEN_HEIGHT), 'multiplier': 0.2, 'label': '0.2x', 'color': (100, 100, 100)}
-    ]
-    return bins
+# --- Frame Timing ---
+FPS = 60
+PHYSICS_TICK_RATE = 60  # Physics ticks per second, independent of the frame rate
+PHYSICS_STEP_MS = 1000.0 / PHYSICS_TICK_RATE
+MAX_SUBSTEPS_PER_FRAME = 8  # Catch-up ticks allowed after a slow frame
 
-# --- Provably Fair System ---
-def generate_seed():
-    return os.urandom(32).hex()
+# --- Multi-Ball Mode ---
+MAX_BALLS_IN_FLIGHT = 256
 
-def hash_seed(seed):
-    return hashlib.sha256(seed.encode('utf-8')).hexdigest()
+# --- Provably Fair Seeds ---
+SEED_POOL_SIZE = 512  # Server seeds generated ahead of time, with their commitments
 
 # --- Main Game Class ---
 
@@ -140,15 +53,41 @@ class Game:
         
         self.balance = 1000.0
         self.bet_amount = 10.0
-        self.pegs = generate_pegs()
-        self.bins = define_payout_bins()
+        self.engine = PlinkoEngine()
+        self.pegs = self.engine.pegs
+        self.bins = self.engine.bins
+        self.seed_pool = SeedPool(SEED_POOL_SIZE)
         
-        self.game_state = "AWAITING_BET" # States: AWAITING_BET, BALL_DROPPING, SHOWING_RESULT
+        self.game_state = "AWAITING_BET" # States: AWAITING_BET, BALL_DROPPING, SHOWING_RESULT, REPLAYING
         self.ball = None
+        self.server_seed = None
+        self.server_seed_hash = None
+        self.client_seed = None
+        self.nonce = 0  # Every round gets a fresh server seed, so its nonce is always 0
         self.game_hash = None
+        self.kicks = None
         self.hash_index = 0
+        self.round_ticks = 0
+        self.physics_accumulator = 0.0
         self.result_info = {}
         self.result_display_time = 0
+        
+        # Every single-ball round is recorded so it can be replayed or saved for disputes
+        self.recorder = None
+        self.last_trajectory = None
+        self.replay = None
+        self.replay_frames = None
+        
+        # Multi-ball mode: every drop carries its own seeds and bet and settles on its own
+        self.multi_ball = False
+        self.ball_pool = BatchBallPool(PlinkoBatch(self.engine)) if BatchBallPool else BallPool(self.engine)
+        
+        # Rendering caches: the static board is drawn once, text is re-rendered only
+        # when it changes, and each frame only repaints the areas that changed
+        self.background = None
+        self.text_cache = {}
+        self.dirty_rects = []
+        self.needs_full_redraw = True
 
     def handle_input(self):
         """Handles all user input via Pygame events."""
@@ -156,7 +95,16 @@ class Game:
             if event.type == pygame.QUIT:
                 return False # Signal to exit the game
             if event.type == pygame.KEYDOWN:
-                if self.game_state == "AWAITING_BET":
+                if self.multi_ball:
+                    if event.key == pygame.K_SPACE:
+                        self.drop_ball()
+                    elif event.key == pygame.K_UP:
+                        self.bet_amount = min(self.balance, self.bet_amount * 2)
+                    elif event.key == pygame.K_DOWN:
+                        self.bet_amount = max(1.0, self.bet_amount / 2)
+                    elif event.key == pygame.K_m and not len(self.ball_pool):
+                        self.multi_ball = False
+                elif self.game_state == "AWAITING_BET":
                     if event.key == pygame.K_SPACE:
                         if self.balance >= self.bet_amount:
                             self.balance -= self.bet_amount
@@ -165,153 +113,266 @@ class Game:
                         self.bet_amount = min(self.balance, self.bet_amount * 2)
                     elif event.key == pygame.K_DOWN:
                         self.bet_amount = max(1.0, self.bet_amount / 2)
+                    elif event.key == pygame.K_m:
+                        self.multi_ball = True
+                        # The multi-ball HUD only reports paid drops, not the last round or replay
+                        self.result_info = {}
+                    elif event.key == pygame.K_r and self.last_trajectory:
+                        self.start_replay(self.last_trajectory)
                 elif self.game_state == "SHOWING_RESULT":
                      if event.key == pygame.K_SPACE:
                         self.game_state = "AWAITING_BET"
+                     elif event.key == pygame.K_r and self.last_trajectory:
+                        self.start_replay(self.last_trajectory)
+                     elif event.key == pygame.K_s and self.last_trajectory:
+                        self.last_trajectory.save(f"round_{self.last_trajectory.game_hash[:16]}.plkt")
+                elif self.game_state == "REPLAYING":
+                    if event.key == pygame.K_SPACE:
+                        self._end_replay()
         return True
 
     def start_round(self):
         """Initializes a new round of the game."""
         self.game_state = "BALL_DROPPING"
-        server_seed = generate_seed()
-        client_seed = generate_seed()
-        self.game_hash = hash_seed(server_seed + client_seed)
+        # Commitment to show before the drop, precomputed by the seed pool
+        self.server_seed, self.server_seed_hash = self.seed_pool.take()
+        self.client_seed = generate_seed()
+        self.game_hash = round_hash(self.server_seed, self.client_seed, self.nonce)
+        self.kicks = KickStream(self.server_seed, self.client_seed, self.nonce)
         self.hash_index = 0
-        # Start ball from Point A (bottom-left, 30-degree angle) - updated position
-        point_a_x = 80
-        point_a_y = SCREEN_HEIGHT - 30
-        self.ball = Ball(start_x=point_a_x, start_y=point_a_y)
-        # In a real app, you'd show hashed_server_seed and store server_seed for later verification.
-
-    def update(self):
-        """Updates the game state each frame."""
-        if self.game_state == "BALL_DROPPING" and self.ball:
+        self.round_ticks = 0
+        self.physics_accumulator = 0.0
+        # Start ball from Point A (bottom-left, 30-degree angle)
+        self.ball = self.engine.new_ball()
+        self.recorder = TrajectoryRecorder(self.game_hash, self.ball.x, self.ball.y)
+        # The seeds are kept so the round can be replayed through the games API verify endpoint.
+
+    def drop_ball(self):
+        """Places a bet and launches another ball in multi-ball mode."""
+        if len(self.ball_pool) >= MAX_BALLS_IN_FLIGHT or self.balance < self.bet_amount:
+            return False
+        if not len(self.ball_pool):
+            self.physics_accumulator = 0.0
+
+        self.balance -= self.bet_amount
+        server_seed, server_seed_hash = self.seed_pool.take()
+        client_seed = generate_seed()
+        drop = {
+            'bet': self.bet_amount,
+            'server_seed': server_seed,
+            'server_seed_hash': server_seed_hash,
+            'client_seed': client_seed,
+            'nonce': self.nonce
+        }
+        kicks = KickStream(server_seed, client_seed, self.nonce)
+        self.ball_pool.add(round_hash(server_seed, client_seed, self.nonce), tag=drop, kicks=kicks)
+        return True
+
+    def update(self, elapsed_ms=PHYSICS_STEP_MS):
+        """Advances the physics by fixed ticks for the time elapsed since the last frame."""
+        if self.multi_ball:
+            if not len(self.ball_pool):
+                return
+        elif self.game_state not in ("BALL_DROPPING", "REPLAYING") or not self.ball:
+            return
+
+        self.physics_accumulator += elapsed_ms
+        substeps = 0
+        while self.physics_accumulator >= PHYSICS_STEP_MS and substeps < MAX_SUBSTEPS_PER_FRAME:
+            self.physics_accumulator -= PHYSICS_STEP_MS
+            substeps += 1
+            if self.multi_ball:
+                for drop, outcome in self.ball_pool.tick():
+                    self._settle_drop(drop, outcome)
+                if not len(self.ball_pool):
+                    return
+                continue
+
+            if self.game_state == "REPLAYING":
+                position = next(self.replay_frames, None)
+                if position is None:
+                    self._end_replay()
+                    return
+                self.ball.x, self.ball.y = position
+                continue
+
             self._update_simulation_tick()
+            self.round_ticks += 1
+
             # Ball must travel further right to reach the bins (past all pegs)
-            if self.ball.x >= SCREEN_WIDTH - 100:
+            if self.engine.is_finished(self.ball):
                 self._end_round()
+                return
+            if self.round_ticks >= self.engine.max_ticks:
+                self._end_round(capped=True)
+                return
+
+        # Drop time we could not catch up on rather than spiralling after a stall
+        if substeps == MAX_SUBSTEPS_PER_FRAME:
+            self.physics_accumulator = min(self.physics_accumulator, PHYSICS_STEP_MS)
 
     def _update_simulation_tick(self):
         """Runs a single frame of the physics simulation."""
-        # Apply gravity (horizontal acceleration to the right)
-        self.ball.vx += GRAVITY_X
-        
-        # Limit maximum speed
-        speed = math.sqrt(self.ball.vx**2 + self.ball.vy**2)
-        if speed > MAX_SPEED:
-            self.ball.vx = (self.ball.vx / speed) * MAX_SPEED
-            self.ball.vy = (self.ball.vy / speed) * MAX_SPEED
-        
-        # Update position
-        self.ball.x += self.ball.vx
-        self.ball.y += self.ball.vy
+        self.hash_index = self.engine.step(self.ball, self.kicks, self.hash_index)
+        if self.recorder:
+            self.recorder.add(self.ball.x, self.ball.y, self.hash_index)
 
-        # Bounce off top and bottom walls
-        if not (BALL_RADIUS < self.ball.y < SCREEN_HEIGHT - BALL_RADIUS):
-            self.ball.vy *= -0.4  # Much less bounce on walls
-            self.ball.y = max(BALL_RADIUS, min(self.ball.y, SCREEN_HEIGHT - BALL_RADIUS))
-
-        # Check collisions with pegs
-        for peg_x, peg_y in self.pegs:
-            dist_x, dist_y = self.ball.x - peg_x, self.ball.y - peg_y
-            distance = math.sqrt(dist_x**2 + dist_y**2)
-            
-            if distance < BALL_RADIUS + PEG_RADIUS:
-                # Use hash for provably fair randomness
-                hash_char = self.game_hash[self.hash_index % len(self.game_hash)]
-                random_kick = (int(hash_char, 16) - 7.5) / 15.0  # -0.5 to 0.5
-                
-                # Calculate collision normal
-                norm_x, norm_y = dist_x / distance, dist_y / distance
-                
-                # Reflect velocity off the peg
-                dot_product = self.ball.vx * norm_x + self.ball.vy * norm_y
-                reflect_vx = self.ball.vx - 2 * dot_product * norm_x
-                reflect_vy = self.ball.vy - 2 * dot_product * norm_y
-                
-                # Apply bounce with energy retention and random kick
-                self.ball.vx = reflect_vx * BOUNCE_ENERGY_RETENTION
-                self.ball.vy = (reflect_vy + random_kick * 1) * BOUNCE_ENERGY_RETENTION  # Reduced random kick
-                self.hash_index += 1
-                
-                # Push ball away from peg to prevent overlap
-                overlap = BALL_RADIUS + PEG_RADIUS - distance
-                self.ball.x += overlap * norm_x
-                self.ball.y += overlap * norm_y
-                break
-
-    def _end_round(self):
+    def _end_round(self, capped=False):
         """Calculates winnings and transitions to result state."""
         final_y = self.ball.y
         self.ball = None
+        if self.recorder:
+            self.last_trajectory = self.recorder.finish(final_y, capped)
+            self.recorder = None
         
-        for bin_info in self.bins:
-            if bin_info['range'][0] <= final_y < bin_info['range'][1]:
-                multiplier = bin_info['multiplier']
-                winnings = self.bet_amount * multiplier
-                self.balance += winnings
-                self.result_info = {
-                    'label': bin_info['label'],
-                    'winnings': winnings
-                }
-                break
+        bin_index = self.engine.settle_bin(final_y, capped)
+        if bin_index is not None:
+            bin_info = self.bins[bin_index]
+            winnings = self.bet_amount * bin_info['multiplier']
+            self.balance += winnings
+            self.result_info = {
+                'label': bin_info['label'],
+                'winnings': winnings
+            }
         
         self.game_state = "SHOWING_RESULT"
         self.result_display_time = pygame.time.get_ticks()
 
-    def draw(self):
-        """Draws everything to the screen."""
-        self.screen.fill(BLACK)
+    def start_replay(self, trajectory):
+        """Plays a recorded round back through the renderer without re-simulating it."""
+        self.game_state = "REPLAYING"
+        self.replay = trajectory
+        self.replay_frames = trajectory.positions()
+        self.ball = Ball(trajectory.start_x, trajectory.start_y)
+        self.physics_accumulator = 0.0
+
+    def _end_replay(self):
+        """Shows the recorded result once the replay runs out of frames."""
+        outcome = self.replay.outcome(self.engine)
+        self.ball = None
+        self.replay_frames = None
+        self.result_info = {
+            'label': outcome['label'] or '',
+            'winnings': None
+        }
+        self.game_state = "SHOWING_RESULT"
+        self.result_display_time = pygame.time.get_ticks()
+
+    def _settle_drop(self, drop, outcome):
+        """Pays out one multi-ball drop."""
+        winnings = drop['bet'] * outcome['multiplier']
+        self.balance += winnings
+        self.result_info = {
+            'label': outcome['label'],
+            'winnings': winnings
+        }
+
+    def _render_background(self):
+        """Pre-renders the static board (bins, labels and pegs) to a surface."""
+        background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        background.fill(BLACK)
 
         # Draw bins with labels
         for bin_info in self.bins:
             bin_rect = (SCREEN_WIDTH - 80, bin_info['range'][0], 80, bin_info['range'][1] - bin_info['range'][0])
-            pygame.draw.rect(self.screen, bin_info['color'], bin_rect)
+            pygame.draw.rect(background, bin_info['color'], bin_rect)
             
             # Draw bin label
             label_text = FONT_MAIN.render(bin_info['label'], True, BLACK)
             label_y = bin_info['range'][0] + (bin_info['range'][1] - bin_info['range'][0]) // 2 - label_text.get_height() // 2
-            self.screen.blit(label_text, (SCREEN_WIDTH - 75, label_y))
+            background.blit(label_text, (SCREEN_WIDTH - 75, label_y))
 
         # Draw pegs
         for peg_x, peg_y in self.pegs:
-            pygame.draw.circle(self.screen, PEG_COLOR, (int(peg_x), int(peg_y)), PEG_RADIUS)
+            pygame.draw.circle(background, PEG_COLOR, (int(peg_x), int(peg_y)), PEG_RADIUS)
+
+        return background
+
+    def _text(self, slot, font, text, color):
+        """Returns a rendered text surface, re-rendering only when the text changes."""
+        cached = self.text_cache.get(slot)
+        if cached is None or cached[0] != text:
+            cached = (text, font.render(text, True, color))
+            self.text_cache[slot] = cached
+        return cached[1]
+
+    def draw(self):
+        """Draws the frame, pushing only the regions that changed to the display."""
+        if self.background is None:
+            self.background = self._render_background()
+            self.needs_full_redraw = True
+
+        if self.needs_full_redraw:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            # Erase everything drawn over the board last frame
+            for rect in self.dirty_rects:
+                self.screen.blit(self.background, rect, rect)
+
+        drawn = []
 
         # Draw ball
         if self.ball:
-            pygame.draw.circle(self.screen, BALL_COLOR, (int(self.ball.x), int(self.ball.y)), BALL_RADIUS)
+            drawn.append(pygame.draw.circle(self.screen, BALL_COLOR, (int(self.ball.x), int(self.ball.y)), BALL_RADIUS))
+        if self.multi_ball:
+            for ball_x, ball_y in self.ball_pool.positions():
+                drawn.append(pygame.draw.circle(self.screen, BALL_COLOR, (int(ball_x), int(ball_y)), BALL_RADIUS))
 
         # Draw UI
-        balance_text = FONT_MAIN.render(f"Balance: ${self.balance:,.2f}", True, WHITE)
-        self.screen.blit(balance_text, (10, 10))
+        balance_text = self._text('balance', FONT_MAIN, f"Balance: ${self.balance:,.2f}", WHITE)
+        drawn.append(self.screen.blit(balance_text, (10, 10)))
         
-        bet_text = FONT_MAIN.render(f"Bet: ${self.bet_amount:,.2f}", True, WHITE)
-        self.screen.blit(bet_text, (10, 40))
+        bet_text = self._text('bet', FONT_MAIN, f"Bet: ${self.bet_amount:,.2f}", WHITE)
+        drawn.append(self.screen.blit(bet_text, (10, 40)))
 
-        if self.game_state == "AWAITING_BET":
-            prompt_text = FONT_MAIN.render("Press SPACE to Drop Ball | UP/DOWN to change bet", True, WHITE)
-            self.screen.blit(prompt_text, (SCREEN_WIDTH // 2 - prompt_text.get_width() // 2, SCREEN_HEIGHT - 40))
+        if self.multi_ball:
+            flight_text = self._text('flight', FONT_MAIN, f"Balls in flight: {len(self.ball_pool)}", WHITE)
+            drawn.append(self.screen.blit(flight_text, (10, 70)))
+            if self.result_info:
+                last_text = self._text('last', FONT_MAIN, f"Last: {self.result_info['label']} (${self.result_info['winnings']:,.2f})", WHITE)
+                drawn.append(self.screen.blit(last_text, (10, 100)))
+            prompt_text = self._text('prompt', FONT_MAIN, "SPACE to Drop | UP/DOWN bet | M single ball", WHITE)
+            drawn.append(self.screen.blit(prompt_text, (SCREEN_WIDTH // 2 - prompt_text.get_width() // 2, SCREEN_HEIGHT - 40)))
+        elif self.game_state == "AWAITING_BET":
+            prompt_text = self._text('prompt', FONT_MAIN, "Press SPACE to Drop Ball | UP/DOWN to change bet | M multi-ball", WHITE)
+            drawn.append(self.screen.blit(prompt_text, (SCREEN_WIDTH // 2 - prompt_text.get_width() // 2, SCREEN_HEIGHT - 40)))
+        elif self.game_state == "REPLAYING":
+            prompt_text = self._text('prompt', FONT_MAIN, f"Replaying {self.replay.game_hash[:16]}... | SPACE to skip", WHITE)
+            drawn.append(self.screen.blit(prompt_text, (SCREEN_WIDTH // 2 - prompt_text.get_width() // 2, SCREEN_HEIGHT - 40)))
         
         if self.game_state == "SHOWING_RESULT":
-            result_label = FONT_RESULT.render(self.result_info.get('label', ''), True, WHITE)
-            winnings_label = FONT_MAIN.render(f"You won ${self.result_info.get('winnings', 0):,.2f}!", True, BALL_COLOR)
+            result_label = self._text('result', FONT_RESULT, self.result_info.get('label', ''), WHITE)
+            if self.result_info.get('winnings') is None:
+                winnings_label = self._text('winnings', FONT_MAIN, "Replay finished | R to watch again", BALL_COLOR)
+            else:
+                winnings_label = self._text('winnings', FONT_MAIN, f"You won ${self.result_info.get('winnings', 0):,.2f}!", BALL_COLOR)
             
-            self.screen.blit(result_label, (SCREEN_WIDTH // 2 - result_label.get_width() // 2, SCREEN_HEIGHT // 2 - 40))
-            self.screen.blit(winnings_label, (SCREEN_WIDTH // 2 - winnings_label.get_width() // 2, SCREEN_HEIGHT // 2 + 20))
+            drawn.append(self.screen.blit(result_label, (SCREEN_WIDTH // 2 - result_label.get_width() // 2, SCREEN_HEIGHT // 2 - 40)))
+            drawn.append(self.screen.blit(winnings_label, (SCREEN_WIDTH // 2 - winnings_label.get_width() // 2, SCREEN_HEIGHT // 2 + 20)))
 
-        pygame.display.flip()
+        if self.needs_full_redraw:
+            pygame.display.flip()
+            self.needs_full_redraw = False
+        else:
+            pygame.display.update(self.dirty_rects + drawn)
+        self.dirty_rects = drawn
 
     def run(self):
         """The main game loop."""
         running = True
         while running:
+            elapsed_ms = self.clock.tick(FPS) # Limit frame rate; physics runs on its own fixed step
             running = self.handle_input()
-            self.update()
+            self.update(elapsed_ms)
             self.draw()
-            self.clock.tick(60) # Limit to 60 FPS
         
+        self.seed_pool.stop()
         pygame.quit()
 
 if __name__ == "__main__":
     game = Game()
+    # python BLinko.py --replay round.plkt plays back a saved recording
+    if len(sys.argv) == 3 and sys.argv[1] == '--replay':
+        game.last_trajectory = Trajectory.load(sys.argv[2])
+        game.start_replay(game.last_trajectory)
     game.run()
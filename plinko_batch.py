@@ -0,0 +1,306 @@
+"""
+NumPy batch simulation for the Plinko engine
+Drops many independent balls in lockstep with array operations, producing
+exactly the same floats as PlinkoEngine.step for the same game hashes.
+"""
+
+import numpy as np
+
+from plinko_engine import (
+    PlinkoEngine, START_X, START_Y, FINISH_X, SCREEN_HEIGHT,
+    BALL_RADIUS, PEG_RADIUS, INITIAL_THROW_SPEED, GRAVITY_X, MAX_SPEED, BOUNCE_ENERGY_RETENTION,
+)
+
+# Kick for every hex digit, computed with the same expression as the scalar path
+HEX_KICKS = (np.arange(16, dtype=np.float64) - 7.5) / 15.0
+
+# ASCII code -> hex digit value
+HEX_DIGITS = np.zeros(256, dtype=np.int64)
+HEX_DIGITS[np.frombuffer(b'0123456789', dtype=np.uint8)] = np.arange(10)
+HEX_DIGITS[np.frombuffer(b'abcdef', dtype=np.uint8)] = np.arange(10, 16)
+HEX_DIGITS[np.frombuffer(b'ABCDEF', dtype=np.uint8)] = np.arange(10, 16)
+
+# Digits decoded per KickStream row before the table has to grow
+STREAM_WIDTH = 64
+
+def kick_digits(sources, width):
+    """(N, width) digit table for KickStreams, or game hash strings cycled to fill the width."""
+    rows = np.empty((len(sources), width), dtype=np.int64)
+    for row, source in enumerate(sources):
+        if isinstance(source, str):
+            if width % len(source):
+                raise ValueError("Table width must be a multiple of the game hash length")
+            rows[row] = np.resize(HEX_DIGITS[np.frombuffer(source.encode('ascii'), dtype=np.uint8)], width)
+        else:
+            rows[row] = np.frombuffer(source.take(width), dtype=np.uint8)
+    return rows
+
+class PlinkoBatch:
+    """Simulates N rounds at once using the board of a PlinkoEngine."""
+
+    def __init__(self, engine=None):
+        self.engine = engine if engine is not None else PlinkoEngine()
+        grid = self.engine.peg_grid
+        self.cell_size = grid.cell_size
+
+        # Flatten the peg grid into a dense table of cells, each padded to the same
+        # number of candidate pegs. Cell row 0 is left empty for out-of-board lookups.
+        cells = list(grid.neighbourhoods)
+        self.cell_x0 = min(cell[0] for cell in cells)
+        self.cell_y0 = min(cell[1] for cell in cells)
+        width = int(max(cell[0] for cell in cells) - self.cell_x0) + 1
+        height = int(max(cell[1] for cell in cells) - self.cell_y0) + 1
+        depth = max(len(pegs) for pegs in grid.neighbourhoods.values())
+
+        self.cell_rows = np.zeros((width, height), dtype=np.int64)
+        self.peg_x = np.zeros((len(cells) + 1, depth), dtype=np.float64)
+        self.peg_y = np.zeros((len(cells) + 1, depth), dtype=np.float64)
+        self.peg_valid = np.zeros((len(cells) + 1, depth), dtype=bool)
+        for row, cell in enumerate(cells, start=1):
+            pegs = grid.neighbourhoods[cell]
+            self.cell_rows[int(cell[0] - self.cell_x0), int(cell[1] - self.cell_y0)] = row
+            self.peg_x[row, :len(pegs)] = [peg[0] for peg in pegs]
+            self.peg_y[row, :len(pegs)] = [peg[1] for peg in pegs]
+            self.peg_valid[row, :len(pegs)] = True
+
+        bins = self.engine.bins
+        self.bin_low = np.array([bin_info['range'][0] for bin_info in bins], dtype=np.float64)
+        self.bin_high = np.array([bin_info['range'][1] for bin_info in bins], dtype=np.float64)
+        self.bin_multipliers = np.array([bin_info['multiplier'] for bin_info in bins], dtype=np.float64)
+
+    def decode_hashes(self, game_hashes):
+        """Turn equal-length hex strings into an (N, length) array of digit values."""
+        length = len(game_hashes[0])
+        if any(len(game_hash) != length for game_hash in game_hashes):
+            raise ValueError("All game hashes in a batch must have the same length")
+        raw = np.frombuffer(''.join(game_hashes).encode('ascii'), dtype=np.uint8)
+        return HEX_DIGITS[raw].reshape(len(game_hashes), length)
+
+    def _cell_rows_for(self, x, y):
+        """Look up the candidate peg row for each ball position."""
+        cell_x = np.floor_divide(x, self.cell_size) - self.cell_x0
+        cell_y = np.floor_divide(y, self.cell_size) - self.cell_y0
+        width, height = self.cell_rows.shape
+        inside = (cell_x >= 0) & (cell_x < width) & (cell_y >= 0) & (cell_y < height)
+        rows = np.zeros(len(x), dtype=np.int64)
+        rows[inside] = self.cell_rows[cell_x[inside].astype(np.int64), cell_y[inside].astype(np.int64)]
+        return rows
+
+    def step(self, x, y, vx, vy, hash_index, digits):
+        """Advance every ball by one tick in place, mirroring PlinkoEngine.step."""
+        # Apply gravity (horizontal acceleration to the right)
+        vx += GRAVITY_X
+
+        # Limit maximum speed
+        speed = np.sqrt(vx * vx + vy * vy)
+        fast = speed > MAX_SPEED
+        vx[fast] = (vx[fast] / speed[fast]) * MAX_SPEED
+        vy[fast] = (vy[fast] / speed[fast]) * MAX_SPEED
+
+        # Update position
+        x += vx
+        y += vy
+
+        # Bounce off top and bottom walls
+        walls = ~((BALL_RADIUS < y) & (y < SCREEN_HEIGHT - BALL_RADIUS))
+        vy[walls] *= -0.4
+        y[walls] = np.maximum(BALL_RADIUS, np.minimum(y[walls], SCREEN_HEIGHT - BALL_RADIUS))
+
+        # Find the first peg in board order each ball overlaps
+        rows = self._cell_rows_for(x, y)
+        dist_x = x[:, None] - self.peg_x[rows]
+        dist_y = y[:, None] - self.peg_y[rows]
+        distance = np.sqrt(dist_x * dist_x + dist_y * dist_y)
+        touching = self.peg_valid[rows] & (distance < BALL_RADIUS + PEG_RADIUS)
+        hit = touching.any(axis=1)
+        if not hit.any():
+            return
+
+        balls = np.nonzero(hit)[0]
+        first = touching[balls].argmax(axis=1)
+        dist_x, dist_y, distance = dist_x[balls, first], dist_y[balls, first], distance[balls, first]
+
+        # Use hash for provably fair randomness
+        random_kick = HEX_KICKS[digits[balls, hash_index[balls] % digits.shape[1]]]
+
+        # Calculate collision normal
+        norm_x, norm_y = dist_x / distance, dist_y / distance
+
+        # Reflect velocity off the peg
+        dot_product = vx[balls] * norm_x + vy[balls] * norm_y
+        reflect_vx = vx[balls] - 2 * dot_product * norm_x
+        reflect_vy = vy[balls] - 2 * dot_product * norm_y
+
+        # Apply bounce with energy retention and random kick
+        vx[balls] = reflect_vx * BOUNCE_ENERGY_RETENTION
+        vy[balls] = (reflect_vy + random_kick * 1) * BOUNCE_ENERGY_RETENTION
+        hash_index[balls] += 1
+
+        # Push ball away from peg to prevent overlap
+        overlap = BALL_RADIUS + PEG_RADIUS - distance
+        x[balls] += overlap * norm_x
+        y[balls] += overlap * norm_y
+
+    def simulate(self, game_hashes, start_y=START_Y, kicks=None):
+        """Drop one ball per game hash and return per-ball result arrays.
+
+        kicks optionally gives each ball's KickStream (None keeps its game hash
+        cycle); the digit table is widened whenever a ball uses up its row.
+        """
+        count = len(game_hashes)
+        if kicks is None:
+            sources = None
+            digits = self.decode_hashes(game_hashes)
+        else:
+            sources = [game_hash if source is None else source for source, game_hash in zip(kicks, game_hashes)]
+            digits = kick_digits(sources, STREAM_WIDTH)
+
+        x = np.full(count, float(START_X))
+        y = np.broadcast_to(np.asarray(start_y, dtype=np.float64), (count,)).copy()
+        vx = np.full(count, INITIAL_THROW_SPEED)
+        vy = np.zeros(count)
+        hash_index = np.zeros(count, dtype=np.int64)
+        ticks = np.zeros(count, dtype=np.int64)
+
+        # Only balls still on the board are stepped; finished ones are written back
+        active = np.arange(count)
+        state = [x, y, vx, vy, hash_index]
+        while len(active):
+            ax, ay, avx, avy, aindex = (values[active] for values in state)
+            if sources is not None and aindex.max() >= digits.shape[1]:
+                digits = kick_digits(sources, digits.shape[1] * 2)
+            self.step(ax, ay, avx, avy, aindex, digits[active])
+            for values, updated in zip(state, (ax, ay, avx, avy, aindex)):
+                values[active] = updated
+            ticks[active] += 1
+            active = active[(ax < FINISH_X) & (ticks[active] < self.engine.max_ticks)]
+
+        # Balls still on the board ran out of tick budget and settle in the fallback bin
+        capped = x < FINISH_X
+        bin_index = np.where(capped, self.engine.fallback_bin, -1)
+        for index in range(len(self.bin_low)):
+            match = (bin_index == -1) & (self.bin_low[index] <= y) & (y < self.bin_high[index])
+            bin_index[match] = index
+        multipliers = np.where(bin_index >= 0, self.bin_multipliers[bin_index], 0.0)
+
+        return {
+            'final_y': y,
+            'bin_index': bin_index,
+            'multiplier': multipliers,
+            'ticks': ticks,
+            'collisions': hash_index,
+            'capped': capped
+        }
+
+    def outcomes(self, game_hashes, start_y=START_Y, kicks=None):
+        """Run a batch and return the same result dictionaries as PlinkoEngine.simulate."""
+        results = self.simulate(game_hashes, start_y, kicks)
+        return [
+            self.engine.outcome(game_hash, final_y, ticks, collisions, capped)
+            for game_hash, final_y, ticks, collisions, capped in zip(
+                game_hashes,
+                results['final_y'].tolist(),
+                results['ticks'].tolist(),
+                results['collisions'].tolist(),
+                results['capped'].tolist()
+            )
+        ]
+
+class BatchBallPool:
+    """BallPool with the balls held in arrays and advanced by PlinkoBatch.step."""
+
+    def __init__(self, batch=None, capacity=64):
+        if capacity <= 0:
+            raise ValueError("Pool capacity must be positive")
+        self.batch = batch if batch is not None else PlinkoBatch()
+        self.engine = self.batch.engine
+        self.count = 0
+        self.game_hashes = []
+        self.sources = []
+        self.tags = []
+        self._allocate(capacity, STREAM_WIDTH)
+
+    def __len__(self):
+        return self.count
+
+    def _allocate(self, capacity, width):
+        """(Re)allocate the state arrays, keeping the balls already in flight."""
+        count = self.count
+        old = getattr(self, 'x', None)
+        arrays = {
+            'x': np.zeros(capacity), 'y': np.zeros(capacity),
+            'vx': np.zeros(capacity), 'vy': np.zeros(capacity),
+            'hash_index': np.zeros(capacity, dtype=np.int64),
+            'ticks': np.zeros(capacity, dtype=np.int64),
+        }
+        digits = np.zeros((capacity, width), dtype=np.int64)
+        if old is not None:
+            for name, values in arrays.items():
+                values[:count] = getattr(self, name)[:count]
+            if width == self.digits.shape[1]:
+                digits[:count] = self.digits[:count]
+            elif count:
+                digits[:count] = kick_digits(self.sources, width)
+        for name, values in arrays.items():
+            setattr(self, name, values)
+        self.digits = digits
+
+    def add(self, game_hash, tag=None, start_y=START_Y, kicks=None):
+        """Launch a ball for game_hash; tag is handed back when it settles."""
+        source = game_hash if kicks is None else kicks
+        row = kick_digits([source], self.digits.shape[1])[0]
+        if self.count == len(self.x):
+            self._allocate(len(self.x) * 2, self.digits.shape[1])
+
+        index = self.count
+        self.x[index] = START_X
+        self.y[index] = start_y
+        self.vx[index] = INITIAL_THROW_SPEED
+        self.vy[index] = 0.0
+        self.hash_index[index] = 0
+        self.ticks[index] = 0
+        self.digits[index] = row
+        self.game_hashes.append(game_hash)
+        self.sources.append(source)
+        self.tags.append(tag)
+        self.count += 1
+
+    def positions(self):
+        """Current (x, y) of every ball in flight."""
+        return list(zip(self.x[:self.count].tolist(), self.y[:self.count].tolist()))
+
+    def tick(self):
+        """Advance every ball by one tick and return (tag, outcome) for those that settled."""
+        count = self.count
+        if not count:
+            return []
+
+        # Widen the digit table before any KickStream runs past its decoded digits
+        if self.hash_index[:count].max() >= self.digits.shape[1]:
+            self._allocate(len(self.x), self.digits.shape[1] * 2)
+
+        # Slices are views, so the batch step updates the pool in place
+        x, y, ticks, hash_index = self.x[:count], self.y[:count], self.ticks[:count], self.hash_index[:count]
+        self.batch.step(x, y, self.vx[:count], self.vy[:count], hash_index, self.digits[:count])
+        ticks += 1
+
+        done = (x >= FINISH_X) | (ticks >= self.engine.max_ticks)
+        if not done.any():
+            return []
+
+        settled = [
+            (self.tags[index], self.engine.outcome(self.game_hashes[index], float(y[index]), int(ticks[index]),
+                                                   int(hash_index[index]), capped=bool(x[index] < FINISH_X)))
+            for index in np.nonzero(done)[0].tolist()
+        ]
+
+        # Compact the survivors to the front of the arrays
+        keep = np.nonzero(~done)[0]
+        for values in (self.x, self.y, self.vx, self.vy, self.hash_index, self.ticks, self.digits):
+            values[:len(keep)] = values[keep]
+        keep = keep.tolist()
+        self.game_hashes = [self.game_hashes[index] for index in keep]
+        self.sources = [self.sources[index] for index in keep]
+        self.tags = [self.tags[index] for index in keep]
+        self.count = len(keep)
+        return settled
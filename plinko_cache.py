@@ -0,0 +1,139 @@
+"""
+Outcome cache for the Plinko engine
+A round's outcome is a pure function of its game hash and the board, so
+verification requests and replays of the same round are served from memory
+instead of re-running the physics loop.
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from plinko_engine import PlinkoEngine, KickStream, round_hash
+
+# Approximate bytes of an OrderedDict slot and its linked-list node
+ENTRY_OVERHEAD = 100
+
+class OutcomeCache:
+    """LRU cache of game hash -> outcome, bounded by entry count, bytes and age."""
+
+    def __init__(self, engine=None, max_entries=100_000, max_bytes=64 * 1024 * 1024, ttl=None, clock=time.monotonic):
+        if max_entries <= 0 or max_bytes <= 0:
+            raise ValueError("Cache bounds must be positive")
+        self.engine = engine if engine is not None else PlinkoEngine()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+
+        # game_hash, or ('hmac', game_hash) for stream rounds -> (final_y, bin_index, ticks, collisions, capped, digest, expires_at, size)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, game_hash):
+        with self._lock:
+            entry = self._entries.get(game_hash)
+            return entry is not None and not self._expired(entry)
+
+    def simulate(self, game_hash):
+        """Return the outcome for game_hash, running the engine only on a miss."""
+        return self._lookup(game_hash, game_hash, None)
+
+    def play_round(self, server_seed, client_seed, nonce=None):
+        """Cached equivalent of PlinkoEngine.play_round."""
+        game_hash = round_hash(server_seed, client_seed, nonce)
+        if nonce is None:
+            result = self.simulate(game_hash)
+        else:
+            # HMAC stream rounds are keyed apart from bare game hashes, whose
+            # legacy kicks differ even when the hash string matches
+            result = self._lookup(('hmac', game_hash), game_hash, KickStream(server_seed, client_seed, nonce))
+        result['server_seed'] = server_seed
+        result['client_seed'] = client_seed
+        result['nonce'] = nonce
+        return result
+
+    def _lookup(self, key, game_hash, kicks):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry):
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._build(game_hash, entry)
+            self.misses += 1
+
+        # Simulate outside the lock so concurrent misses don't serialise
+        result = self.engine.simulate(game_hash, digest=True, kicks=kicks)
+        self._store(key, result)
+        return result
+
+    def clear(self):
+        """Drop every entry, keeping the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes_used = 0
+
+    def stats(self):
+        """Counters for sizing the cache."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.bytes_used,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def _store(self, key, result):
+        expires_at = self.clock() + self.ttl if self.ttl is not None else None
+        values = (result['final_y'], result['bin_index'], result['ticks'], result['collisions'],
+                  result['capped'], result['trajectory_digest'], expires_at)
+        size = self._entry_size(key, values)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = values + (size,)
+            self.bytes_used += size
+            while len(self._entries) > self.max_entries or self.bytes_used > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self.bytes_used -= entry[-1]
+
+    def _expired(self, entry):
+        expires_at = entry[6]
+        return expires_at is not None and self.clock() >= expires_at
+
+    def _build(self, game_hash, entry):
+        final_y, _, ticks, collisions, capped, digest, _, _ = entry
+        result = self.engine.outcome(game_hash, final_y, ticks, collisions, capped)
+        result['trajectory_digest'] = digest
+        return result
+
+    @staticmethod
+    def _entry_size(key, values):
+        """Approximate bytes held by one entry, including its key and dict slot."""
+        key_size = sys.getsizeof(key) + (sum(sys.getsizeof(part) for part in key) if isinstance(key, tuple) else 0)
+        return (key_size + sys.getsizeof(values)
+                + sum(sys.getsizeof(value) for value in values) + ENTRY_OVERHEAD)
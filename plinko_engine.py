@@ -0,0 +1,495 @@
+"""
+Headless Plinko simulation engine for BLinko
+Runs provably fair rounds with zero pygame imports so they can be simulated
+server-side or in bulk.
+"""
+
+import hashlib
+import hmac
+import os
+import math
+import struct
+import threading
+from array import array
+from collections import OrderedDict
+
+# Board dimensions (pixels)
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+
+# --- Game Physics Configuration ---
+BALL_RADIUS = 8
+PEG_RADIUS = 5
+INITIAL_THROW_SPEED = 2.0
+GRAVITY_X = 0.05  # Reduced horizontal gravity
+GRAVITY_Y = 0.0  # No vertical gravity
+BOUNCE_ENERGY_RETENTION = 0.6  # Much less bouncy
+MAX_SPEED = 6.0  # Slower max speed
+
+# Peg layout spacing (pixels)
+PEG_SPACING_X = 35
+PEG_SPACING_Y = 30
+
+# Ball launch point (Point A, bottom-left) and the finish line in front of the bins
+START_X = 80
+START_Y = SCREEN_HEIGHT - 30
+FINISH_X = SCREEN_WIDTH - 100
+
+# Worst-case physics ticks per round; a ball still on the board after this many
+# ticks is settled into the lowest paying bin so every round has bounded cost
+MAX_ROUND_TICKS = 5000
+
+# --- Game Components ---
+
+class Ball:
+    """A simple class to hold the state of the ball."""
+    __slots__ = ('x', 'y', 'vx', 'vy')
+
+    def __init__(self, start_x, start_y):
+        self.x = float(start_x)
+        self.y = float(start_y)
+        self.vx = INITIAL_THROW_SPEED  # Initial horizontal velocity
+        self.vy = 0.0  # Start with no vertical velocity
+
+# Board triangle: A bottom-left (30 degrees, start point), B top-right (90 degrees),
+# C bottom-right (60 degrees) completing the 30-60-90 triangle
+POINT_A = (80, SCREEN_HEIGHT - 30)
+POINT_B = (SCREEN_WIDTH - 150, 60)
+POINT_C = (POINT_A[0] + (POINT_A[1] - POINT_B[1]) / math.tan(math.radians(30)), POINT_A[1])
+
+# Pegs keep this far from the top of the triangle, its base and the B-C edge
+PEG_MARGIN_Y = 25
+PEG_MARGIN_RIGHT = 15
+
+def generate_pegs(rows=None, spacing_x=None, spacing_y=None):
+    """Creates pegs uniformly filling the 30-60-90 triangle space.
+
+    With no arguments the rows are PEG_SPACING_Y apart and fill the triangle.
+    Passing `rows` spreads exactly that many rows over the triangle height,
+    scaling the horizontal spacing to match unless spacing_x is given. A row
+    too narrow for the spacing still gets one peg, centred across the row.
+    """
+    return list(_peg_layout(*_board_spacing(rows, spacing_x, spacing_y)))
+
+def _board_spacing(rows, spacing_x, spacing_y):
+    """Resolve the row count and peg spacing a board is generated with."""
+    top_y = POINT_B[1] + PEG_MARGIN_Y
+    bottom_y = POINT_A[1] - PEG_MARGIN_Y
+
+    if rows is None:
+        spacing_y = spacing_y or PEG_SPACING_Y
+        rows = int((bottom_y - top_y) // spacing_y) + 1
+    elif rows < 1:
+        raise ValueError("A board needs at least one row of pegs")
+    elif spacing_y is None:
+        spacing_y = (bottom_y - top_y) / (rows - 1) if rows > 1 else PEG_SPACING_Y
+    if spacing_x is None:
+        spacing_x = spacing_y * PEG_SPACING_X / PEG_SPACING_Y
+    return rows, spacing_x, spacing_y
+
+def _peg_layout(rows, spacing_x, spacing_y):
+    """Peg positions for a board as (x, y) tuples, computed row by row in closed form."""
+    (point_a_x, point_a_y), (point_b_x, point_b_y), (point_c_x, point_c_y) = POINT_A, POINT_B, POINT_C
+    top_y = point_b_y + PEG_MARGIN_Y
+    bottom_y = point_a_y - PEG_MARGIN_Y
+
+    pegs = []
+    for row in range(rows):
+        current_y = top_y + row * spacing_y
+        if current_y > bottom_y:
+            break
+
+        # Triangle width at this Y level
+        progress = (current_y - point_b_y) / (point_a_y - point_b_y)
+        right_limit = point_b_x + progress * (point_c_x - point_b_x) - PEG_MARGIN_RIGHT
+        edge_x = point_a_x + (point_a_y - current_y) / (point_a_y - point_b_y) * (point_b_x - point_a_x)
+
+        # Alternate row staggering
+        start_x = point_a_x + spacing_x + ((spacing_x / 2) if row % 2 == 1 else 0)
+
+        # First and last peg indices from the A-B edge and the right margin, nudged
+        # with exact checks so boundary pegs match a point-by-point scan
+        first = max(0, math.ceil((edge_x - start_x) / spacing_x) - 1)
+        while start_x + first * spacing_x < right_limit and not is_point_in_triangle(
+                start_x + first * spacing_x, current_y,
+                point_a_x, point_a_y, point_b_x, point_b_y, point_c_x, point_c_y):
+            first += 1
+        last = math.ceil((right_limit - start_x) / spacing_x)
+        while last >= first and not start_x + last * spacing_x < right_limit:
+            last -= 1
+
+        if last < first:
+            # Wide spacing can step over the narrow top of the triangle; keep the
+            # row with a single peg centred in the space it has
+            pegs.append(((edge_x + right_limit) / 2, current_y))
+            continue
+
+        for index in range(first, last + 1):
+            pegs.append((start_x + index * spacing_x, current_y))
+
+    return tuple(pegs)
+
+def is_point_in_triangle(px, py, ax, ay, bx, by, cx, cy):
+    """Check if point P is inside triangle ABC using barycentric coordinates."""
+    denom = (by - cy) * (ax - cx) + (cx - bx) * (ay - cy)
+    if abs(denom) < 1e-10:  # Avoid division by zero
+        return False
+
+    a = ((by - cy) * (px - cx) + (cx - bx) * (py - cy)) / denom
+    b = ((cy - ay) * (px - cx) + (ax - cx) * (py - cy)) / denom
+    c = 1 - a - b
+
+    return a >= 0 and b >= 0 and c >= 0
+
+def define_payout_bins():
+    """Defines bins for 30-60-90 triangle - higher Y (toward point B) = better payout."""
+    point_b_y = 60   # Top-right (90-degree angle, best payout)
+    point_a_y = SCREEN_HEIGHT - 30  # Bottom-left (30-degree angle, start point)
+
+    bins = [
+        # Near Point B (top) - 1000x (hardest to reach)
+        {'range': (point_b_y, point_b_y + 90), 'multiplier': 1000, 'label': '1000x', 'color': (255, 215, 0)},
+
+        # Upper area - decreasing as we go down toward Point A
+        {'range': (point_b_y + 90, point_b_y + 180), 'multiplier': 130, 'label': '130x', 'color': (255, 140, 0)},
+        {'range': (point_b_y + 180, point_b_y + 270), 'multiplier': 26, 'label': '26x', 'color': (255, 100, 100)},
+        {'range': (point_b_y + 270, point_b_y + 360), 'multiplier': 10, 'label': '10x', 'color': (200, 200, 100)},
+        {'range': (point_b_y + 360, point_a_y - 30), 'multiplier': 2, 'label': '2x', 'color': (180, 180, 180)},
+
+        # Near Point A (bottom) - lowest multiplier (most common)
+        {'range': (point_a_y - 30, SCREEN_HEIGHT), 'multiplier': 0.2, 'label': '0.2x', 'color': (100, 100, 100)}
+    ]
+    return bins
+
+class PegTable:
+    """Peg positions stored as contiguous x and y columns of doubles."""
+    __slots__ = ('xs', 'ys')
+
+    def __init__(self, pegs=()):
+        self.xs = array('d')
+        self.ys = array('d')
+        for peg_x, peg_y in pegs:
+            self.xs.append(peg_x)
+            self.ys.append(peg_y)
+
+    def __len__(self):
+        return len(self.xs)
+
+    def __iter__(self):
+        return zip(self.xs, self.ys)
+
+    def __getitem__(self, index):
+        return self.xs[index], self.ys[index]
+
+    def nbytes(self):
+        """Bytes used by the coordinate buffers."""
+        return (len(self.xs) + len(self.ys)) * self.xs.itemsize
+
+class PegGrid:
+    """Uniform grid index over the pegs so collision checks only visit nearby pegs."""
+
+    def __init__(self, pegs, cell_size=PEG_SPACING_X):
+        if cell_size < BALL_RADIUS + PEG_RADIUS:
+            raise ValueError("Cell size must be at least the ball and peg contact distance")
+        self.cell_size = cell_size
+
+        # Every peg is registered in its own cell and the 8 around it, so a single
+        # lookup returns all pegs the ball could touch. Pegs are added in board
+        # order, so the first hit is the same peg the original full scan would
+        # find. Cells hold (x, y) tuples rather than array slices because
+        # unpacking tuples is the fastest way to walk them on the per-tick hot
+        # path; each peg has one tuple, shared by the nine cells that list it.
+        neighbourhoods = {}
+        for peg in tuple(pegs):
+            cell_x, cell_y = peg[0] // cell_size, peg[1] // cell_size
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    neighbourhoods.setdefault((cell_x + dx, cell_y + dy), []).append(peg)
+
+        self.neighbourhoods = {cell: tuple(cell_pegs) for cell, cell_pegs in neighbourhoods.items()}
+
+    def nearby(self, x, y):
+        """Return the pegs in the cell containing (x, y) and its neighbours."""
+        return self.neighbourhoods.get((x // self.cell_size, y // self.cell_size), ())
+
+# Boards kept by load_board, bounded by their total peg count rather than the
+# number of boards: a cached board costs about 200 bytes a peg, so this holds
+# a 300-row board (71k pegs) or hundreds of small ones in about 20 MB
+BOARD_CACHE_PEGS = 100_000
+
+_boards = OrderedDict()
+_boards_pegs = 0
+_boards_lock = threading.Lock()
+
+def load_board(rows=None, spacing_x=None, spacing_y=None):
+    """Cached (PegTable, PegGrid) for a board, shared by every engine that uses it."""
+    global _boards_pegs
+    key = _board_spacing(rows, spacing_x, spacing_y)
+    with _boards_lock:
+        board = _boards.get(key)
+        if board is not None:
+            _boards.move_to_end(key)
+            return board
+
+    rows, spacing_x, spacing_y = key
+    layout = _peg_layout(rows, spacing_x, spacing_y)
+    # The grid shares the layout's tuples; the table keeps its own columns
+    board = PegTable(layout), PegGrid(layout, cell_size=max(spacing_x, BALL_RADIUS + PEG_RADIUS))
+
+    with _boards_lock:
+        if key not in _boards:
+            _boards[key] = board
+            _boards_pegs += len(layout)
+            # Least recently used boards go first; the newest always stays
+            while _boards_pegs > BOARD_CACHE_PEGS and len(_boards) > 1:
+                _, (pegs, _) = _boards.popitem(last=False)
+                _boards_pegs -= len(pegs)
+        return _boards[key]
+
+# --- Provably Fair System ---
+def generate_seed():
+    return os.urandom(32).hex()
+
+def hash_seed(seed):
+    return hashlib.sha256(seed.encode('utf-8')).hexdigest()
+
+def round_hash(server_seed, client_seed, nonce=None):
+    """Game hash for a round; the nonce lets one seed pair back many rounds."""
+    if nonce is None:
+        return hash_seed(server_seed + client_seed)
+    return hash_seed(f"{server_seed}{client_seed}:{nonce}")
+
+# Kick for each 4-bit digit of a round's randomness, -0.5 to 0.5
+KICKS = tuple((digit - 7.5) / 15.0 for digit in range(16))
+
+# byte -> its high and low nibble
+_NIBBLES = [bytes((byte >> 4, byte & 0x0f)) for byte in range(256)]
+
+class KickStream:
+    """Unbounded provably fair digits for one round.
+
+    Block n is HMAC-SHA256(key=server_seed, msg=f"{client_seed}:{nonce}:{n}"),
+    and its 32 bytes give 64 digits, high nibble first, i.e. the block's hex
+    digest read one character at a time. Blocks are decoded into an integer
+    buffer as they are first needed, so collisions only index into it.
+    """
+
+    __slots__ = ('_key', '_prefix', 'digits', 'cursor')
+
+    def __init__(self, server_seed, client_seed, nonce=0):
+        self._key = server_seed.encode('utf-8')
+        self._prefix = f"{client_seed}:{nonce}:"
+        self.digits = bytearray()
+        self.cursor = 0
+
+    def __getitem__(self, index):
+        while index >= len(self.digits):
+            self._extend()
+        return self.digits[index]
+
+    def take(self, count):
+        """The first `count` digits as bytes."""
+        while count > len(self.digits):
+            self._extend()
+        return bytes(self.digits[:count])
+
+    def _extend(self):
+        block = hmac.new(self._key, f"{self._prefix}{self.cursor}".encode('utf-8'), hashlib.sha256).digest()
+        self.digits += b''.join([_NIBBLES[byte] for byte in block])
+        self.cursor += 1
+
+def round_kicks(server_seed, client_seed, nonce=None):
+    """Randomness for a round: an HMAC stream, or the legacy game hash cycle without a nonce."""
+    if nonce is None:
+        return round_hash(server_seed, client_seed)
+    return KickStream(server_seed, client_seed, nonce)
+
+# --- Simulation Engine ---
+
+class PlinkoEngine:
+    """Owns the board and runs the ball physics without any rendering."""
+
+    def __init__(self, pegs=None, bins=None, max_ticks=MAX_ROUND_TICKS, rows=None):
+        if pegs is None:
+            self.pegs, self.peg_grid = load_board(rows)
+        else:
+            self.pegs = PegTable(pegs)
+            self.peg_grid = PegGrid(self.pegs)
+        self.bins = bins if bins is not None else define_payout_bins()
+        self.max_ticks = max_ticks
+        self.fallback_bin = min(range(len(self.bins)), key=lambda index: self.bins[index]['multiplier'])
+
+    def new_ball(self, start_y=START_Y):
+        """Create a ball at the launch point."""
+        return Ball(start_x=START_X, start_y=start_y)
+
+    def is_finished(self, ball):
+        """Check if the ball has travelled past all pegs into the bins."""
+        return ball.x >= FINISH_X
+
+    def step(self, ball, kicks, hash_index):
+        """Advance the ball by one physics tick and return the new hash index.
+
+        kicks is a KickStream, or a game hash string whose hex digits are
+        cycled for rounds played before the HMAC stream.
+        """
+        # Apply gravity (horizontal acceleration to the right)
+        ball.vx += GRAVITY_X
+
+        # Limit maximum speed
+        speed = math.sqrt(ball.vx * ball.vx + ball.vy * ball.vy)
+        if speed > MAX_SPEED:
+            ball.vx = (ball.vx / speed) * MAX_SPEED
+            ball.vy = (ball.vy / speed) * MAX_SPEED
+
+        # Update position
+        ball.x += ball.vx
+        ball.y += ball.vy
+
+        # Bounce off top and bottom walls
+        if not (BALL_RADIUS < ball.y < SCREEN_HEIGHT - BALL_RADIUS):
+            ball.vy *= -0.4  # Much less bounce on walls
+            ball.y = max(BALL_RADIUS, min(ball.y, SCREEN_HEIGHT - BALL_RADIUS))
+
+        # Check collisions with the pegs around the ball
+        for peg_x, peg_y in self.peg_grid.nearby(ball.x, ball.y):
+            dist_x, dist_y = ball.x - peg_x, ball.y - peg_y
+            distance = math.sqrt(dist_x * dist_x + dist_y * dist_y)
+
+            if distance < BALL_RADIUS + PEG_RADIUS:
+                # Use the round's digits for provably fair randomness
+                if isinstance(kicks, str):
+                    random_kick = KICKS[int(kicks[hash_index % len(kicks)], 16)]
+                else:
+                    random_kick = KICKS[kicks[hash_index]]
+
+                # Calculate collision normal
+                norm_x, norm_y = dist_x / distance, dist_y / distance
+
+                # Reflect velocity off the peg
+                dot_product = ball.vx * norm_x + ball.vy * norm_y
+                reflect_vx = ball.vx - 2 * dot_product * norm_x
+                reflect_vy = ball.vy - 2 * dot_product * norm_y
+
+                # Apply bounce with energy retention and random kick
+                ball.vx = reflect_vx * BOUNCE_ENERGY_RETENTION
+                ball.vy = (reflect_vy + random_kick * 1) * BOUNCE_ENERGY_RETENTION  # Reduced random kick
+                hash_index += 1
+
+                # Push ball away from peg to prevent overlap
+                overlap = BALL_RADIUS + PEG_RADIUS - distance
+                ball.x += overlap * norm_x
+                ball.y += overlap * norm_y
+                break
+
+        return hash_index
+
+    def find_bin(self, final_y):
+        """Return the index of the payout bin containing final_y, or None."""
+        for index, bin_info in enumerate(self.bins):
+            if bin_info['range'][0] <= final_y < bin_info['range'][1]:
+                return index
+        return None
+
+    def settle_bin(self, final_y, capped=False):
+        """Bin a round pays out from; rounds that ran out of ticks use the fallback bin."""
+        return self.fallback_bin if capped else self.find_bin(final_y)
+
+    def simulate(self, game_hash, start_y=START_Y, digest=False, kicks=None):
+        """Drop one ball and return the outcome.
+
+        Kicks come from `kicks` when given, otherwise from cycling game_hash.
+        With digest=True the result also carries a SHA-256 of every (x, y)
+        position, so two runs can be checked for the exact same path.
+        """
+        kicks = game_hash if kicks is None else kicks
+        ball = self.new_ball(start_y)
+        hash_index = 0
+        ticks = 0
+        trajectory = hashlib.sha256() if digest else None
+        while not self.is_finished(ball) and ticks < self.max_ticks:
+            hash_index = self.step(ball, kicks, hash_index)
+            ticks += 1
+            if trajectory:
+                trajectory.update(struct.pack('<dd', ball.x, ball.y))
+
+        result = self.outcome(game_hash, ball.y, ticks, hash_index, capped=not self.is_finished(ball))
+        if trajectory:
+            result['trajectory_digest'] = trajectory.hexdigest()
+        return result
+
+    def play_round(self, server_seed, client_seed, nonce=None):
+        """Play a round from its seeds, exactly as BLinko.Game.start_round derives it."""
+        kicks = round_kicks(server_seed, client_seed, nonce)
+        result = self.simulate(round_hash(server_seed, client_seed, nonce), kicks=kicks)
+        result['server_seed'] = server_seed
+        result['client_seed'] = client_seed
+        result['nonce'] = nonce
+        return result
+
+    def outcome(self, game_hash, final_y, ticks, collisions, capped=False):
+        """Build the result dictionary for a finished round."""
+        bin_index = self.settle_bin(final_y, capped)
+        bin_info = self.bins[bin_index] if bin_index is not None else None
+        return {
+            'game_hash': game_hash,
+            'final_y': final_y,
+            'bin_index': bin_index,
+            'label': bin_info['label'] if bin_info else None,
+            'multiplier': bin_info['multiplier'] if bin_info else 0,
+            'ticks': ticks,
+            'collisions': collisions,
+            'capped': capped
+        }
+
+class BallPool:
+    """Balls in flight at the same time, each following its own game hash."""
+
+    def __init__(self, engine=None):
+        self.engine = engine if engine is not None else PlinkoEngine()
+        self.balls = []
+        self.game_hashes = []
+        self.kicks = []
+        self.hash_indices = []
+        self.ticks = []
+        self.tags = []
+
+    def __len__(self):
+        return len(self.balls)
+
+    def add(self, game_hash, tag=None, start_y=START_Y, kicks=None):
+        """Launch a ball for game_hash; tag is handed back when it settles."""
+        self.balls.append(self.engine.new_ball(start_y))
+        self.game_hashes.append(game_hash)
+        self.kicks.append(game_hash if kicks is None else kicks)
+        self.hash_indices.append(0)
+        self.ticks.append(0)
+        self.tags.append(tag)
+
+    def positions(self):
+        """Current (x, y) of every ball in flight."""
+        return [(ball.x, ball.y) for ball in self.balls]
+
+    def tick(self):
+        """Advance every ball by one tick and return (tag, outcome) for those that settled."""
+        engine = self.engine
+        done = []
+        for index, ball in enumerate(self.balls):
+            self.hash_indices[index] = engine.step(ball, self.kicks[index], self.hash_indices[index])
+            self.ticks[index] += 1
+            if engine.is_finished(ball) or self.ticks[index] >= engine.max_ticks:
+                done.append(index)
+        if not done:
+            return []
+
+        settled = [
+            (self.tags[index], engine.outcome(self.game_hashes[index], self.balls[index].y, self.ticks[index],
+                                              self.hash_indices[index], capped=not engine.is_finished(self.balls[index])))
+            for index in done
+        ]
+        finished = set(done)
+        keep = [index for index in range(len(self.balls)) if index not in finished]
+        for name in ('balls', 'game_hashes', 'kicks', 'hash_indices', 'ticks', 'tags'):
+            values = getattr(self, name)
+            setattr(self, name, [values[index] for index in keep])
+        return settled
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo RTP analyzer for BLinko
+Drops balls with random provably fair seeds across all cores and reports
+per-bin hit frequency, expected return, variance and confidence intervals.
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from plinko_engine import PlinkoEngine, KickStream, generate_seed, round_hash
+
+try:
+    from plinko_batch import PlinkoBatch
+except ImportError:  # Fall back to the scalar engine without NumPy
+    PlinkoBatch = None
+
+# z-score for the reported confidence interval (95%)
+CONFIDENCE_Z = 1.96
+
+# Per-process simulator, created once by the pool initializer
+_simulator = None
+
+def _init_worker(use_batch):
+    """Build the board once in each worker process."""
+    global _simulator
+    engine = PlinkoEngine()
+    _simulator = PlinkoBatch(engine) if use_batch and PlinkoBatch else engine
+
+def _run_chunk(rounds):
+    """Drop `rounds` balls with fresh seeds and return (bin_counts, misses, sum, sum_sq)."""
+    seeds = [(generate_seed(), generate_seed()) for _ in range(rounds)]
+    game_hashes = [round_hash(server_seed, client_seed, 0) for server_seed, client_seed in seeds]
+    kicks = [KickStream(server_seed, client_seed, 0) for server_seed, client_seed in seeds]
+
+    if isinstance(_simulator, PlinkoEngine):
+        engine = _simulator
+        results = [engine.simulate(game_hash, kicks=stream) for game_hash, stream in zip(game_hashes, kicks)]
+        bin_indices = [result['bin_index'] for result in results]
+        multipliers = [result['multiplier'] for result in results]
+    else:
+        engine = _simulator.engine
+        results = _simulator.simulate(game_hashes, kicks=kicks)
+        bin_indices = [index if index >= 0 else None for index in results['bin_index'].tolist()]
+        multipliers = results['multiplier'].tolist()
+
+    bin_counts = [0] * len(engine.bins)
+    misses = 0
+    for index in bin_indices:
+        if index is None:
+            misses += 1
+        else:
+            bin_counts[index] += 1
+
+    total = math.fsum(multipliers)
+    total_sq = math.fsum(multiplier * multiplier for multiplier in multipliers)
+    return bin_counts, misses, total, total_sq
+
+class RtpStats:
+    """Running totals of a Monte Carlo RTP run."""
+
+    def __init__(self, bins):
+        self.bins = bins
+        self.bin_counts = [0] * len(bins)
+        self.misses = 0
+        self.rounds = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def add(self, chunk):
+        """Merge the result of one worker chunk."""
+        bin_counts, misses, total, total_sq = chunk
+        for index, count in enumerate(bin_counts):
+            self.bin_counts[index] += count
+        self.misses += misses
+        self.rounds += sum(bin_counts) + misses
+        self.total += total
+        self.total_sq += total_sq
+
+    def summary(self):
+        """Return expected return, variance and confidence interval so far."""
+        if self.rounds == 0:
+            return {'rounds': 0, 'rtp': 0.0, 'house_edge': 0.0, 'variance': 0.0, 'ci_low': 0.0, 'ci_high': 0.0}
+
+        mean = self.total / self.rounds
+        variance = max(0.0, self.total_sq / self.rounds - mean * mean)
+        if self.rounds > 1:
+            variance *= self.rounds / (self.rounds - 1)
+        margin = CONFIDENCE_Z * math.sqrt(variance / self.rounds)
+
+        return {
+            'rounds': self.rounds,
+            'rtp': mean,
+            'house_edge': 1 - mean,
+            'variance': variance,
+            'ci_low': mean - margin,
+            'ci_high': mean + margin
+        }
+
+    def progress_line(self, elapsed):
+        """One-line running report for streaming output."""
+        summary = self.summary()
+        rate = self.rounds / elapsed if elapsed > 0 else 0
+        return (f"{summary['rounds']:>12,} rounds | RTP {summary['rtp'] * 100:8.4f}% "
+                f"[{summary['ci_low'] * 100:.4f}%, {summary['ci_high'] * 100:.4f}%] | "
+                f"{rate:,.0f} rounds/s")
+
+    def report(self):
+        """Multi-line final report with per-bin frequencies."""
+        summary = self.summary()
+        lines = ["", "=== PAYOUT DISTRIBUTION ==="]
+        for bin_info, count in zip(self.bins, self.bin_counts):
+            frequency = count / self.rounds if self.rounds else 0
+            lines.append(f"{bin_info['label']:>8} | hits {count:>12,} | frequency {frequency * 100:9.5f}% "
+                         f"| contributes {frequency * bin_info['multiplier'] * 100:9.4f}%")
+        if self.misses:
+            lines.append(f"{'no bin':>8} | hits {self.misses:>12,} | frequency {self.misses / self.rounds * 100:9.5f}%")
+
+        lines.append("")
+        lines.append(f"Rounds:          {summary['rounds']:,}")
+        lines.append(f"Expected return: {summary['rtp'] * 100:.4f}%")
+        lines.append(f"House edge:      {summary['house_edge'] * 100:.4f}%")
+        lines.append(f"Variance:        {summary['variance']:.6f}")
+        lines.append(f"95% CI:          {summary['ci_low'] * 100:.4f}% .. {summary['ci_high'] * 100:.4f}%")
+        return "\n".join(lines)
+
+def run_analysis(rounds, chunk_size, workers, use_batch=True, out=sys.stdout):
+    """Run the simulation over a process pool, streaming progress to `out`."""
+    stats = RtpStats(PlinkoEngine().bins)
+    chunks = [chunk_size] * (rounds // chunk_size)
+    if rounds % chunk_size:
+        chunks.append(rounds % chunk_size)
+
+    started = time.time()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(use_batch,)) as pool:
+        # Keep a bounded number of chunks in flight so an abort stops quickly
+        pending = set()
+        queued = iter(chunks)
+        try:
+            for size in queued:
+                pending.add(pool.submit(_run_chunk, size))
+                if len(pending) >= workers * 2:
+                    break
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stats.add(future.result())
+                    print(stats.progress_line(time.time() - started), file=out, flush=True)
+                    size = next(queued, None)
+                    if size is not None:
+                        pending.add(pool.submit(_run_chunk, size))
+        except KeyboardInterrupt:
+            for future in pending:
+                future.cancel()
+            print("\nAborted - reporting rounds completed so far", file=out, flush=True)
+
+    print(stats.report(), file=out, flush=True)
+    return stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo RTP analysis of the BLinko payout table")
+    parser.add_argument('--rounds', type=int, default=1_000_000, help="Total balls to drop")
+    parser.add_argument('--chunk-size', type=int, default=20_000, help="Balls per worker task")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument('--scalar', action='store_true', help="Use the scalar engine instead of NumPy batches")
+    args = parser.parse_args(argv)
+
+    if args.rounds <= 0 or args.chunk_size <= 0 or args.workers <= 0:
+        parser.error("rounds, chunk size and workers must be positive")
+
+    mode = "scalar" if args.scalar or PlinkoBatch is None else "numpy batch"
+    print(f"Dropping {args.rounds:,} balls on {args.workers} workers ({mode})", flush=True)
+    run_analysis(args.rounds, args.chunk_size, args.workers, use_batch=not args.scalar)
+
+if __name__ == "__main__":
+    main()
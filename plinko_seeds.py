@@ -0,0 +1,119 @@
+"""
+Pre-generated server seeds for provably fair rounds
+A background thread keeps a pool of (server_seed, commitment) pairs topped up
+so starting a round is a single O(1) pop instead of urandom plus SHA-256.
+"""
+
+import os
+import threading
+from collections import deque
+
+from plinko_engine import hash_seed
+
+SEED_BYTES = 32
+
+# Seeds generated per urandom call while refilling
+REFILL_BLOCK = 64
+
+def _generate_block(count):
+    """Generate `count` (seed, commitment) pairs from a single urandom call."""
+    raw = os.urandom(SEED_BYTES * count).hex()
+    step = SEED_BYTES * 2
+    pairs = []
+    for offset in range(0, len(raw), step):
+        seed = raw[offset:offset + step]
+        pairs.append((seed, hash_seed(seed)))
+    return pairs
+
+class SeedPool:
+    """Pool of server seeds with their commitments, refilled in the background."""
+
+    def __init__(self, size=1024, refill_at=None, prefill=True, start=True):
+        if size <= 0:
+            raise ValueError("Seed pool size must be positive")
+        self.size = size
+        self.refill_at = refill_at if refill_at is not None else size // 2
+        if not 0 <= self.refill_at < size:
+            raise ValueError("refill_at must be below the pool size")
+
+        self._seeds = deque()
+        self._lock = threading.Lock()
+        self._wanted = threading.Event()
+        self._stopped = False
+        self._thread = None
+        self.taken = 0
+        self.stalls = 0
+        self.generated = 0
+        self.refills = 0
+
+        if prefill:
+            self.fill()
+        if start:
+            self.start()
+
+    def __len__(self):
+        return len(self._seeds)
+
+    def start(self):
+        """Start the refill thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="seed-pool-refill", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the refill thread; take() keeps working by generating inline."""
+        self._stopped = True
+        self._wanted.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def take(self):
+        """Return a (server_seed, commitment) pair, generating one inline if the pool is empty."""
+        try:
+            pair = self._seeds.popleft()
+            stalled = False
+        except IndexError:
+            pair = _generate_block(1)[0]
+            stalled = True
+
+        with self._lock:
+            self.taken += 1
+            if stalled:
+                self.stalls += 1
+        if len(self._seeds) <= self.refill_at:
+            self._wanted.set()
+        return pair
+
+    def fill(self):
+        """Top the pool up to its size on the calling thread."""
+        missing = self.size - len(self._seeds)
+        while missing > 0 and not self._stopped:
+            block = _generate_block(min(missing, REFILL_BLOCK))
+            self._seeds.extend(block)
+            missing -= len(block)
+            with self._lock:
+                self.generated += len(block)
+        with self._lock:
+            self.refills += 1
+
+    def stats(self):
+        """Pool depth and refill counters."""
+        return {
+            'depth': len(self._seeds),
+            'size': self.size,
+            'refill_at': self.refill_at,
+            'taken': self.taken,
+            'stalls': self.stalls,
+            'generated': self.generated,
+            'refills': self.refills,
+            'stall_rate': round(self.stalls / self.taken, 4) if self.taken else 0.0
+        }
+
+    def _run(self):
+        while True:
+            self._wanted.wait()
+            if self._stopped:
+                return
+            self._wanted.clear()
+            self.fill()
@@ -0,0 +1,187 @@
+"""
+Compact trajectory recordings for BLinko rounds
+Positions are stored per tick as fixed-point deltas in zigzag varints, with
+the collision ticks and the hash index each one consumed, so a round can be
+replayed or served to viewers without re-running the physics.
+"""
+
+import hashlib
+import struct
+
+from plinko_engine import START_X, START_Y
+
+MAGIC = b'PLKT'
+VERSION = 1
+
+# Fixed-point steps per pixel for stored positions
+POSITION_SCALE = 256
+
+# magic, version, flags, ticks, collisions, start_x, start_y, final_y, game hash, trajectory digest
+HEADER = struct.Struct('<4sBBIIddd32s32s')
+FLAG_CAPPED = 1
+
+def _write_varint(out, value):
+    """Append an unsigned LEB128 varint."""
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varint(data, offset):
+    """Read an unsigned varint, returning (value, next_offset)."""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+def _zigzag(value):
+    return (value << 1) ^ (value >> 63)
+
+def _unzigzag(value):
+    return (value >> 1) ^ -(value & 1)
+
+class Trajectory:
+    """A recorded round: header fields plus the encoded position and collision streams."""
+
+    def __init__(self, game_hash, start_x, start_y, final_y, capped, ticks, collisions, digest, body):
+        self.game_hash = game_hash
+        self.start_x = start_x
+        self.start_y = start_y
+        self.final_y = final_y
+        self.capped = capped
+        self.ticks = ticks
+        self.collision_count = collisions
+        self.digest = digest
+        self.body = body
+
+    def __len__(self):
+        return self.ticks
+
+    def to_bytes(self):
+        """Serialise the recording."""
+        header = HEADER.pack(
+            MAGIC, VERSION, FLAG_CAPPED if self.capped else 0, self.ticks, self.collision_count,
+            self.start_x, self.start_y, self.final_y,
+            bytes.fromhex(self.game_hash), bytes.fromhex(self.digest)
+        )
+        return header + self.body
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Parse a recording produced by to_bytes."""
+        if len(data) < HEADER.size:
+            raise ValueError("Trajectory data is truncated")
+        magic, version, flags, ticks, collisions, start_x, start_y, final_y, game_hash, digest = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a trajectory recording")
+        return cls(game_hash.hex(), start_x, start_y, final_y, bool(flags & FLAG_CAPPED),
+                   ticks, collisions, digest.hex(), bytes(data[HEADER.size:]))
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+    def positions(self):
+        """Yield the (x, y) position after every tick, decoded as it streams."""
+        data = self.body
+        offset = 0
+        qx = round(self.start_x * POSITION_SCALE)
+        qy = round(self.start_y * POSITION_SCALE)
+        for _ in range(self.ticks):
+            dx, offset = _read_varint(data, offset)
+            dy, offset = _read_varint(data, offset)
+            qx += _unzigzag(dx)
+            qy += _unzigzag(dy)
+            yield qx / POSITION_SCALE, qy / POSITION_SCALE
+
+    def collisions(self):
+        """List of (tick, hash_index) for every peg hit, in order."""
+        data = self.body
+        offset = 0
+        for _ in range(self.ticks * 2):
+            _, offset = _read_varint(data, offset)
+
+        events = []
+        tick = 0
+        hash_index = 0
+        for _ in range(self.collision_count):
+            tick_delta, offset = _read_varint(data, offset)
+            index_delta, offset = _read_varint(data, offset)
+            tick += tick_delta
+            hash_index += index_delta
+            events.append((tick, hash_index))
+        return events
+
+    def outcome(self, engine):
+        """Result dictionary of the recorded round, without re-simulating it."""
+        result = engine.outcome(self.game_hash, self.final_y, self.ticks, self.collision_count, self.capped)
+        result['trajectory_digest'] = self.digest
+        return result
+
+class TrajectoryRecorder:
+    """Collects one round tick by tick and encodes it as it goes."""
+
+    def __init__(self, game_hash, start_x=START_X, start_y=START_Y):
+        if len(game_hash) != 64:
+            raise ValueError("Trajectories record 64 character hex game hashes")
+        self.game_hash = game_hash
+        self.start_x = start_x
+        self.start_y = start_y
+        self.ticks = 0
+        self.hash_index = 0
+        self._qx = round(start_x * POSITION_SCALE)
+        self._qy = round(start_y * POSITION_SCALE)
+        self._positions = bytearray()
+        self._collisions = bytearray()
+        self._collision_count = 0
+        self._last_collision_tick = 0
+        self._last_collision_index = 0
+        # Same digest as PlinkoEngine.simulate(digest=True), over the exact floats
+        self._digest = hashlib.sha256()
+
+    def add(self, x, y, hash_index):
+        """Record the ball position and hash index after one tick."""
+        self.ticks += 1
+        qx = round(x * POSITION_SCALE)
+        qy = round(y * POSITION_SCALE)
+        _write_varint(self._positions, _zigzag(qx - self._qx))
+        _write_varint(self._positions, _zigzag(qy - self._qy))
+        self._qx, self._qy = qx, qy
+        self._digest.update(struct.pack('<dd', x, y))
+
+        # Every hash index consumed since the previous tick is a collision on this tick
+        for consumed in range(self.hash_index, hash_index):
+            _write_varint(self._collisions, self.ticks - self._last_collision_tick)
+            _write_varint(self._collisions, consumed - self._last_collision_index)
+            self._last_collision_tick = self.ticks
+            self._last_collision_index = consumed
+            self._collision_count += 1
+        self.hash_index = hash_index
+
+    def finish(self, final_y, capped=False):
+        """Close the recording and return the Trajectory."""
+        return Trajectory(
+            self.game_hash, self.start_x, self.start_y, final_y, capped, self.ticks,
+            self._collision_count, self._digest.hexdigest(), bytes(self._positions + self._collisions)
+        )
+
+def record_round(engine, game_hash, start_y=START_Y, kicks=None):
+    """Play game_hash (or its KickStream) on the engine and return its recording."""
+    kicks = game_hash if kicks is None else kicks
+    ball = engine.new_ball(start_y)
+    recorder = TrajectoryRecorder(game_hash, ball.x, ball.y)
+    hash_index = 0
+    while not engine.is_finished(ball) and recorder.ticks < engine.max_ticks:
+        hash_index = engine.step(ball, kicks, hash_index)
+        recorder.add(ball.x, ball.y, hash_index)
+    return recorder.finish(ball.y, capped=not engine.is_finished(ball))
@@ -0,0 +1,289 @@
+"""
+Blackjack odds for the rules in game_logic
+Computes the dealer's final total distribution from the composition of unseen
+cards, memoising every dealer draw subproblem by (composition, dealer total,
+soft), and from it the EV of standing and of hitting.
+
+Compositions are tuples of ten counts, one per card value: ace, 2..9, then
+all ten-valued cards. The dealer's hole card is treated as the next card the
+dealer draws from the unseen cards, given that the dealer does not hold
+blackjack (a dealer blackjack ends the round before the player acts).
+
+The figures are estimates, not exact odds. hand_odds, which answers API
+requests, builds one dealer table and prices a hit as one card then standing,
+ignoring that card's small effect on the dealer's draws, so a query costs a
+few milliseconds whatever the shoe. round_ev plays on after every hit, but
+its player draws still include the hole card and re-condition the dealer on
+no blackjack at every depth; it is for offline use only.
+
+Run from the server directory to print the player edge of a fresh shoe:
+    python -m apps.games.blackjack_odds --decks 6
+"""
+
+import argparse
+import functools
+
+from .game_logic import CARD_VALUES
+
+# Memoised subproblems, about 300 bytes an entry (int key, six floats), so the
+# request path holds a few MB per worker. One dealer table touches at most a
+# couple of thousand dealer subproblems, well within DEALER_CACHE_SIZE.
+DEALER_CACHE_SIZE = 1 << 13
+TABLE_CACHE_SIZE = 1 << 10
+# Only round_ev fills the player cache, so it never grows in the API workers.
+# round_ev also visits far more dealer subproblems than a request, so the CLI
+# swaps in a larger dealer cache.
+PLAYER_CACHE_SIZE = 1 << 16
+OFFLINE_DEALER_CACHE_SIZE = 1 << 18
+
+# Dealer outcome vectors hold P(17), P(18), P(19), P(20), P(21), P(bust)
+DEALER_TOTALS = (17, 18, 19, 20, 21)
+BUST = len(DEALER_TOTALS)
+_NO_OUTCOME = (0.0,) * (BUST + 1)
+
+def card_index(code):
+    """Composition slot of a card code: 0 for aces, value - 1 otherwise."""
+    value = CARD_VALUES[code]
+    return 0 if value == 11 else value - 1
+
+def composition(codes):
+    """Count card codes into a composition tuple."""
+    counts = [0] * 10
+    for code in codes:
+        counts[card_index(code)] += 1
+    return tuple(counts)
+
+def full_shoe(decks=1):
+    """Composition of a complete shoe."""
+    return (4 * decks,) * 9 + (16 * decks,)
+
+def unseen_composition(game):
+    """Cards the player cannot see: the undealt shoe plus the dealer's hole card."""
+    shoe = game.deck
+    return composition(list(shoe.cards[shoe.cursor:]) + game.dealer_hand.cards[:1])
+
+# Subproblem keys pack a composition into one int, SLOT_BITS per card value
+SLOT_BITS = 9
+SLOT_MASK = (1 << SLOT_BITS) - 1
+_SLOTS = tuple(enumerate(1 << (SLOT_BITS * index) for index in range(10)))
+
+def pack(counts):
+    """Packed int form of a composition tuple (at most 511 cards per value)."""
+    packed = 0
+    for index, unit in _SLOTS:
+        packed += counts[index] * unit
+    return packed
+
+def _add(total, soft, index):
+    """Best total and soft flag after drawing the card in composition slot `index`."""
+    if index == 0 and total + 11 <= 21:
+        return total + 11, True
+    total += index + 1
+    if total > 21 and soft:
+        return total - 10, False
+    return total, soft
+
+@functools.lru_cache(maxsize=DEALER_CACHE_SIZE)
+def dealer_outcomes(packed, remaining, total, soft):
+    """Final total distribution of a dealer at (total, soft) drawing from a packed composition."""
+    if total > 21:
+        return _DEALER_BUST
+    if total >= 17:
+        # The dealer stands on every 17, soft or hard
+        return _DEALER_STANDS[total]
+    if remaining == 0:
+        # The game cannot deal from an empty shoe; such branches contribute nothing
+        return _NO_OUTCOME
+
+    p17 = p18 = p19 = p20 = p21 = bust = 0.0
+    for index, unit in _SLOTS:
+        count = (packed // unit) & SLOT_MASK
+        if count:
+            p = count / remaining
+            q17, q18, q19, q20, q21, q_bust = dealer_outcomes(
+                packed - unit, remaining - 1, *_add(total, soft, index))
+            p17 += p * q17
+            p18 += p * q18
+            p19 += p * q19
+            p20 += p * q20
+            p21 += p * q21
+            bust += p * q_bust
+    return p17, p18, p19, p20, p21, bust
+
+_DEALER_BUST = _NO_OUTCOME[:BUST] + (1.0,)
+_DEALER_STANDS = {
+    total: tuple(1.0 if dealer_total == total else 0.0 for dealer_total in DEALER_TOTALS) + (0.0,)
+    for total in DEALER_TOTALS
+}
+
+def _blackjack_hole(upcard):
+    """Composition slot of the hole card that would give the dealer blackjack."""
+    return {0: 9, 9: 0}.get(upcard)
+
+@functools.lru_cache(maxsize=TABLE_CACHE_SIZE)
+def dealer_table(packed, remaining, upcard):
+    """Final total distribution for a dealer showing `upcard`, given no dealer blackjack."""
+    total, soft = _add(0, False, upcard)
+    excluded = _blackjack_hole(upcard)
+    allowed = remaining
+    if excluded is not None:
+        allowed -= (packed >> (SLOT_BITS * excluded)) & SLOT_MASK
+    if allowed == 0:
+        return _NO_OUTCOME
+    result = [0.0] * (BUST + 1)
+    for index, unit in _SLOTS:
+        count = (packed // unit) & SLOT_MASK
+        if count and index != excluded:
+            p = count / allowed
+            drawn = dealer_outcomes(packed - unit, remaining - 1, *_add(total, soft, index))
+            for outcome, q in enumerate(drawn):
+                result[outcome] += p * q
+    return tuple(result)
+
+def stand_ev(outcomes, total):
+    """EV of standing on `total` against a dealer outcome vector."""
+    ev = outcomes[BUST]
+    for dealer_total, p in zip(DEALER_TOTALS, outcomes):
+        if total > dealer_total:
+            ev += p
+        elif total < dealer_total:
+            ev -= p
+    return ev
+
+@functools.lru_cache(maxsize=PLAYER_CACHE_SIZE)
+def best_ev(packed, remaining, total, soft, upcard):
+    """(EV, hit?) of the better action for a player hand at (total, soft)."""
+    stand = stand_ev(dealer_table(packed, remaining, upcard), total)
+    if total >= 21:
+        return stand, False
+    hit = hit_ev(packed, remaining, total, soft, upcard)
+    return (hit, True) if hit > stand else (stand, False)
+
+def hit_ev(packed, remaining, total, soft, upcard):
+    """EV of taking one card and then playing on optimally (offline, see round_ev)."""
+    if remaining == 0:
+        return -1.0
+    ev = 0.0
+    for index, unit in _SLOTS:
+        count = (packed // unit) & SLOT_MASK
+        if count:
+            p = count / remaining
+            new_total, new_soft = _add(total, soft, index)
+            if new_total > 21:
+                ev -= p
+            else:
+                ev += p * best_ev(packed - unit, remaining - 1, new_total, new_soft, upcard)[0]
+    return ev
+
+def hit_once_ev(outcomes, packed, remaining, total, soft, upcard):
+    """EV of taking one card and standing against the dealer outcome vector `outcomes`.
+
+    The card comes from the unseen cards other than the hole card, each value
+    weighted by the chance the hole card is not that value given no dealer
+    blackjack. The result is built as standing's EV plus the gain of the hit,
+    so a hit that cannot change the outcome ties standing exactly.
+    """
+    stand = stand_ev(outcomes, total)
+    excluded = _blackjack_hole(upcard)
+    allowed = remaining
+    if excluded is not None:
+        allowed -= (packed >> (SLOT_BITS * excluded)) & SLOT_MASK
+    if remaining <= 1 or allowed == 0:
+        return -1.0
+
+    gain = 0.0
+    for index, unit in _SLOTS:
+        count = (packed // unit) & SLOT_MASK
+        if count:
+            hole = count / allowed if index != excluded else 0.0
+            p = (count - hole) / (remaining - 1)
+            new_total, new_soft = _add(total, soft, index)
+            after = -1.0 if new_total > 21 else stand_ev(outcomes, new_total)
+            gain += p * (after - stand)
+    return stand + gain
+
+def hand_odds(game):
+    """EV of hitting once and of standing for the player's current hand, with a hint.
+
+    Playing on after a hit is never worse than standing after it, so ties
+    are hinted as hits.
+    """
+    counts = unseen_composition(game)
+    packed, remaining = pack(counts), sum(counts)
+    upcard = card_index(game.dealer_hand.cards[1])
+    hand = game.player_hand
+    outcomes = dealer_table(packed, remaining, upcard)
+    stand = stand_ev(outcomes, hand.total)
+    hit = hit_once_ev(outcomes, packed, remaining, hand.total, hand.is_soft(), upcard)
+    return {
+        'hint': 'hit' if hit >= stand else 'stand',
+        'hit_ev': round(hit, 6),
+        'stand_ev': round(stand, 6),
+        'dealer_outcomes': {
+            **{str(dealer_total): round(p, 6) for dealer_total, p in zip(DEALER_TOTALS, outcomes)},
+            'bust': round(outcomes[BUST], 6)
+        }
+    }
+
+def _without(counts, index):
+    return counts[:index] + (counts[index] - 1,) + counts[index + 1:]
+
+def round_ev(counts):
+    """EV of a fresh round dealt from `counts` with optimal hit/stand play, for offline use."""
+    ev = 0.0
+    remaining = sum(counts)
+    # Cards are dealt player, dealer, player, dealer; only the values matter
+    for first, first_count in enumerate(counts):
+        if not first_count:
+            continue
+        after_first = _without(counts, first)
+        for second, second_count in enumerate(after_first):
+            if not second_count:
+                continue
+            after_second = _without(after_first, second)
+            for upcard, upcard_count in enumerate(after_second):
+                if not upcard_count:
+                    continue
+                p = first_count / remaining * second_count / (remaining - 1) * upcard_count / (remaining - 2)
+                unseen = _without(after_second, upcard)
+                hole = _blackjack_hole(upcard)
+                dealer_blackjack = unseen[hole] / (remaining - 3) if hole is not None else 0.0
+
+                total, soft = _add(*_add(0, False, first), second)
+                if total == 21:
+                    # Blackjack pays even money and ties a dealer blackjack
+                    ev += p * (1 - dealer_blackjack)
+                else:
+                    hand_ev = best_ev(pack(unseen), remaining - 3, total, soft, upcard)[0]
+                    ev += p * (dealer_blackjack * -1 + (1 - dealer_blackjack) * hand_ev)
+    return ev
+
+def cache_stats():
+    """Hit counters for the memoised subproblems."""
+    stats = {}
+    for name, cached in (('dealer', dealer_outcomes), ('dealer_table', dealer_table), ('player', best_ev)):
+        info = cached.cache_info()
+        stats[name] = {'entries': info.currsize, 'hits': info.hits, 'misses': info.misses}
+    return stats
+
+def _resize_dealer_cache(maxsize):
+    """Replace the dealer cache with an empty one holding `maxsize` entries."""
+    global dealer_outcomes
+    # The recursion looks dealer_outcomes up by name, so it uses the new cache too
+    dealer_outcomes = functools.lru_cache(maxsize=maxsize)(dealer_outcomes.__wrapped__)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Player edge of a fresh blackjack shoe")
+    parser.add_argument('--decks', type=int, default=1, help="Decks in the shoe")
+    args = parser.parse_args(argv)
+    if args.decks <= 0:
+        parser.error("decks must be positive")
+
+    _resize_dealer_cache(OFFLINE_DEALER_CACHE_SIZE)
+    ev = round_ev(full_shoe(args.decks))
+    print(f"{args.decks} deck shoe, optimal hit/stand play")
+    print(f"Player EV:  {ev * 100:.4f}%")
+    print(f"House edge: {-ev * 100:.4f}%")
+
+if __name__ == "__main__":
+    main()
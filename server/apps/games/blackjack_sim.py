@@ -0,0 +1,213 @@
+"""
+Blackjack strategy simulator and house-edge benchmark
+Plays hands through BlackjackGame with a fixed player strategy across all
+cores and reports win/loss/tie rates, the house edge and hands per second.
+
+Run from the server directory:
+    python -m apps.games.blackjack_sim --strategy all --hands 1000000
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from .game_logic import CARD_VALUES, BlackjackGame
+
+# z-score for the reported confidence interval (95%)
+CONFIDENCE_Z = 1.96
+
+# --- Strategies: (player_hand, dealer up card value) -> hit? ---
+
+def basic_strategy(hand, upcard):
+    """Hit/stand part of basic strategy (the game has no doubles or splits)."""
+    total = hand.value()
+    if hand.is_soft():
+        # Soft 18 hits against 9, 10 and ace
+        return total <= 17 or (total == 18 and upcard >= 9)
+    if total <= 11:
+        return True
+    if total == 12:
+        return not 4 <= upcard <= 6
+    if total <= 16:
+        return upcard >= 7
+    return False
+
+def dealer_mimic(hand, upcard):
+    """Play the dealer's rule: hit below 17."""
+    return hand.value() < 17
+
+def never_bust(hand, upcard):
+    """Only hit when no card can bust the hand."""
+    return hand.value() <= 11 or (hand.is_soft() and hand.value() <= 17)
+
+STRATEGIES = {
+    'basic': basic_strategy,
+    'dealer-mimic': dealer_mimic,
+    'never-bust': never_bust
+}
+
+def play_hands(strategy, hands, decks=1, penetration=0.65, seed=None):
+    """Play `hands` hands on one table and return (wins, losses, ties, blackjacks, busts)."""
+    random.seed(seed)  # Forked workers would otherwise share one shuffle sequence
+    decide = STRATEGIES[strategy]
+    game = BlackjackGame(decks, penetration)
+    blackjacks = 0
+    busts = 0
+    for _ in range(hands):
+        game.start_new_game()
+        # The first dealer card is the hole card
+        upcard = CARD_VALUES[game.dealer_hand.cards[1]]
+        while not game.game_over and decide(game.player_hand, upcard):
+            game.hit()
+        game.stand()
+        if game.player_hand.is_blackjack():
+            blackjacks += 1
+        elif game.player_hand.is_bust():
+            busts += 1
+    return game.player_wins, game.dealer_wins, game.ties, blackjacks, busts
+
+def _run_chunk(args):
+    return play_hands(*args)
+
+class SimulationStats:
+    """Running totals of one strategy's simulation."""
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+        self.wins = 0
+        self.losses = 0
+        self.ties = 0
+        self.blackjacks = 0
+        self.busts = 0
+
+    @property
+    def hands(self):
+        return self.wins + self.losses + self.ties
+
+    def add(self, chunk):
+        """Merge the result of one worker chunk."""
+        wins, losses, ties, blackjacks, busts = chunk
+        self.wins += wins
+        self.losses += losses
+        self.ties += ties
+        self.blackjacks += blackjacks
+        self.busts += busts
+
+    def summary(self, elapsed=0.0):
+        """Return outcome rates, house edge and confidence interval so far."""
+        hands = self.hands
+        if hands == 0:
+            return {'strategy': self.strategy, 'hands': 0, 'win_rate': 0.0, 'loss_rate': 0.0, 'tie_rate': 0.0,
+                    'blackjack_rate': 0.0, 'bust_rate': 0.0, 'house_edge': 0.0, 'ci_low': 0.0, 'ci_high': 0.0,
+                    'hands_per_second': 0.0}
+
+        # Each hand pays +1, 0 or -1 (blackjacks pay even money in this game)
+        mean = (self.wins - self.losses) / hands
+        variance = max(0.0, (self.wins + self.losses) / hands - mean * mean)
+        if hands > 1:
+            variance *= hands / (hands - 1)
+        margin = CONFIDENCE_Z * math.sqrt(variance / hands)
+
+        return {
+            'strategy': self.strategy,
+            'hands': hands,
+            'win_rate': self.wins / hands,
+            'loss_rate': self.losses / hands,
+            'tie_rate': self.ties / hands,
+            'blackjack_rate': self.blackjacks / hands,
+            'bust_rate': self.busts / hands,
+            'house_edge': -mean,
+            'ci_low': -mean - margin,
+            'ci_high': -mean + margin,
+            'hands_per_second': hands / elapsed if elapsed > 0 else 0.0
+        }
+
+    def progress_line(self, elapsed):
+        """One-line running report for streaming output."""
+        summary = self.summary(elapsed)
+        return (f"{summary['hands']:>12,} hands | edge {summary['house_edge'] * 100:7.3f}% "
+                f"[{summary['ci_low'] * 100:.3f}%, {summary['ci_high'] * 100:.3f}%] | "
+                f"{summary['hands_per_second']:,.0f} hands/s")
+
+    def report(self, elapsed):
+        """Multi-line final report."""
+        summary = self.summary(elapsed)
+        return "\n".join([
+            "",
+            f"=== {self.strategy.upper()} ===",
+            f"Hands:        {summary['hands']:,}",
+            f"Win rate:     {summary['win_rate'] * 100:.3f}%",
+            f"Loss rate:    {summary['loss_rate'] * 100:.3f}%",
+            f"Tie rate:     {summary['tie_rate'] * 100:.3f}%",
+            f"Blackjacks:   {summary['blackjack_rate'] * 100:.3f}%",
+            f"Player busts: {summary['bust_rate'] * 100:.3f}%",
+            f"House edge:   {summary['house_edge'] * 100:.3f}%",
+            f"95% CI:       {summary['ci_low'] * 100:.3f}% .. {summary['ci_high'] * 100:.3f}%",
+            f"Throughput:   {summary['hands_per_second']:,.0f} hands/s",
+        ])
+
+def run_simulation(strategy, hands, chunk_size, workers, decks=1, penetration=0.65, seed=None, out=sys.stdout):
+    """Simulate one strategy over a process pool, streaming progress to `out`."""
+    sizes = [chunk_size] * (hands // chunk_size)
+    if hands % chunk_size:
+        sizes.append(hands % chunk_size)
+    # A fixed seed gives every chunk its own derived seed, so runs are repeatable
+    chunks = [(strategy, size, decks, penetration, None if seed is None else seed + index)
+              for index, size in enumerate(sizes)]
+
+    stats = SimulationStats(strategy)
+    started = time.time()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Keep a bounded number of chunks in flight so an abort stops quickly
+        pending = set()
+        queued = iter(chunks)
+        try:
+            for chunk in queued:
+                pending.add(pool.submit(_run_chunk, chunk))
+                if len(pending) >= workers * 2:
+                    break
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stats.add(future.result())
+                    print(stats.progress_line(time.time() - started), file=out, flush=True)
+                    chunk = next(queued, None)
+                    if chunk is not None:
+                        pending.add(pool.submit(_run_chunk, chunk))
+        except KeyboardInterrupt:
+            for future in pending:
+                future.cancel()
+            print("\nAborted - reporting hands completed so far", file=out, flush=True)
+
+    print(stats.report(time.time() - started), file=out, flush=True)
+    return stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate blackjack strategies against the game rules")
+    parser.add_argument('--strategy', choices=sorted(STRATEGIES) + ['all'], default='basic', help="Player strategy")
+    parser.add_argument('--hands', type=int, default=1_000_000, help="Hands per strategy")
+    parser.add_argument('--chunk-size', type=int, default=20_000, help="Hands per worker task")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument('--decks', type=int, default=1, help="Decks in the shoe")
+    parser.add_argument('--penetration', type=float, default=0.65, help="Share of the shoe dealt before reshuffling")
+    parser.add_argument('--seed', type=int, help="Seed for a repeatable run")
+    args = parser.parse_args(argv)
+
+    if args.hands <= 0 or args.chunk_size <= 0 or args.workers <= 0 or args.decks <= 0:
+        parser.error("hands, chunk size, workers and decks must be positive")
+    if not 0 < args.penetration < 1:
+        parser.error("penetration must be between 0 and 1")
+
+    strategies = sorted(STRATEGIES) if args.strategy == 'all' else [args.strategy]
+    for strategy in strategies:
+        print(f"Playing {args.hands:,} hands of {strategy} on {args.workers} workers "
+              f"({args.decks} deck shoe)", flush=True)
+        run_simulation(strategy, args.hands, args.chunk_size, args.workers,
+                       args.decks, args.penetration, args.seed)
+
+if __name__ == "__main__":
+    main()
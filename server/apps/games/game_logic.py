@@ -2,122 +2,223 @@
 Game logic for Blackjack and Rock-Paper-Scissors
 """
 
+import hashlib
+import hmac
+import os
 import random
+from array import array
+from collections import deque
 from typing import List, Dict, Tuple, Optional
 
 class Card:
-    """Represents a playing card"""
+    """Represents a playing card
+
+    Cards travel through decks and hands as ints 0-51 (suit index * 13 +
+    rank index); this class maps those codes to faces via lookup tables.
+    Cards are immutable, so the CARDS singletons are shared by every session.
+    """
     
     SUITS = ['♠', '♥', '♦', '♣']
     RANKS = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
     
+    __slots__ = ('suit', 'rank', 'code')
+    
     def __init__(self, suit: str, rank: str):
-        self.suit = suit
-        self.rank = rank
+        object.__setattr__(self, 'suit', suit)
+        object.__setattr__(self, 'rank', rank)
+        object.__setattr__(self, 'code', encode_card(suit, rank))
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("Cards are immutable")
+    
+    @classmethod
+    def from_code(cls, code: int) -> 'Card':
+        """The shared card for an int code"""
+        return CARDS[code]
     
     def __str__(self):
         return f"{self.rank}{self.suit}"
     
     def value(self) -> int:
         """Get card value for blackjack"""
-        if self.rank in ['J', 'Q', 'K']:
-            return 10
-        elif self.rank == 'A':
-            return 11  # Aces handled separately
-        else:
-            return int(self.rank)
+        return CARD_VALUES[self.code]  # Aces count 11 here; hands handle soft totals
     
     def is_red(self) -> bool:
         """Check if card is red"""
-        return self.suit in ['♥', '♦']
+        return CARD_IS_RED[self.code]
     
     def to_dict(self) -> Dict:
         """Convert card to dictionary"""
-        return {
-            'suit': self.suit,
-            'rank': self.rank,
-            'value': self.value(),
-            'is_red': self.is_red()
-        }
+        return card_dict(self.code)
+
+# --- Card code lookup tables ---
 
-class Deck:
-    """Represents a deck of playing cards"""
+CARD_COUNT = len(Card.SUITS) * len(Card.RANKS)
+CARD_SUITS = [Card.SUITS[code // len(Card.RANKS)] for code in range(CARD_COUNT)]
+CARD_RANKS = [Card.RANKS[code % len(Card.RANKS)] for code in range(CARD_COUNT)]
+CARD_VALUES = [11 if rank == 'A' else 10 if rank in ('J', 'Q', 'K') else int(rank) for rank in CARD_RANKS]
+CARD_IS_ACE = [rank == 'A' for rank in CARD_RANKS]
+CARD_IS_RED = [suit in ('♥', '♦') for suit in CARD_SUITS]
+_CARD_CODES = {(suit, rank): code for code, (suit, rank) in enumerate(zip(CARD_SUITS, CARD_RANKS))}
+_CARD_DICTS = [
+    {'suit': suit, 'rank': rank, 'value': value, 'is_red': is_red}
+    for suit, rank, value, is_red in zip(CARD_SUITS, CARD_RANKS, CARD_VALUES, CARD_IS_RED)
+]
+
+def encode_card(suit: str, rank: str) -> int:
+    """Int code of a card face"""
+    return _CARD_CODES[(suit, rank)]
+
+def card_dict(code: int) -> Dict:
+    """API representation of a card code"""
+    return dict(_CARD_DICTS[code])
+
+CARDS = tuple(Card(suit, rank) for suit, rank in zip(CARD_SUITS, CARD_RANKS))
+
+class Shoe:
+    """One or more decks of card codes dealt from a cursor
+
+    The codes live in a preallocated byte array that is shuffled in place;
+    dealing advances the cursor, and reaching the cut card marks the shoe
+    for a reshuffle before the next round.
+
+    With a shuffle_key, each shuffle picks a random nonce and derives the
+    order from HMAC(shuffle_key, nonce), so the nonce and cursor alone
+    rebuild the shoe without revealing the order to whoever holds them.
+    """
     
-    def __init__(self):
-        self.cards = []
-        self.reset()
+    NONCE_BYTES = 16
+    
+    def __init__(self, decks: int = 1, penetration: float = 0.65, shuffle_key: Optional[bytes] = None):
+        if decks < 1:
+            raise ValueError("A shoe needs at least one deck")
+        if not 0 < penetration < 1:
+            raise ValueError("Penetration must be between 0 and 1")
+        self.decks = decks
+        self.cards = array('B', range(CARD_COUNT)) * decks
+        self.cut = int(len(self.cards) * penetration)
+        if len(self.cards) - self.cut < self.max_round_cards(decks):
+            raise ValueError(f"Penetration {penetration} leaves too few cards after the cut for a full round")
+        self.cursor = 0
+        self.shuffle_key = shuffle_key
+        self.nonce = None
+        self.shuffle()
+    
+    @classmethod
+    def from_nonce(cls, decks: int, cut: int, shuffle_key: bytes, nonce: bytes, cursor: int) -> 'Shoe':
+        """Rebuild a keyed shoe from its nonce and dealing position"""
+        shoe = cls.__new__(cls)
+        shoe.decks = decks
+        shoe.cut = cut
+        shoe.shuffle_key = shuffle_key
+        shoe.nonce = nonce
+        shoe._keyed_shuffle()
+        shoe.cursor = cursor
+        return shoe
+    
+    @staticmethod
+    def max_round_cards(decks: int) -> int:
+        """Most cards one round can deal from a shoe of `decks` decks
+        
+        Before their last card the player's hand is at most 21 and the dealer's
+        at most 16, counting aces as one, so the lowest cards in the shoe
+        adding up to 37, plus those two last cards, bound any round.
+        """
+        budget = 21 + 16
+        cards = 2
+        for value in range(1, 11):
+            count = (16 if value == 10 else 4) * decks
+            taken = min(count, budget // value)
+            cards += taken
+            budget -= taken * value
+            if taken < count:
+                break
+        return cards
     
     def reset(self):
-        """Reset deck to full 52 cards"""
-        self.cards = []
-        for suit in Card.SUITS:
-            for rank in Card.RANKS:
-                self.cards.append(Card(suit, rank))
+        """Gather every card back and reshuffle"""
         self.shuffle()
     
     def shuffle(self):
-        """Shuffle the deck"""
-        random.shuffle(self.cards)
+        """Shuffle the whole shoe and move the cursor back to the top"""
+        if self.shuffle_key is None:
+            random.shuffle(self.cards)
+        else:
+            self.nonce = os.urandom(self.NONCE_BYTES)
+            self._keyed_shuffle()
+        self.cursor = 0
+    
+    def _keyed_shuffle(self):
+        """Order a fresh shoe from the key and nonce"""
+        self.cards = array('B', range(CARD_COUNT)) * self.decks
+        seed = hmac.new(self.shuffle_key, self.nonce, hashlib.sha256).digest()
+        random.Random(seed).shuffle(self.cards)
     
-    def deal_card(self) -> Optional[Card]:
-        """Deal one card from the deck"""
-        if self.cards:
-            return self.cards.pop()
+    def deal_card(self) -> Optional[int]:
+        """Deal one card code from the shoe"""
+        if self.cursor < len(self.cards):
+            code = self.cards[self.cursor]
+            self.cursor += 1
+            return code
         return None
     
     def cards_remaining(self) -> int:
         """Get number of cards remaining"""
-        return len(self.cards)
+        return len(self.cards) - self.cursor
+    
+    def needs_shuffle(self) -> bool:
+        """Check if the cut card has been reached"""
+        return self.cursor >= self.cut
 
 class BlackjackHand:
-    """Represents a blackjack hand"""
+    """Represents a blackjack hand with a running total"""
     
     def __init__(self):
         self.cards = []
+        self.total = 0
+        self.soft_aces = 0  # Aces still counted as 11
     
-    def add_card(self, card: Card):
-        """Add a card to the hand"""
-        self.cards.append(card)
-    
-    def value(self) -> int:
-        """Calculate hand value with ace handling"""
-        total = 0
-        aces = 0
-        
-        for card in self.cards:
-            if card.rank == 'A':
-                aces += 1
-                total += 11
-            else:
-                total += card.value()
+    def add_card(self, card):
+        """Add a card (code or Card) to the hand and update the total"""
+        code = card.code if isinstance(card, Card) else card
+        self.cards.append(code)
+        self.total += CARD_VALUES[code]
+        if CARD_IS_ACE[code]:
+            self.soft_aces += 1
         
         # Adjust for aces
-        while total > 21 and aces > 0:
-            total -= 10
-            aces -= 1
-        
-        return total
+        while self.total > 21 and self.soft_aces:
+            self.total -= 10
+            self.soft_aces -= 1
+    
+    def value(self) -> int:
+        """Hand value with aces counted as 1 where needed"""
+        return self.total
+    
+    def is_soft(self) -> bool:
+        """Check if an ace is still counted as 11"""
+        return self.soft_aces > 0
     
     def is_bust(self) -> bool:
         """Check if hand is bust"""
-        return self.value() > 21
+        return self.total > 21
     
     def is_blackjack(self) -> bool:
         """Check if hand is blackjack"""
-        return len(self.cards) == 2 and self.value() == 21
+        return len(self.cards) == 2 and self.total == 21
     
     def to_dict(self, hide_first: bool = False) -> Dict:
         """Convert hand to dictionary"""
         cards_data = []
-        for i, card in enumerate(self.cards):
+        for i, code in enumerate(self.cards):
             if hide_first and i == 0:
                 cards_data.append({'hidden': True})
             else:
-                cards_data.append(card.to_dict())
+                cards_data.append(card_dict(code))
         
         return {
             'cards': cards_data,
-            'value': self.value() if not hide_first else None,
+            'value': self.total if not hide_first else None,
             'is_bust': self.is_bust(),
             'is_blackjack': self.is_blackjack(),
             'card_count': len(self.cards)
@@ -126,8 +227,8 @@ class BlackjackHand:
 class BlackjackGame:
     """Blackjack game logic"""
     
-    def __init__(self):
-        self.deck = Deck()
+    def __init__(self, decks: int = 1, penetration: float = 0.65, shuffle_key: Optional[bytes] = None):
+        self.deck = Shoe(decks, penetration, shuffle_key)
         self.player_hand = BlackjackHand()
         self.dealer_hand = BlackjackHand()
         self.game_over = False
@@ -138,9 +239,9 @@ class BlackjackGame:
     
     def start_new_game(self) -> Dict:
         """Start a new game"""
-        # Reset if deck is low
-        if self.deck.cards_remaining() < 10:
-            self.deck.reset()
+        # Reshuffle once the cut card has come out
+        if self.deck.needs_shuffle():
+            self.deck.shuffle()
         
         # Clear hands
         self.player_hand = BlackjackHand()
@@ -227,6 +328,70 @@ class BlackjackGame:
             'cards_remaining': self.deck.cards_remaining()
         }
 
+class PatternModel:
+    """Incremental frequency model of a player's next move
+
+    Counts follow-up moves after the empty context and after the last one
+    and two moves, in one fixed 39-byte table, so each update and
+    prediction touches a handful of counters and never scans the history.
+    A row is halved when a counter saturates, letting old habits fade.
+    """
+    
+    SIZE = 39
+    ORDER_ONE = 3    # Offset of the 3 rows keyed by the last move
+    ORDER_TWO = 12   # Offset of the 9 rows keyed by the last two moves
+    
+    def __init__(self, counts: Optional[bytes] = None, last: int = -1, before_last: int = -1):
+        self.counts = bytearray(counts) if counts is not None else bytearray(self.SIZE)
+        self.last = last
+        self.before_last = before_last
+        self._set_rows()
+    
+    def _set_rows(self):
+        """Rows of the contexts the next move will follow, longest first"""
+        if self.last < 0:
+            self._rows = (0,)
+        elif self.before_last < 0:
+            self._rows = (self.ORDER_ONE + self.last * 3, 0)
+        else:
+            self._rows = (self.ORDER_TWO + (self.before_last * 3 + self.last) * 3,
+                          self.ORDER_ONE + self.last * 3, 0)
+    
+    def predict(self) -> Optional[int]:
+        """Most likely next move index from the longest context seen, or None"""
+        counts = self.counts
+        for row in self._rows:
+            rock = counts[row]
+            paper = counts[row + 1]
+            scissors = counts[row + 2]
+            if rock or paper or scissors:
+                if rock >= paper and rock >= scissors:
+                    return 0
+                return 1 if paper >= scissors else 2
+        return None
+    
+    def update(self, move: int):
+        """Count the player's move in every context it followed"""
+        counts = self.counts
+        for row in self._rows:
+            slot = row + move
+            if counts[slot] == 255:
+                counts[row] >>= 1
+                counts[row + 1] >>= 1
+                counts[row + 2] >>= 1
+            counts[slot] += 1
+        self.before_last, self.last = self.last, move
+        self._rows = _NEXT_ROWS[self.before_last + 1][move]
+
+def _context_rows(last: int, before_last: int) -> Tuple[int, ...]:
+    model = PatternModel.__new__(PatternModel)
+    model.last, model.before_last = last, before_last
+    model._set_rows()
+    return model._rows
+
+# Context rows after a move, indexed by [previous move + 1][move]; -1 means no previous move
+_NEXT_ROWS = [[_context_rows(move, previous) for move in range(3)] for previous in range(-1, 3)]
+
 class RoshamboGame:
     """Rock-Paper-Scissors game logic"""
     
@@ -236,20 +401,36 @@ class RoshamboGame:
         'paper': '📄',
         'scissors': '✂️'
     }
+    HISTORY_LIMIT = 100  # Most recent rounds kept per session
+    # Winner by (player index - computer index) % 3
+    OUTCOMES = ('tie', 'player', 'computer')
+    # Share of adaptive moves still played at random, so the opponent stays hard to game
+    EXPLORATION = 0.1
     
-    def __init__(self):
+    def __init__(self, adaptive: bool = False):
         self.player_wins = 0
         self.computer_wins = 0
         self.ties = 0
-        self.history = []
+        self.history = deque(maxlen=self.HISTORY_LIMIT)
+        self.model = PatternModel() if adaptive else None
+    
+    def _computer_move(self) -> int:
+        """Pick the computer's move index, countering the predicted player move"""
+        if self.model is not None and random.random() >= self.EXPLORATION:
+            predicted = self.model.predict()
+            if predicted is not None:
+                return (predicted + 1) % 3
+        return random.randrange(3)
     
     def play_round(self, player_choice: str) -> Dict:
         """Play one round"""
         if player_choice not in self.CHOICES:
             raise ValueError(f"Invalid choice. Must be one of: {self.CHOICES}")
         
-        computer_choice = random.choice(self.CHOICES)
+        computer_choice = self.CHOICES[self._computer_move()]
         winner = self._determine_winner(player_choice, computer_choice)
+        if self.model is not None:
+            self.model.update(self.CHOICES.index(player_choice))
         
         # Update stats
         if winner == 'player':
@@ -264,7 +445,7 @@ class RoshamboGame:
             'player_choice': player_choice,
             'computer_choice': computer_choice,
             'winner': winner,
-            'round_number': len(self.history) + 1
+            'round_number': self.player_wins + self.computer_wins + self.ties
         }
         self.history.append(round_data)
         
@@ -283,6 +464,51 @@ class RoshamboGame:
             }
         }
     
+    def play_rounds(self, player_choices: List[str]) -> Dict:
+        """Play a batch of rounds and return columnar results"""
+        indices = {choice: index for index, choice in enumerate(self.CHOICES)}
+        try:
+            players = [indices[choice] for choice in player_choices]
+        except KeyError:
+            raise ValueError(f"Invalid choice. Must be one of: {self.CHOICES}")
+        
+        first_round = self.player_wins + self.computer_wins + self.ties + 1
+        if self.model is None:
+            computer_choices = random.choices(self.CHOICES, k=len(players))
+        else:
+            # Each adaptive move depends on the rounds before it
+            computer_choices = []
+            for player in players:
+                computer_choices.append(self.CHOICES[self._computer_move()])
+                self.model.update(player)
+        winners = [self.OUTCOMES[(player - indices[computer]) % 3]
+                   for player, computer in zip(players, computer_choices)]
+        
+        # Update stats
+        player_wins = winners.count('player')
+        computer_wins = winners.count('computer')
+        self.player_wins += player_wins
+        self.computer_wins += computer_wins
+        self.ties += len(winners) - player_wins - computer_wins
+        
+        # Only the rounds that fit in the history are materialised
+        kept = min(len(winners), self.HISTORY_LIMIT)
+        for offset in range(len(winners) - kept, len(winners)):
+            self.history.append({
+                'player_choice': player_choices[offset],
+                'computer_choice': computer_choices[offset],
+                'winner': winners[offset],
+                'round_number': first_round + offset
+            })
+        
+        return {
+            'first_round': first_round,
+            'rounds': len(winners),
+            'computer_choices': computer_choices,
+            'winners': winners,
+            'stats': self.get_stats()
+        }
+    
     def _determine_winner(self, player: str, computer: str) -> str:
         """Determine round winner"""
         if player == computer:
@@ -316,7 +542,9 @@ class RoshamboGame:
         self.player_wins = 0
         self.computer_wins = 0
         self.ties = 0
-        self.history = []
+        self.history.clear()
+        if self.model is not None:
+            self.model = PatternModel()
         
         return {
             'message': 'Game reset successfully',
@@ -0,0 +1,104 @@
+"""
+Incrementally maintained game statistics
+Each game type has one GameStats document updated atomically as sessions
+start and finish: session and round counters move with $inc, and unique
+players are counted by a HyperLogLog sketch whose registers move with $max.
+Reading the stats is a single document lookup, whatever the history size.
+"""
+
+import hashlib
+import math
+from datetime import datetime
+
+from pymongo.errors import DuplicateKeyError
+
+from .models import GameSession, GameStats
+
+# 2**HLL_PRECISION registers: about 1.6% standard error on unique players
+HLL_PRECISION = 12
+HLL_REGISTERS = 1 << HLL_PRECISION
+_HLL_ALPHA = 0.7213 / (1 + 1.079 / HLL_REGISTERS)
+
+def _hll_register(value):
+    """(register index, rank) of a value in the sketch."""
+    digest = int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), 'big')
+    index = digest >> (64 - HLL_PRECISION)
+    rest = digest & ((1 << (64 - HLL_PRECISION)) - 1)
+    # Position of the first set bit in the remaining 52 bits
+    rank = (64 - HLL_PRECISION) - rest.bit_length() + 1
+    return index, rank
+
+def hll_estimate(registers):
+    """Estimated distinct values from a {register index: rank} mapping."""
+    total = HLL_REGISTERS - len(registers)  # Empty registers contribute 2**0
+    for rank in registers.values():
+        total += 2.0 ** -rank
+    estimate = _HLL_ALPHA * HLL_REGISTERS * HLL_REGISTERS / total
+    empty = HLL_REGISTERS - len(registers)
+    if estimate <= 2.5 * HLL_REGISTERS and empty:
+        # Linear counting is more accurate for small cardinalities
+        estimate = HLL_REGISTERS * math.log(HLL_REGISTERS / empty)
+    return round(estimate)
+
+def _collection():
+    return GameStats._get_collection()
+
+def record_session(game_type, ip_address):
+    """Count a new session and its player in one atomic update."""
+    index, rank = _hll_register(ip_address)
+    # No upsert: until the first read rebuilds the totals there is nothing to increment
+    _collection().update_one(
+        {'game_type': game_type},
+        {'$inc': {'total_sessions': 1}, '$max': {f'registers.{index}': rank}}
+    )
+
+def record_rounds(game_type, rounds):
+    """Add rounds finished in a session."""
+    if rounds:
+        _collection().update_one({'game_type': game_type}, {'$inc': {'total_rounds': rounds}})
+
+def rebuild(game_type):
+    """Create the counters from the GameSession history if they do not exist yet.
+
+    Runs once per game type; later sessions only update the counters. A session
+    recorded while the rebuild is in flight may be missed. When two first reads
+    race, the unique game_type index keeps one document and the other upsert
+    is dropped.
+    """
+    sessions = GameSession._get_collection()
+    totals = list(sessions.aggregate([
+        {'$match': {'game_type': game_type}},
+        {'$group': {'_id': None, 'sessions': {'$sum': 1}, 'rounds': {'$sum': '$total_rounds'}}}
+    ]))
+    registers = {}
+    for session in sessions.find({'game_type': game_type}, {'ip_address': 1, '_id': 0}):
+        index, rank = _hll_register(session.get('ip_address'))
+        key = str(index)
+        registers[key] = max(registers.get(key, 0), rank)
+
+    try:
+        _collection().update_one(
+            {'game_type': game_type},
+            {'$setOnInsert': {
+                'total_sessions': totals[0]['sessions'] if totals else 0,
+                'total_rounds': totals[0]['rounds'] if totals else 0,
+                'registers': registers,
+                'date': datetime.utcnow()
+            }},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # Another worker created the counters first; they hold the same totals
+        pass
+
+def read_stats(game_type):
+    """Totals for one game type, building the counters on first use."""
+    document = _collection().find_one({'game_type': game_type}, {'_id': 0})
+    if document is None:
+        rebuild(game_type)
+        document = _collection().find_one({'game_type': game_type}, {'_id': 0})
+    return {
+        'total_sessions': document.get('total_sessions', 0),
+        'total_rounds': document.get('total_rounds', 0),
+        'unique_players': hll_estimate(document.get('registers', {}))
+    }
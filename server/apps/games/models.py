@@ -49,7 +49,10 @@ class GameSession(Document):
         }
 
 class GameStats(Document):
-    """Model for storing aggregated game statistics"""
+    """Model for storing aggregated game statistics
+
+    One document per game type holds running totals, maintained by game_stats.
+    """
     
     game_type = StringField(max_length=50, required=True)
     date = DateTimeField(default=datetime.utcnow)
@@ -57,11 +60,12 @@ class GameStats(Document):
     total_rounds = IntField(default=0)
     unique_players = IntField(default=0)
     average_rounds_per_session = IntField(default=0)
+    registers = DictField()  # HyperLogLog registers of player IPs: {index: rank}
     
     meta = {
         'collection': 'game_stats',
         'indexes': [
-            'game_type',
+            {'fields': ['game_type'], 'unique': True},
             'date'
         ],
         'ordering': ['-date']
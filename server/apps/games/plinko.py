@@ -0,0 +1,180 @@
+"""
+Provably fair Plinko verification for the games API
+Replays (server_seed, client_seed, nonce) rounds through the headless engine
+that lives in the repository root next to BLinko.py.
+"""
+
+import functools
+import logging
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+# The engine is shared with the pygame client, so import it from the repo root
+REPO_ROOT = str(settings.BASE_DIR.parent)
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+
+from plinko_engine import PlinkoEngine, hash_seed, round_hash, round_kicks  # noqa: E402
+from plinko_cache import OutcomeCache  # noqa: E402
+from plinko_trajectory import record_round  # noqa: E402
+
+try:
+    from plinko_batch import PlinkoBatch  # noqa: E402
+except ImportError:  # Verification falls back to the scalar engine without NumPy
+    PlinkoBatch = None
+
+# Small requests are answered in-process from the outcome cache
+_cache = OutcomeCache(max_entries=settings.PLINKO_CACHE_ENTRIES)
+
+# Streamed path positions are sent as integers in 1/PATH_SCALE pixel steps
+PATH_SCALE = 8
+
+logger = logging.getLogger(__name__)
+
+# Large batches are spread over a lazily created worker pool
+_pool = None
+_pool_lock = threading.Lock()
+_worker_simulator = None
+
+def _init_worker():
+    """Build the board once per worker process."""
+    global _worker_simulator
+    engine = PlinkoEngine()
+    _worker_simulator = PlinkoBatch(engine) if PlinkoBatch else engine
+
+def _simulate_chunk(rounds):
+    """Replay a chunk of (server_seed, client_seed, nonce) rounds and return (final_y, ticks, collisions, capped) tuples."""
+    game_hashes = [round_hash(*r) for r in rounds]
+    kicks = [round_kicks(*r) for r in rounds]
+    if isinstance(_worker_simulator, PlinkoEngine):
+        results = [_worker_simulator.simulate(game_hash, kicks=k) for game_hash, k in zip(game_hashes, kicks)]
+        return [(r['final_y'], r['ticks'], r['collisions'], r['capped']) for r in results]
+
+    # Legacy rounds (no nonce) keep cycling their game hash
+    kicks = [None if isinstance(k, str) else k for k in kicks]
+    results = _worker_simulator.simulate(game_hashes, kicks=kicks)
+    return list(zip(
+        results['final_y'].tolist(),
+        results['ticks'].tolist(),
+        results['collisions'].tolist(),
+        results['capped'].tolist()
+    ))
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=settings.PLINKO_VERIFY_WORKERS, initializer=_init_worker)
+        return _pool
+
+def _drop_pool(pool):
+    """Shut down a broken pool so the next batch starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _map_chunks(chunks):
+    """Per-chunk results from the pool, rebuilding it once if a worker process died."""
+    for attempt in range(2):
+        pool = _get_pool()
+        try:
+            return list(pool.map(_simulate_chunk, chunks))
+        except BrokenProcessPool:
+            _drop_pool(pool)
+            if attempt:
+                raise
+            logger.warning("Plinko verify pool broke; retrying the batch on a new pool")
+
+def verify_rounds(rounds):
+    """Replay each {'server_seed', 'client_seed', 'nonce'} round and return its outcome."""
+    seeds = [(r['server_seed'], r['client_seed'], r.get('nonce')) for r in rounds]
+
+    if len(rounds) <= settings.PLINKO_VERIFY_INLINE_LIMIT:
+        outcomes = [_cache.play_round(*round_seeds) for round_seeds in seeds]
+    else:
+        chunk_size = settings.PLINKO_VERIFY_CHUNK_SIZE
+        chunks = [seeds[i:i + chunk_size] for i in range(0, len(seeds), chunk_size)]
+        engine = _cache.engine
+        results = (values for chunk_results in _map_chunks(chunks) for values in chunk_results)
+        outcomes = [
+            engine.outcome(round_hash(*round_seeds), *values)
+            for round_seeds, values in zip(seeds, results)
+        ]
+
+    return [
+        {
+            'server_seed_hash': hash_seed(r['server_seed']),
+            'client_seed': r['client_seed'],
+            'nonce': r.get('nonce'),
+            'game_hash': outcome['game_hash'],
+            'bin_index': outcome['bin_index'],
+            'label': outcome['label'],
+            'multiplier': outcome['multiplier'],
+            'final_y': outcome['final_y'],
+            'ticks': outcome['ticks'],
+            'capped': outcome['capped']
+        }
+        for r, outcome in zip(rounds, outcomes)
+    ]
+
+@functools.lru_cache(maxsize=settings.PLINKO_PATH_CACHE_ENTRIES)
+def _recording(server_seed, client_seed, nonce):
+    """Run a round once; every viewer of it is served from this recording."""
+    game_hash = round_hash(server_seed, client_seed, nonce)
+    return record_round(_cache.engine, game_hash, kicks=round_kicks(server_seed, client_seed, nonce))
+
+def path_events(server_seed, client_seed, nonce=None, every=settings.PLINKO_PATH_KEYFRAME_TICKS):
+    """Simulate a round and return a generator of (event, payload) pairs for streaming.
+
+    Keyframes are [tick, x, y] with x and y quantised to 1/PATH_SCALE pixels,
+    taken every `every` ticks plus every collision tick and the final tick,
+    so the browser only interpolates between them.
+    """
+    game_hash = round_hash(server_seed, client_seed, nonce)
+    trajectory = _recording(server_seed, client_seed, nonce)
+    outcome = trajectory.outcome(_cache.engine)
+    header = {
+        'server_seed_hash': hash_seed(server_seed),
+        'client_seed': client_seed,
+        'nonce': nonce,
+        'game_hash': game_hash,
+        'scale': PATH_SCALE,
+        'ticks': len(trajectory),
+        'start': [round(trajectory.start_x * PATH_SCALE), round(trajectory.start_y * PATH_SCALE)]
+    }
+    return _iter_path(trajectory, outcome, header, every)
+
+def _iter_path(trajectory, outcome, header, every):
+    yield 'round', header
+
+    bounces = {tick for tick, _ in trajectory.collisions()}
+    last_tick = len(trajectory)
+    chunk_frames = settings.PLINKO_PATH_CHUNK_FRAMES
+    frames = []
+    for tick, (x, y) in enumerate(trajectory.positions(), start=1):
+        if tick % every == 0 or tick in bounces or tick == last_tick:
+            frames.append([tick, round(x * PATH_SCALE), round(y * PATH_SCALE)])
+            if len(frames) == chunk_frames:
+                yield 'keyframes', {'frames': frames}
+                frames = []
+    if frames:
+        yield 'keyframes', {'frames': frames}
+
+    yield 'outcome', {
+        'bin_index': outcome['bin_index'],
+        'label': outcome['label'],
+        'multiplier': outcome['multiplier'],
+        'final_y': outcome['final_y'],
+        'capped': outcome['capped'],
+        'trajectory_digest': outcome['trajectory_digest']
+    }
+
+def cache_stats():
+    """Outcome cache counters for this worker."""
+    return _cache.stats()
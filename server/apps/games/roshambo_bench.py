@@ -0,0 +1,103 @@
+"""
+Adaptive Roshambo opponent benchmark
+Plays many concurrent sessions against the pattern model, interleaving
+moves across sessions, and reports the cost per move, memory per session
+and how often the opponent wins against a few scripted players.
+
+Run from the server directory:
+    python -m apps.games.roshambo_bench --sessions 5000 --moves 500000
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from .game_logic import PatternModel, RoshamboGame
+from .session_store import dump_game
+
+# Scripted players: (session index, round number) -> move index
+PLAYERS = {
+    'random': lambda session, turn: random.randrange(3),
+    'cycle': lambda session, turn: (session + turn) % 3,
+    'biased': lambda session, turn: 0 if random.random() < 0.5 else random.randrange(1, 3),
+    'copy-last': None  # Plays the computer's previous move, filled in by the game loop
+}
+
+def _player_moves(player, sessions, moves):
+    """Pre-generate (session, move) pairs so move generation stays out of the timings."""
+    script = PLAYERS[player] or PLAYERS['random']
+    turns = [0] * sessions
+    schedule = []
+    for _ in range(moves):
+        session = random.randrange(sessions)
+        schedule.append((session, script(session, turns[session])))
+        turns[session] += 1
+    return schedule
+
+def bench_model(sessions, moves, repeats=3):
+    """Nanoseconds per predict + update with moves spread over `sessions` models (best of `repeats`)."""
+    schedule = _player_moves('random', sessions, moves)
+    best = None
+    for _ in range(repeats):
+        models = [PatternModel() for _ in range(sessions)]
+        started = time.perf_counter()
+        for session, move in schedule:
+            model = models[session]
+            model.predict()
+            model.update(move)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best / moves * 1e9
+
+def bench_games(player, sessions, moves):
+    """Play `moves` rounds over `sessions` adaptive games; return (ns per round, computer win rate, tie rate, games)."""
+    games = [RoshamboGame(adaptive=True) for _ in range(sessions)]
+    schedule = _player_moves(player, sessions, moves)
+    choices = RoshamboGame.CHOICES
+    started = time.perf_counter()
+    for session, move in schedule:
+        game = games[session]
+        if player == 'copy-last' and game.history:
+            game.play_round(game.history[-1]['computer_choice'])
+        else:
+            game.play_round(choices[move])
+    elapsed = time.perf_counter() - started
+    computer_wins = sum(game.computer_wins for game in games)
+    ties = sum(game.ties for game in games)
+    return elapsed / moves * 1e9, computer_wins / moves, ties / moves, games
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the adaptive Roshambo opponent")
+    parser.add_argument('--sessions', type=int, default=5000, help="Concurrent sessions")
+    parser.add_argument('--moves', type=int, default=500_000, help="Moves spread over all sessions")
+    parser.add_argument('--budget-ns', type=float, default=1000.0, help="Latency budget per model move")
+    parser.add_argument('--seed', type=int, help="Seed for a repeatable run")
+    args = parser.parse_args(argv)
+
+    if args.sessions <= 0 or args.moves <= 0:
+        parser.error("sessions and moves must be positive")
+    random.seed(args.seed)
+
+    model_ns = bench_model(args.sessions, args.moves)
+    print(f"Model move (predict + update): {model_ns:,.0f} ns over {args.sessions:,} sessions")
+
+    print("")
+    print(f"{'player':>10} | {'ns/round':>9} | {'computer wins':>13} | {'ties':>7}")
+    games = []
+    for player in PLAYERS:
+        round_ns, win_rate, tie_rate, games = bench_games(player, args.sessions, args.moves)
+        print(f"{player:>10} | {round_ns:9,.0f} | {win_rate * 100:12.2f}% | {tie_rate * 100:6.2f}%")
+
+    model_bytes = PatternModel.SIZE + 2
+    session_bytes = sum(len(dump_game(game)) for game in games) / len(games)
+    print("")
+    print(f"Model state:     {model_bytes} bytes per session (fixed)")
+    print(f"Session payload: {session_bytes:,.0f} bytes on average, history included")
+
+    within = model_ns <= args.budget_ns
+    print(f"Budget:          {args.budget_ns:,.0f} ns per model move - {'met' if within else 'EXCEEDED'}")
+    return 0 if within else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,30 +3,68 @@ Games app serializers for REST API
 """
 
 from rest_framework import serializers
+from django.conf import settings
 
 class BlackjackActionSerializer(serializers.Serializer):
     """Serializer for blackjack game actions"""
     
     action = serializers.ChoiceField(choices=['start', 'hit', 'stand'], required=True)
-    session_id = serializers.CharField(max_length=100, required=False)
+    session_id = serializers.CharField(max_length=512, required=False)
+    hints = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Include hit/stand EVs and a hint while the hand is in play"
+    )
 
 class RoshamboActionSerializer(serializers.Serializer):
     """Serializer for roshambo game actions"""
     
-    action = serializers.ChoiceField(choices=['play', 'reset'], required=True)
+    action = serializers.ChoiceField(choices=['play', 'play_batch', 'reset'], required=True)
     choice = serializers.ChoiceField(
         choices=['rock', 'paper', 'scissors'], 
         required=False,
         help_text="Required when action is 'play'"
     )
-    session_id = serializers.CharField(max_length=100, required=False)
+    choices = serializers.ListField(
+        child=serializers.ChoiceField(choices=['rock', 'paper', 'scissors']),
+        min_length=1,
+        max_length=settings.ROSHAMBO_BATCH_MAX_ROUNDS,
+        required=False,
+        help_text="Required when action is 'play_batch'"
+    )
+    session_id = serializers.CharField(max_length=512, required=False)
+    adaptive = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Play against the pattern-learning opponent when a new game starts"
+    )
     
     def validate(self, data):
         """Custom validation"""
         if data.get('action') == 'play' and not data.get('choice'):
             raise serializers.ValidationError("Choice is required when action is 'play'")
+        if data.get('action') == 'play_batch' and not data.get('choices'):
+            raise serializers.ValidationError("Choices are required when action is 'play_batch'")
         return data
 
+class PlinkoRoundSerializer(serializers.Serializer):
+    """Serializer for one provably fair Plinko round"""
+    
+    server_seed = serializers.CharField(max_length=128, required=True)
+    client_seed = serializers.CharField(max_length=128, required=True)
+    nonce = serializers.IntegerField(min_value=0, required=False, allow_null=True, default=None)
+
+class PlinkoVerifySerializer(serializers.Serializer):
+    """Serializer for Plinko verification requests"""
+    
+    rounds = PlinkoRoundSerializer(many=True, allow_empty=False, max_length=settings.PLINKO_VERIFY_MAX_ROUNDS)
+
+class PlinkoPathSerializer(PlinkoRoundSerializer):
+    """Serializer for streamed Plinko path requests"""
+    
+    every = serializers.IntegerField(min_value=1, max_value=60, required=False, default=settings.PLINKO_PATH_KEYFRAME_TICKS)
+    stream = serializers.ChoiceField(choices=['json', 'sse'], required=False, default='json')
+
 class GameStatsSerializer(serializers.Serializer):
     """Serializer for game statistics"""
     
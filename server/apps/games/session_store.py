@@ -0,0 +1,475 @@
+"""
+Game session storage for the games API
+Sessions live behind a small store interface so they can be kept in-process
+(LRU with idle timeout), in Redis, where every gunicorn worker sees them, or
+in signed tokens held by the client. Games are stored in a compact binary
+form rather than pickled objects.
+"""
+
+import base64
+import hashlib
+import hmac
+import struct
+import threading
+import time
+import uuid
+from array import array
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+
+from .game_logic import CARD_COUNT, BlackjackGame, BlackjackHand, PatternModel, RoshamboGame, Shoe
+
+# --- Compact serialisation ---
+
+FORMAT_VERSION = 2
+BLACKJACK_TAG = b'B'
+ROSHAMBO_TAG = b'R'
+# Roshambo against the adaptive opponent: the plain layout followed by its model
+ADAPTIVE_ROSHAMBO_TAG = b'A'
+
+WINNERS = [None, 'player', 'dealer', 'tie', 'computer']
+
+# tag, version, game_over, winner, player_wins, dealer_wins, ties, decks, cut,
+# undealt/player/dealer card counts
+BLACKJACK_HEADER = struct.Struct('<cBBBIIIBHHBB')
+# Version 1: single deck, tag through ties, then deck/player/dealer card counts
+BLACKJACK_HEADER_V1 = struct.Struct('<cBBBIIIBBB')
+# tag, version, player_wins, computer_wins, ties, history length
+ROSHAMBO_HEADER = struct.Struct('<cBIIII')
+# last and second-to-last player moves (255 for none), then the model's counters
+PATTERN_MODEL = struct.Struct(f'<BB{PatternModel.SIZE}s')
+
+def _load_shoe(decks, cut, undealt):
+    """Rebuild a shoe from its undealt cards; dealt cards only matter as a multiset."""
+    shoe = Shoe.__new__(Shoe)  # Bypass the constructor, which would shuffle
+    shoe.decks = decks
+    shoe.shuffle_key = None
+    shoe.nonce = None
+    remaining = Counter(undealt)
+    dealt = array('B')
+    for code in range(CARD_COUNT):
+        dealt.extend([code] * (decks - remaining[code]))
+    shoe.cards = dealt + array('B', undealt)
+    shoe.cut = cut
+    shoe.cursor = len(dealt)
+    return shoe
+
+def _load_hand(data):
+    hand = BlackjackHand()
+    for code in data:
+        hand.add_card(code)
+    return hand
+
+def dump_game(game):
+    """Serialise a BlackjackGame or RoshamboGame to bytes."""
+    if isinstance(game, BlackjackGame):
+        # Cards are already int codes 0-51, stored one byte each; only the
+        # undealt part of the shoe is kept
+        shoe = game.deck
+        deck = shoe.cards[shoe.cursor:].tobytes()
+        player = bytes(game.player_hand.cards)
+        dealer = bytes(game.dealer_hand.cards)
+        header = BLACKJACK_HEADER.pack(
+            BLACKJACK_TAG, FORMAT_VERSION, game.game_over, WINNERS.index(game.winner),
+            game.player_wins, game.dealer_wins, game.ties, shoe.decks, shoe.cut,
+            len(deck), len(player), len(dealer)
+        )
+        return header + deck + player + dealer
+
+    if isinstance(game, RoshamboGame):
+        # One byte per round: player choice * 3 + computer choice; the winner is derived
+        choices = RoshamboGame.CHOICES
+        history = bytes(
+            choices.index(entry['player_choice']) * 3 + choices.index(entry['computer_choice'])
+            for entry in game.history
+        )
+        model = game.model
+        header = ROSHAMBO_HEADER.pack(
+            ROSHAMBO_TAG if model is None else ADAPTIVE_ROSHAMBO_TAG, FORMAT_VERSION,
+            game.player_wins, game.computer_wins, game.ties, len(history)
+        )
+        if model is None:
+            return header + history
+        return header + history + PATTERN_MODEL.pack(model.last & 0xff, model.before_last & 0xff, bytes(model.counts))
+
+    raise TypeError(f"Cannot serialise {type(game).__name__}")
+
+def load_game(data):
+    """Rebuild a game serialised by dump_game."""
+    tag = data[:1]
+    if tag == BLACKJACK_TAG:
+        version = data[1]
+        if version == FORMAT_VERSION:
+            (_, _, game_over, winner, player_wins, dealer_wins, ties, decks, cut,
+             deck_count, player_count, dealer_count) = BLACKJACK_HEADER.unpack_from(data)
+            offset = BLACKJACK_HEADER.size
+        elif version == 1:
+            (_, _, game_over, winner, player_wins, dealer_wins, ties,
+             deck_count, player_count, dealer_count) = BLACKJACK_HEADER_V1.unpack_from(data)
+            offset = BLACKJACK_HEADER_V1.size
+            # Single decks used to be replaced once fewer than 10 cards remained,
+            # which could run dry mid-round; they now reshuffle with room for one
+            decks, cut = 1, CARD_COUNT - Shoe.max_round_cards(1)
+        else:
+            raise ValueError("Unsupported session format")
+
+        game = BlackjackGame.__new__(BlackjackGame)
+        # Bypass the constructor, which would build and shuffle a fresh shoe
+        game.deck = _load_shoe(decks, cut, data[offset:offset + deck_count])
+        offset += deck_count
+        game.player_hand = _load_hand(data[offset:offset + player_count])
+        offset += player_count
+        game.dealer_hand = _load_hand(data[offset:offset + dealer_count])
+        game.game_over = bool(game_over)
+        game.winner = WINNERS[winner]
+        game.player_wins = player_wins
+        game.dealer_wins = dealer_wins
+        game.ties = ties
+        return game
+
+    if tag in (ROSHAMBO_TAG, ADAPTIVE_ROSHAMBO_TAG):
+        _, version, player_wins, computer_wins, ties, length = ROSHAMBO_HEADER.unpack_from(data)
+        if version not in (1, FORMAT_VERSION):
+            raise ValueError("Unsupported session format")
+        history = data[ROSHAMBO_HEADER.size:ROSHAMBO_HEADER.size + length]
+
+        game = RoshamboGame()
+        if tag == ADAPTIVE_ROSHAMBO_TAG:
+            last, before_last, counts = PATTERN_MODEL.unpack_from(data, ROSHAMBO_HEADER.size + length)
+            game.model = PatternModel(counts, last if last != 0xff else -1, before_last if before_last != 0xff else -1)
+        game.player_wins = player_wins
+        game.computer_wins = computer_wins
+        game.ties = ties
+        choices = RoshamboGame.CHOICES
+        # History keeps the latest rounds, so numbering ends at the total played
+        first_round = player_wins + computer_wins + ties - len(history) + 1
+        for number, code in enumerate(history, start=first_round):
+            player, computer = choices[code // 3], choices[code % 3]
+            game.history.append({
+                'player_choice': player,
+                'computer_choice': computer,
+                'winner': game._determine_winner(player, computer),
+                'round_number': number
+            })
+        return game
+
+    raise ValueError("Unknown session data")
+
+# Keyed blackjack games are stored without any cards: the shoe is rebuilt from
+# its nonce, and the hands are the cards dealt since the round started.
+KEYED_BLACKJACK_TAG = b'K'
+# tag, version, game_over, winner, player_wins, dealer_wins, ties, decks, cut,
+# shoe nonce, round start, player/dealer card counts
+KEYED_BLACKJACK_HEADER = struct.Struct('<cBBBIIIBH16sHBB')
+
+def dump_keyed_game(game):
+    """Serialise a game whose shoe has a shuffle key, revealing no unseen cards."""
+    if not isinstance(game, BlackjackGame):
+        return dump_game(game)
+    shoe = game.deck
+    if shoe.nonce is None:
+        raise ValueError("Blackjack game does not use a keyed shoe")
+    player_count = len(game.player_hand.cards)
+    dealer_count = len(game.dealer_hand.cards)
+    return KEYED_BLACKJACK_HEADER.pack(
+        KEYED_BLACKJACK_TAG, FORMAT_VERSION, game.game_over, WINNERS.index(game.winner),
+        game.player_wins, game.dealer_wins, game.ties, shoe.decks, shoe.cut, shoe.nonce,
+        shoe.cursor - player_count - dealer_count, player_count, dealer_count
+    )
+
+def load_keyed_game(data, shuffle_key):
+    """Rebuild a game serialised by dump_keyed_game."""
+    if data[:1] != KEYED_BLACKJACK_TAG:
+        return load_game(data)
+    (_, version, game_over, winner, player_wins, dealer_wins, ties, decks, cut, nonce,
+     start, player_count, dealer_count) = KEYED_BLACKJACK_HEADER.unpack_from(data)
+    if version != FORMAT_VERSION:
+        raise ValueError("Unsupported session format")
+
+    game = BlackjackGame.__new__(BlackjackGame)
+    game.deck = Shoe.from_nonce(decks, cut, shuffle_key, nonce, start + player_count + dealer_count)
+    cards = game.deck.cards
+    # Deal order: player, dealer, player, dealer, player hits, then dealer draws
+    hits_end = start + 2 + player_count
+    game.player_hand = _load_hand([cards[start], cards[start + 2]] + list(cards[start + 4:hits_end]))
+    game.dealer_hand = _load_hand([cards[start + 1], cards[start + 3]] +
+                                  list(cards[hits_end:start + player_count + dealer_count]))
+    game.game_over = bool(game_over)
+    game.winner = WINNERS[winner]
+    game.player_wins = player_wins
+    game.dealer_wins = dealer_wins
+    game.ties = ties
+    return game
+
+# --- Stores ---
+
+class SessionStore:
+    """Interface for keeping games between requests."""
+
+    def get(self, session_id):
+        """Return the game for session_id, or None if it is unknown or expired."""
+        raise NotImplementedError
+
+    # Key for shoes whose order must be recoverable from a nonce, if the store needs one
+    shuffle_key = None
+
+    def set(self, session_id, game):
+        """Save a new or updated game and return the handle the client sends back."""
+        raise NotImplementedError
+
+    def session_id(self, handle):
+        """The stable session id behind a client handle."""
+        return handle
+
+    def delete(self, session_id):
+        raise NotImplementedError
+
+    def stats(self):
+        """Gauges for monitoring: live sessions and estimated bytes."""
+        raise NotImplementedError
+
+# Approximate bytes of an OrderedDict slot, its key string and entry tuple
+ENTRY_OVERHEAD = 200
+
+class MemorySessionStore(SessionStore):
+    """In-process LRU store with an idle timeout; sessions are local to one worker.
+
+    Games are held serialised, so each session costs tens of bytes instead of
+    a graph of Card objects, and the byte gauge is exact up to ENTRY_OVERHEAD.
+    """
+
+    def __init__(self, max_sessions=10000, ttl=3600, clock=time.monotonic):
+        if max_sessions <= 0:
+            raise ValueError("max_sessions must be positive")
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.clock = clock
+        # session_id -> (serialised game, expires_at); oldest activity first
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes_used = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def get(self, session_id):
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            data, expires_at = entry
+            now = self.clock()
+            if expires_at is not None and now >= expires_at:
+                self._remove(session_id)
+                self.expirations += 1
+                return None
+            # Reading counts as activity, keeping expiry order equal to LRU order
+            if expires_at is not None:
+                self._sessions[session_id] = (data, now + self.ttl)
+            self._sessions.move_to_end(session_id)
+        return load_game(data)
+
+    def set(self, session_id, game):
+        data = dump_game(game)
+        now = self.clock()
+        expires_at = now + self.ttl if self.ttl else None
+        with self._lock:
+            if session_id in self._sessions:
+                self._remove(session_id)
+            self._sessions[session_id] = (data, expires_at)
+            self.bytes_used += len(data) + ENTRY_OVERHEAD
+            self._sweep(now)
+            while len(self._sessions) > self.max_sessions:
+                self._remove(next(iter(self._sessions)))
+                self.evictions += 1
+        return session_id
+
+    def delete(self, session_id):
+        with self._lock:
+            if session_id in self._sessions:
+                self._remove(session_id)
+
+    def stats(self):
+        with self._lock:
+            self._sweep(self.clock())
+            return {
+                'backend': 'memory',
+                'sessions': len(self._sessions),
+                'max_sessions': self.max_sessions,
+                'estimated_bytes': self.bytes_used,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+    def _sweep(self, now):
+        """Drop idle sessions; every entry shares the TTL, so they sit at the front."""
+        if not self.ttl:
+            return
+        while self._sessions:
+            session_id, (_, expires_at) = next(iter(self._sessions.items()))
+            if expires_at > now:
+                return
+            self._remove(session_id)
+            self.expirations += 1
+
+    def _remove(self, session_id):
+        data, _ = self._sessions.pop(session_id)
+        self.bytes_used -= len(data) + ENTRY_OVERHEAD
+
+def _redis_client(url):
+    import redis  # Only needed when a Redis-backed store is configured
+    return redis.Redis.from_url(url)
+
+class RedisSessionStore(SessionStore):
+    """Redis store shared by every worker; keys expire after `ttl` seconds idle.
+
+    `client` is anything with redis-py's get/set(ex=)/delete/dbsize, so a
+    local fake can stand in for a server.
+    """
+
+    def __init__(self, client, prefix='games:session:', ttl=3600):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        return cls(_redis_client(url), **kwargs)
+
+    def get(self, session_id):
+        data = self.client.get(self.prefix + session_id)
+        return load_game(data) if data is not None else None
+
+    def set(self, session_id, game):
+        self.client.set(self.prefix + session_id, dump_game(game), ex=self.ttl or None)
+        return session_id
+
+    def delete(self, session_id):
+        self.client.delete(self.prefix + session_id)
+
+    def stats(self):
+        # Redis expires idle keys itself, so counters kept in set/delete would
+        # drift; DBSIZE is O(1) but counts every key in the database, so give
+        # sessions a database of their own if the gauge matters
+        return {
+            'backend': 'redis',
+            'keys': self.client.dbsize()
+        }
+
+# version, session uuid, issued at (unix seconds), session round
+TOKEN_HEADER = struct.Struct('<B16sII')
+TOKEN_VERSION = 2
+TOKEN_MAC_BYTES = 16
+
+class TokenSessionStore(SessionStore):
+    """Stateless store: each game travels to the client in an HMAC-signed token.
+
+    set() returns the token as the client's handle and get() verifies it, so
+    any worker can serve any request without shared storage. Blackjack shoes
+    are keyed, so tokens carry a shoe nonce instead of the unseen cards.
+
+    On its own a token cannot be revoked: until it expires `ttl` seconds after
+    issue, a client can resend an older one, e.g. hit, see the card, then
+    stand on the token from before the hit. With a `ledger` (a redis-py
+    client) each session keeps a round counter that every set() bumps, and
+    only the token carrying the current round verifies. Two requests racing
+    on the same token can both pass before either saves.
+    """
+
+    def __init__(self, secret, ttl=3600, clock=time.time, ledger=None, prefix='games:token-round:'):
+        secret = secret.encode() if isinstance(secret, str) else secret
+        self.signing_key = hmac.new(secret, b'games:session-token', hashlib.sha256).digest()
+        self.shuffle_key = hmac.new(secret, b'games:shoe', hashlib.sha256).digest()
+        self.ttl = ttl
+        self.clock = clock
+        self.ledger = ledger
+        self.prefix = prefix
+        self.issued = 0
+        self.rejected = 0
+        self.replayed = 0
+
+    def get(self, handle):
+        payload = self._verify(handle)
+        if payload is None:
+            return None
+        try:
+            return load_keyed_game(payload[TOKEN_HEADER.size:], self.shuffle_key)
+        except (ValueError, IndexError, struct.error):
+            self.rejected += 1
+            return None
+
+    def set(self, session_id, game):
+        session_round = 0
+        if self.ledger is not None:
+            key = self.prefix + session_id
+            session_round = self.ledger.incr(key)
+            if self.ttl:
+                self.ledger.expire(key, self.ttl)
+        header = TOKEN_HEADER.pack(TOKEN_VERSION, uuid.UUID(session_id).bytes, int(self.clock()), session_round)
+        payload = header + dump_keyed_game(game)
+        token = payload + hmac.new(self.signing_key, payload, hashlib.sha256).digest()[:TOKEN_MAC_BYTES]
+        self.issued += 1
+        return base64.urlsafe_b64encode(token).rstrip(b'=').decode('ascii')
+
+    def session_id(self, handle):
+        payload = self._verify(handle)
+        if payload is None:
+            return None
+        return str(uuid.UUID(bytes=TOKEN_HEADER.unpack_from(payload)[1]))
+
+    def delete(self, session_id):
+        # Without a ledger nothing is stored; the client simply drops the token
+        if self.ledger is not None:
+            self.ledger.delete(self.prefix + session_id)
+
+    def stats(self):
+        return {
+            'backend': 'token',
+            'ttl': self.ttl,
+            'replay_protection': self.ledger is not None,
+            'issued': self.issued,
+            'rejected': self.rejected,
+            'replayed': self.replayed
+        }
+
+    def _verify(self, handle):
+        """Return the signed payload of a valid, unexpired token, else None."""
+        try:
+            token = base64.urlsafe_b64decode(handle + '=' * (-len(handle) % 4))
+        except (ValueError, TypeError):
+            token = b''
+        payload, mac = token[:-TOKEN_MAC_BYTES], token[-TOKEN_MAC_BYTES:]
+        expected = hmac.new(self.signing_key, payload, hashlib.sha256).digest()[:TOKEN_MAC_BYTES]
+        if len(payload) < TOKEN_HEADER.size or not hmac.compare_digest(mac, expected):
+            self.rejected += 1
+            return None
+        version, session_uuid, issued_at, session_round = TOKEN_HEADER.unpack_from(payload)
+        if version != TOKEN_VERSION or (self.ttl and self.clock() - issued_at >= self.ttl):
+            self.rejected += 1
+            return None
+        if self.ledger is not None:
+            # Only the most recently issued token of a session is live
+            current = self.ledger.get(self.prefix + str(uuid.UUID(bytes=session_uuid)))
+            if current is None or int(current) != session_round:
+                self.rejected += 1
+                self.replayed += 1
+                return None
+        return payload
+
+_store = None
+
+def get_session_store():
+    """The configured store, created on first use."""
+    global _store
+    if _store is None:
+        if settings.GAME_SESSION_BACKEND == 'redis':
+            _store = RedisSessionStore.from_url(settings.GAME_SESSION_REDIS_URL, ttl=settings.GAME_SESSION_TTL)
+        elif settings.GAME_SESSION_BACKEND == 'token':
+            ledger = _redis_client(settings.GAME_SESSION_REDIS_URL) if settings.GAME_SESSION_TOKEN_LEDGER else None
+            _store = TokenSessionStore(settings.SECRET_KEY, ttl=settings.GAME_SESSION_TTL, ledger=ledger)
+        else:
+            _store = MemorySessionStore(max_sessions=settings.GAME_SESSION_MAX, ttl=settings.GAME_SESSION_TTL)
+    return _store
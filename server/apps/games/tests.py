@@ -0,0 +1,1054 @@
+"""
+Tests for the games app: session serialisation, the session stores, the
+blackjack shoe and blackjack odds
+"""
+
+import io
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+from concurrent.futures.process import BrokenProcessPool
+from copy import deepcopy
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from pymongo.errors import DuplicateKeyError
+
+from . import blackjack_odds, blackjack_sim, game_stats
+from .game_logic import CARDS, BlackjackGame, BlackjackHand, Card, PatternModel, RoshamboGame, Shoe, card_dict, encode_card
+from .session_store import (
+    BLACKJACK_HEADER_V1, BLACKJACK_TAG, WINNERS, MemorySessionStore, RedisSessionStore, TokenSessionStore,
+    dump_game, dump_keyed_game, load_game, load_keyed_game
+)
+
+class FakeRedis:
+    """Dict-backed stand-in for the parts of redis-py the store uses"""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = bytes(value)
+        self.expiry[key] = ex
+
+    def delete(self, key):
+        self.data.pop(key, None)
+        self.expiry.pop(key, None)
+
+    def incr(self, key):
+        value = int(self.data.get(key, b'0')) + 1
+        self.data[key] = str(value).encode()
+        return value
+
+    def expire(self, key, seconds):
+        self.expiry[key] = seconds
+
+    def dbsize(self):
+        return len(self.data)
+
+class FakeCollection:
+    """List-backed stand-in for the pymongo calls game_stats makes on one game type"""
+
+    def __init__(self, documents=()):
+        self.documents = [deepcopy(document) for document in documents]
+
+    def _match(self, query):
+        return [d for d in self.documents if all(d.get(k) == v for k, v in query.items())]
+
+    def find_one(self, query, projection=None):
+        matches = self._match(query)
+        return deepcopy(matches[0]) if matches else None
+
+    def find(self, query, projection=None):
+        return [{'ip_address': d.get('ip_address')} for d in self._match(query)]
+
+    def aggregate(self, pipeline):
+        matches = self._match(pipeline[0]['$match'])
+        if not matches:
+            return []
+        return [{'_id': None, 'sessions': len(matches), 'rounds': sum(d.get('total_rounds', 0) for d in matches)}]
+
+    def update_one(self, query, update, upsert=False):
+        matches = self._match(query)
+        if not matches:
+            if not upsert:
+                return
+            document = dict(query, **update.get('$setOnInsert', {}))
+            self.documents.append(document)
+            return
+        document = matches[0]
+        for field, amount in update.get('$inc', {}).items():
+            document[field] = document.get(field, 0) + amount
+        for path, value in update.get('$max', {}).items():
+            parent, key = path.split('.')
+            registers = document.setdefault(parent, {})
+            registers[key] = max(registers.get(key, 0), value)
+
+class FakeClock:
+    """Clock the tests move by hand"""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def played_blackjack(decks=1, shuffle_key=None, hits=1):
+    """A blackjack game a few rounds into its shoe, with a hand in play if one was dealt"""
+    game = BlackjackGame(decks, shuffle_key=shuffle_key)
+    for _ in range(3):
+        game.start_new_game()
+        game.stand()
+    game.start_new_game()
+    for _ in range(hits):
+        game.hit()
+    return game
+
+def played_roshambo(adaptive=False):
+    game = RoshamboGame(adaptive=adaptive)
+    for choice in ['rock', 'paper', 'scissors', 'rock', 'rock']:
+        game.play_round(choice)
+    return game
+
+class TestSerialisation(SimpleTestCase):
+    """Test games survive a dump/load round trip"""
+
+    def assertSameBlackjack(self, loaded, game):
+        self.assertEqual(loaded.player_hand.cards, game.player_hand.cards)
+        self.assertEqual(loaded.dealer_hand.cards, game.dealer_hand.cards)
+        self.assertEqual(loaded.deck.cards[loaded.deck.cursor:], game.deck.cards[game.deck.cursor:])
+        self.assertEqual(loaded.deck.cut, game.deck.cut)
+        self.assertEqual(loaded.deck.decks, game.deck.decks)
+        self.assertEqual(loaded.get_game_state(), game.get_game_state())
+
+    def test_blackjack_round_trip(self):
+        """Test a blackjack game keeps its hands, shoe and totals"""
+        for decks in (1, 6):
+            game = played_blackjack(decks)
+            self.assertSameBlackjack(load_game(dump_game(game)), game)
+
+    def test_blackjack_keeps_dealing(self):
+        """Test a reloaded shoe deals the same cards as the original"""
+        game = played_blackjack()
+        loaded = load_game(dump_game(game))
+        self.assertEqual(loaded.stand(), game.stand())
+        self.assertEqual(loaded.start_new_game(), game.start_new_game())
+
+    def test_blackjack_v1_session(self):
+        """Test a version 1 single-deck session still loads"""
+        game = played_blackjack()
+        deck = game.deck.cards[game.deck.cursor:].tobytes()
+        player = bytes(game.player_hand.cards)
+        dealer = bytes(game.dealer_hand.cards)
+        data = BLACKJACK_HEADER_V1.pack(
+            BLACKJACK_TAG, 1, game.game_over, WINNERS.index(game.winner),
+            game.player_wins, game.dealer_wins, game.ties, len(deck), len(player), len(dealer)
+        ) + deck + player + dealer
+
+        loaded = load_game(data)
+        self.assertEqual(loaded.deck.decks, 1)
+        self.assertEqual(loaded.deck.cards[loaded.deck.cursor:].tobytes(), deck)
+        self.assertEqual(loaded.get_game_state(), game.get_game_state())
+        # Rounds keep dealing, reshuffling before the shoe can run dry
+        for _ in range(50):
+            loaded.start_new_game()
+            loaded.stand()
+
+    def test_keyed_blackjack_round_trip(self):
+        """Test a keyed game rebuilds its shoe from the nonce alone"""
+        key = b'k' * 32
+        game = played_blackjack(shuffle_key=key, hits=2)
+        data = dump_keyed_game(game)
+        self.assertNotIn(game.deck.cards[game.deck.cursor:].tobytes(), data)
+        self.assertSameBlackjack(load_keyed_game(data, key), game)
+
+    def test_roshambo_round_trip(self):
+        """Test Roshambo history, totals and the adaptive model survive"""
+        for adaptive in (False, True):
+            game = played_roshambo(adaptive)
+            loaded = load_game(dump_game(game))
+            self.assertEqual(loaded.get_stats(), game.get_stats())
+            self.assertEqual(loaded.history, game.history)
+            if adaptive:
+                self.assertEqual(bytes(loaded.model.counts), bytes(game.model.counts))
+                self.assertEqual(loaded.model.predict(), game.model.predict())
+            else:
+                self.assertIsNone(loaded.model)
+
+    def test_unknown_data_rejected(self):
+        """Test data that is not a session raises ValueError"""
+        with self.assertRaises(ValueError):
+            load_game(b'Znot a session')
+
+class TestMemorySessionStore(SimpleTestCase):
+    """Test the in-process LRU store"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.store = MemorySessionStore(max_sessions=3, ttl=60, clock=self.clock)
+
+    def test_get_returns_saved_game(self):
+        """Test a saved game comes back under its session id"""
+        game = played_roshambo()
+        self.assertEqual(self.store.set('a', game), 'a')
+        self.assertEqual(self.store.get('a').get_stats(), game.get_stats())
+        self.assertIsNone(self.store.get('missing'))
+
+    def test_least_recently_used_evicted(self):
+        """Test the store evicts the session idle longest once full"""
+        for session_id in 'abc':
+            self.store.set(session_id, played_roshambo())
+        self.store.get('a')
+        self.store.set('d', played_roshambo())
+
+        self.assertIsNone(self.store.get('b'))
+        self.assertIsNotNone(self.store.get('a'))
+        stats = self.store.stats()
+        self.assertEqual(stats['sessions'], 3)
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual(stats['expirations'], 0)
+
+    def test_idle_sessions_expire(self):
+        """Test sessions expire after the TTL, and reads keep them alive"""
+        self.store.set('a', played_roshambo())
+        self.store.set('b', played_roshambo())
+        self.clock.now += 40
+        self.store.get('a')
+        self.clock.now += 30
+
+        self.assertIsNotNone(self.store.get('a'))
+        self.assertIsNone(self.store.get('b'))
+        self.assertEqual(self.store.stats()['expirations'], 1)
+
+        self.clock.now += 60
+        stats = self.store.stats()
+        self.assertEqual(stats['sessions'], 0)
+        self.assertEqual(stats['expirations'], 2)
+        self.assertEqual(stats['estimated_bytes'], 0)
+
+    def test_bytes_tracked(self):
+        """Test the byte gauge follows saves, overwrites and deletes"""
+        game = played_roshambo()
+        self.store.set('a', game)
+        used = self.store.stats()['estimated_bytes']
+        self.assertGreater(used, len(dump_game(game)))
+        self.store.set('a', game)
+        self.assertEqual(self.store.stats()['estimated_bytes'], used)
+        self.store.delete('a')
+        self.assertEqual(self.store.stats()['estimated_bytes'], 0)
+
+class TestRedisSessionStore(SimpleTestCase):
+    """Test the Redis store against a dict-backed client"""
+
+    def setUp(self):
+        self.client = FakeRedis()
+        self.store = RedisSessionStore(self.client, ttl=120)
+
+    def test_round_trip(self):
+        """Test games are stored under the prefix with the TTL"""
+        game = played_blackjack()
+        self.assertEqual(self.store.set('abc', game), 'abc')
+        self.assertEqual(self.client.expiry['games:session:abc'], 120)
+        self.assertEqual(self.store.get('abc').get_game_state(), game.get_game_state())
+        self.assertIsNone(self.store.get('missing'))
+
+    def test_delete_and_stats(self):
+        """Test stats report the database size without walking keys, and delete removes them"""
+        self.store.set('a', played_roshambo())
+        self.store.set('b', played_roshambo(adaptive=True))
+        self.assertEqual(self.store.stats(), {'backend': 'redis', 'keys': 2})
+
+        self.store.delete('a')
+        self.assertIsNone(self.store.get('a'))
+        self.assertEqual(self.store.stats()['keys'], 1)
+
+class TestTokenSessionStore(SimpleTestCase):
+    """Test signed game tokens"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.store = TokenSessionStore('secret', ttl=3600, clock=self.clock)
+        self.session_id = str(uuid.uuid4())
+
+    def test_round_trip(self):
+        """Test a token carries the game and its session id"""
+        game = played_blackjack(shuffle_key=self.store.shuffle_key)
+        token = self.store.set(self.session_id, game)
+        self.assertEqual(self.store.session_id(token), self.session_id)
+        self.assertEqual(self.store.get(token).get_game_state(), game.get_game_state())
+
+        roshambo = played_roshambo(adaptive=True)
+        self.assertEqual(self.store.get(self.store.set(self.session_id, roshambo)).history, roshambo.history)
+
+    def test_tampered_token_rejected(self):
+        """Test changing any character of a token invalidates it"""
+        token = self.store.set(self.session_id, played_roshambo())
+        for position in (0, len(token) // 2, len(token) - 2):
+            replacement = 'A' if token[position] != 'A' else 'B'
+            tampered = token[:position] + replacement + token[position + 1:]
+            self.assertIsNone(self.store.get(tampered))
+            self.assertIsNone(self.store.session_id(tampered))
+        self.assertIsNone(self.store.get('not a token'))
+        self.assertIsNone(self.store.get(''))
+        self.assertEqual(self.store.stats()['rejected'], 8)
+
+    def test_expired_token_rejected(self):
+        """Test tokens stop verifying once the TTL has passed"""
+        token = self.store.set(self.session_id, played_roshambo())
+        self.clock.now += 3599
+        self.assertIsNotNone(self.store.get(token))
+        self.clock.now += 1
+        self.assertIsNone(self.store.get(token))
+
+    def test_replay_needs_ledger(self):
+        """Test older tokens keep verifying when no ledger is configured"""
+        game = played_blackjack(shuffle_key=self.store.shuffle_key, hits=0)
+        before_hit = self.store.set(self.session_id, game)
+        game.hit()
+        self.store.set(self.session_id, game)
+        self.assertIsNotNone(self.store.get(before_hit))
+        self.assertFalse(self.store.stats()['replay_protection'])
+
+    def test_ledger_rejects_used_tokens(self):
+        """Test only the latest token of a session verifies with a ledger"""
+        ledger = FakeRedis()
+        store = TokenSessionStore('secret', ttl=3600, clock=self.clock, ledger=ledger)
+        game = played_blackjack(shuffle_key=store.shuffle_key, hits=0)
+        before_hit = store.set(self.session_id, game)
+        game.hit()
+        after_hit = store.set(self.session_id, game)
+
+        self.assertIsNone(store.get(before_hit))
+        self.assertIsNone(store.session_id(before_hit))
+        self.assertEqual(store.get(after_hit).get_game_state(), game.get_game_state())
+        # Reading a game does not use up its token
+        self.assertIsNotNone(store.get(after_hit))
+        self.assertEqual(ledger.expiry['games:token-round:' + self.session_id], 3600)
+        self.assertEqual(store.stats()['replayed'], 2)
+
+        # Sessions are independent, and deleting one revokes its last token
+        other = store.set(str(uuid.uuid4()), played_roshambo())
+        store.delete(self.session_id)
+        self.assertIsNone(store.get(after_hit))
+        self.assertIsNotNone(store.get(other))
+
+        # A ledger on another store shares the counters, as Redis does across workers
+        worker = TokenSessionStore('secret', ttl=3600, clock=self.clock, ledger=ledger)
+        self.assertIsNotNone(worker.get(other))
+
+    def test_wrong_key_rejected(self):
+        """Test a token signed with another secret does not verify"""
+        other = TokenSessionStore('other secret', clock=self.clock)
+        token = other.set(self.session_id, played_roshambo())
+        self.assertIsNone(self.store.get(token))
+        self.assertIsNotNone(other.get(token))
+
+def distinct_ips(count, start=0):
+    return [f'10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}' for i in range(start, start + count)]
+
+class TestGameStats(SimpleTestCase):
+    """Test the incremental counters and unique player sketch without MongoDB"""
+
+    def setUp(self):
+        self.stats = FakeCollection()
+        self.sessions = FakeCollection([
+            {'game_type': 'roshambo', 'ip_address': ip, 'total_rounds': 3}
+            for ip in distinct_ips(40) * 2
+        ] + [{'game_type': 'blackjack', 'ip_address': '10.0.0.1', 'total_rounds': 5}])
+        patches = [
+            mock.patch.object(game_stats, '_collection', return_value=self.stats),
+            mock.patch.object(game_stats.GameSession, '_get_collection', return_value=self.sessions)
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_register(self):
+        """Test values map deterministically to a register and a 1-based rank"""
+        seen = set()
+        for ip in distinct_ips(2000) + [None, '']:
+            index, rank = game_stats._hll_register(ip)
+            self.assertEqual(game_stats._hll_register(ip), (index, rank))
+            self.assertTrue(0 <= index < game_stats.HLL_REGISTERS)
+            self.assertTrue(1 <= rank <= 64 - game_stats.HLL_PRECISION + 1)
+            seen.add(index)
+        # Hashes spread over the registers
+        self.assertGreater(len(seen), game_stats.HLL_REGISTERS * 0.3)
+
+    def sketch(self, values):
+        registers = {}
+        for value in values:
+            index, rank = game_stats._hll_register(value)
+            registers[str(index)] = max(registers.get(str(index), 0), rank)
+        return registers
+
+    def test_estimate_linear_counting(self):
+        """Test small cardinalities use linear counting and stay close"""
+        self.assertEqual(game_stats.hll_estimate({}), 0)
+        self.assertEqual(game_stats.hll_estimate(self.sketch(['10.0.0.1'] * 50)), 1)
+        self.assertAlmostEqual(game_stats.hll_estimate(self.sketch(distinct_ips(500))), 500, delta=500 * 0.02)
+
+    def test_estimate_raw(self):
+        """Test full sketches use the raw HyperLogLog estimate"""
+        registers = {str(index): 1 for index in range(game_stats.HLL_REGISTERS)}
+        self.assertEqual(game_stats.hll_estimate(registers), round(2 * game_stats._HLL_ALPHA * game_stats.HLL_REGISTERS))
+        self.assertAlmostEqual(game_stats.hll_estimate(self.sketch(distinct_ips(50_000))), 50_000, delta=50_000 * 0.05)
+
+    def test_estimate_accuracy(self):
+        """Test 10k distinct IPs, each seen several times, are counted within 5%"""
+        ips = distinct_ips(10_000)
+        self.assertAlmostEqual(game_stats.hll_estimate(self.sketch(ips * 3)), 10_000, delta=10_000 * 0.05)
+
+    def test_record_before_rebuild(self):
+        """Test updates before the first read do not create partial counters"""
+        game_stats.record_session('roshambo', '10.9.9.9')
+        game_stats.record_rounds('roshambo', 4)
+        self.assertEqual(self.stats.documents, [])
+
+    def test_rebuild_then_record(self):
+        """Test the first read rebuilds from history and later updates move the totals"""
+        self.assertEqual(game_stats.read_stats('roshambo'), {'total_sessions': 80, 'total_rounds': 240, 'unique_players': 40})
+        self.assertEqual(game_stats.read_stats('blackjack'), {'total_sessions': 1, 'total_rounds': 5, 'unique_players': 1})
+
+        game_stats.record_session('roshambo', '10.0.0.1')  # Returning player
+        game_stats.record_session('roshambo', '10.9.9.9')
+        game_stats.record_rounds('roshambo', 7)
+        game_stats.record_rounds('roshambo', 0)
+        self.assertEqual(game_stats.read_stats('roshambo'), {'total_sessions': 82, 'total_rounds': 247, 'unique_players': 41})
+
+        # A second rebuild never overwrites live counters
+        game_stats.rebuild('roshambo')
+        self.assertEqual(game_stats.read_stats('roshambo')['total_sessions'], 82)
+
+    def test_rebuild_empty_history(self):
+        """Test a game type without sessions starts at zero"""
+        self.assertEqual(game_stats.read_stats('plinko'), {'total_sessions': 0, 'total_rounds': 0, 'unique_players': 0})
+
+    def test_rebuild_race(self):
+        """Test losing the upsert race to another worker is not an error"""
+        winner = {'game_type': 'roshambo', 'total_sessions': 80, 'total_rounds': 240, 'registers': self.sketch(distinct_ips(40))}
+
+        def lose_race(query, update, upsert=False):
+            self.stats.documents.append(deepcopy(winner))
+            raise DuplicateKeyError('E11000 duplicate key error')
+
+        with mock.patch.object(self.stats, 'update_one', side_effect=lose_race):
+            self.assertEqual(game_stats.read_stats('roshambo'), {'total_sessions': 80, 'total_rounds': 240, 'unique_players': 40})
+
+class TestRoshamboBatch(SimpleTestCase):
+    """Test batched Roshambo rounds"""
+
+    def setUp(self):
+        cache.clear()  # The anonymous throttle counts through the cache
+        patch = mock.patch('apps.games.views.RoshamboGameView._track_session')
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_columns(self):
+        """Test results come back as one column per field, matching the rounds played"""
+        game = RoshamboGame()
+        game.play_round('rock')
+        choices = ['rock', 'paper', 'scissors'] * 50
+        result = game.play_rounds(choices)
+
+        self.assertEqual(set(result), {'first_round', 'rounds', 'computer_choices', 'winners', 'stats'})
+        self.assertEqual(result['first_round'], 2)
+        self.assertEqual(result['rounds'], 150)
+        self.assertEqual(len(result['computer_choices']), 150)
+        for player, computer, winner in zip(choices, result['computer_choices'], result['winners']):
+            self.assertIn(computer, RoshamboGame.CHOICES)
+            self.assertEqual(winner, game._determine_winner(player, computer))
+
+    def test_stats_updated(self):
+        """Test a batch moves the stats and history as the same rounds played one by one would"""
+        game = RoshamboGame()
+        result = game.play_rounds(['paper'] * 120)
+        winners = result['winners']
+        stats = game.get_stats()
+        self.assertEqual(result['stats'], stats)
+        self.assertEqual(stats['player_wins'], winners.count('player'))
+        self.assertEqual(stats['computer_wins'], winners.count('computer'))
+        self.assertEqual(stats['ties'], winners.count('tie'))
+
+        # Only the latest rounds are kept, numbered up to the total played
+        self.assertEqual(len(game.history), RoshamboGame.HISTORY_LIMIT)
+        self.assertEqual(game.history[-1]['round_number'], 120)
+        self.assertEqual(game.history[0]['round_number'], 21)
+        self.assertEqual([entry['winner'] for entry in game.history], winners[20:])
+        self.assertEqual(game.play_round('rock')['round']['round_number'], 121)
+
+    def test_invalid_choice(self):
+        """Test an unknown choice fails the whole batch without playing any of it"""
+        game = RoshamboGame()
+        with self.assertRaises(ValueError):
+            game.play_rounds(['rock', 'lizard'])
+        self.assertEqual(game.get_stats()['total_games'], 0)
+        self.assertEqual(len(game.history), 0)
+
+    def post(self, body):
+        return self.client.post('/api/games/roshambo/', body, content_type='application/json')
+
+    def test_view_plays_batch(self):
+        """Test the view plays a batch on the session's game"""
+        response = self.post({'action': 'play', 'choice': 'rock'})
+        self.assertEqual(response.status_code, 200)
+        handle = response.json()['session_id']
+
+        response = self.post({'action': 'play_batch', 'choices': ['rock', 'paper'], 'session_id': handle})
+        self.assertEqual(response.status_code, 200)
+        result = response.json()['result']
+        self.assertEqual(result['first_round'], 2)
+        self.assertEqual(result['rounds'], 2)
+
+    def test_view_rejects_bad_batches(self):
+        """Test empty, missing and oversized batches get a 400"""
+        bodies = [
+            {'action': 'play_batch', 'choices': []},
+            {'action': 'play_batch'},
+            {'action': 'play_batch', 'choices': ['rock', 'lizard']},
+            {'action': 'play_batch', 'choices': ['rock'] * (settings.ROSHAMBO_BATCH_MAX_ROUNDS + 1)}
+        ]
+        for body in bodies:
+            response = self.post(body)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()['status'], 'error')
+
+        response = self.post({'action': 'play_batch', 'choices': ['rock'] * settings.ROSHAMBO_BATCH_MAX_ROUNDS})
+        self.assertEqual(response.status_code, 200)
+
+class TestAdaptiveRoshambo(SimpleTestCase):
+    """Test the pattern-learning opponent"""
+
+    CYCLE = ['rock', 'paper', 'scissors']
+
+    def test_model_learns_cycle(self):
+        """Test the model predicts every move of a cycle once it has seen it"""
+        model = PatternModel()
+        for move in [0, 1, 2] * 3:
+            model.update(move)
+        for move in [0, 1, 2] * 300:
+            self.assertEqual(model.predict(), move)
+            model.update(move)
+
+    def test_beats_cycle(self):
+        """Test the adaptive opponent wins over 90% of rounds against a cycle after warm-up"""
+        random.seed(24)
+        game = RoshamboGame(adaptive=True)
+        game.play_rounds(self.CYCLE * 10)
+        winners = game.play_rounds(self.CYCLE * 300)['winners']
+        self.assertGreater(winners.count('computer') / len(winners), 0.9)
+
+        # The plain opponent is not exploitable either way
+        plain = RoshamboGame().play_rounds(self.CYCLE * 300)['winners']
+        self.assertLess(plain.count('computer') / len(plain), 0.5)
+
+    def assertSameAdaptive(self, loaded, game):
+        self.assertIsNotNone(loaded.model)
+        self.assertEqual(bytes(loaded.model.counts), bytes(game.model.counts))
+        self.assertEqual((loaded.model.last, loaded.model.before_last), (game.model.last, game.model.before_last))
+        self.assertEqual(loaded.get_stats(), game.get_stats())
+        self.assertEqual(loaded.history, game.history)
+        # Both keep playing identically from the same random state
+        random.seed(7)
+        expected = game.play_rounds(self.CYCLE * 20)
+        random.seed(7)
+        self.assertEqual(loaded.play_rounds(self.CYCLE * 20), expected)
+
+    def test_survives_compact_serialiser(self):
+        """Test an adaptive game round-trips through dump_game unchanged"""
+        for rounds in (0, 1, 2, 500):
+            game = RoshamboGame(adaptive=True)
+            game.play_rounds((self.CYCLE * 200)[:rounds])
+            self.assertSameAdaptive(load_game(dump_game(game)), game)
+
+    def test_survives_token_serialiser(self):
+        """Test an adaptive game round-trips through a signed token unchanged"""
+        store = TokenSessionStore('secret')
+        game = RoshamboGame(adaptive=True)
+        game.play_rounds(self.CYCLE * 100)
+        self.assertSameAdaptive(store.get(store.set(str(uuid.uuid4()), game)), game)
+
+class TestShoe(SimpleTestCase):
+    """Test the cut card always leaves room for a round"""
+
+    def test_penetration_validated(self):
+        """Test a cut too deep for a full round is rejected"""
+        for decks, penetration in ((1, 0.98), (1, 0.75), (6, 0.95)):
+            with self.assertRaises(ValueError):
+                Shoe(decks, penetration)
+        Shoe(1, 0.65)
+        Shoe(6, 0.9)
+
+    def test_deepest_cut_never_runs_dry(self):
+        """Test hitting every hand to the end at the deepest cut never empties the shoe"""
+        random.seed(11)
+        for decks, penetration in ((1, 0.69), (2, 0.79)):
+            game = BlackjackGame(decks, penetration)
+            for _ in range(5000):
+                game.start_new_game()
+                while not game.game_over:
+                    game.hit()
+                self.assertLessEqual(game.deck.cursor, len(game.deck.cards))
+
+def reference_total(ranks):
+    """Textbook hand total: aces count 1, and one of them 11 if that does not bust"""
+    total = sum(1 if rank == 'A' else 10 if rank in ('10', 'J', 'Q', 'K') else int(rank) for rank in ranks)
+    if 'A' in ranks and total + 10 <= 21:
+        return total + 10, True
+    return total, False
+
+class TestBlackjackHand(SimpleTestCase):
+    """Test card codes and running hand totals"""
+
+    def test_card_encoding(self):
+        """Test codes are suit index * 13 + rank index and map back to the same face"""
+        for suit_index, suit in enumerate(Card.SUITS):
+            for rank_index, rank in enumerate(Card.RANKS):
+                code = suit_index * 13 + rank_index
+                self.assertEqual(encode_card(suit, rank), code)
+                card = Card.from_code(code)
+                self.assertIs(card, CARDS[code])
+                self.assertEqual((card.suit, card.rank, card.code), (suit, rank, code))
+                self.assertEqual(Card(suit, rank).code, code)
+                self.assertEqual(card_dict(code), {
+                    'suit': suit,
+                    'rank': rank,
+                    'value': 11 if rank == 'A' else min(rank_index + 1, 10),
+                    'is_red': suit in ('♥', '♦')
+                })
+        self.assertEqual(len(CARDS), 52)
+        with self.assertRaises(AttributeError):
+            CARDS[0].rank = 'K'
+        # card_dict hands out copies, so responses cannot alter the tables
+        card_dict(0)['value'] = 1
+        self.assertEqual(card_dict(0)['value'], 11)
+
+    def test_soft_ace_transitions(self):
+        """Test aces drop from 11 to 1 one at a time as the hand grows"""
+        ace, six, nine, king = encode_card('♠', 'A'), encode_card('♥', '6'), encode_card('♦', '9'), encode_card('♣', 'K')
+        steps = [
+            (ace, 11, True),    # Soft 11
+            (ace, 12, True),    # A-A: one ace hard, soft 12
+            (nine, 21, True),   # Soft 21, three cards so not blackjack
+            (six, 17, False),   # Both aces hard now
+            (king, 27, False)   # Bust
+        ]
+        result = BlackjackHand()
+        for code, total, soft in steps:
+            result.add_card(code)
+            self.assertEqual((result.value(), result.is_soft()), (total, soft))
+        self.assertTrue(result.is_bust())
+        self.assertFalse(result.is_blackjack())
+        self.assertTrue(hand(ace, king).is_blackjack())
+        self.assertFalse(hand(ace, six, encode_card('♠', '4')).is_blackjack())
+        # Card objects and codes total alike
+        self.assertEqual(hand(CARDS[ace], CARDS[king]).value(), 21)
+
+    def test_totals_match_reference(self):
+        """Test running totals against the reference over 20k random hands"""
+        rng = random.Random(18)
+        for _ in range(20_000):
+            result = BlackjackHand()
+            ranks = []
+            # Favour aces so multi-ace and soft-to-hard hands are common
+            for _ in range(rng.randint(1, 9)):
+                code = rng.choice([rng.randrange(52), rng.randrange(4) * 13])
+                result.add_card(code)
+                ranks.append(Card.RANKS[code % 13])
+                total, soft = reference_total(ranks)
+                self.assertEqual(result.value(), total, ranks)
+                self.assertEqual(result.is_soft(), soft, ranks)
+                self.assertEqual(result.is_bust(), total > 21, ranks)
+                self.assertEqual(result.is_blackjack(), len(ranks) == 2 and total == 21, ranks)
+
+def hand(*codes):
+    result = BlackjackHand()
+    for code in codes:
+        result.add_card(code)
+    return result
+
+class TestBlackjackOdds(SimpleTestCase):
+    """Test the odds attached to blackjack hints stay cheap and bounded"""
+
+    def setUp(self):
+        random.seed(7)
+
+    def clear_caches(self):
+        blackjack_odds.dealer_outcomes.cache_clear()
+        blackjack_odds.dealer_table.cache_clear()
+
+    def mid_shoe_games(self, decks, count):
+        """Games with a hand in play at random points of the shoe"""
+        games = []
+        while len(games) < count:
+            game = BlackjackGame(decks)
+            for _ in range(random.randrange(decks * 8)):
+                game.start_new_game()
+                game.stand()
+            game.start_new_game()
+            if not game.game_over:
+                games.append(game)
+        return games
+
+    def test_cold_queries_fast(self):
+        """Test a query with empty caches stays within a few milliseconds"""
+        for decks in (1, 6, 8):
+            timings = []
+            for game in self.mid_shoe_games(decks, 30):
+                self.clear_caches()
+                started = time.perf_counter()
+                blackjack_odds.hand_odds(game)
+                timings.append(time.perf_counter() - started)
+            self.assertLess(max(timings), 0.1, f"{decks} decks")
+
+    def test_caches_bounded(self):
+        """Test the request path caches are capped at a few MB"""
+        self.clear_caches()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            for game in self.mid_shoe_games(6, 20):
+                blackjack_odds.hand_odds(game)
+            used = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+
+        dealer = blackjack_odds.dealer_outcomes.cache_info()
+        table = blackjack_odds.dealer_table.cache_info()
+        self.assertEqual(blackjack_odds.best_ev.cache_info().currsize, 0)
+        per_entry = used / (dealer.currsize + table.currsize)
+        self.assertLess(per_entry * (dealer.maxsize + table.maxsize), 5 * 1024 * 1024)
+
+    def test_hit_draw_excludes_hole_card(self):
+        """Test a hit draws from the cards left once a non-blackjack hole card is set aside"""
+        counts = (3, 4, 4, 4, 4, 4, 4, 4, 4, 11)
+        packed, remaining = blackjack_odds.pack(counts), sum(counts)
+        dealer_busts = (0.0,) * 5 + (1.0,)
+        # Against a ten the hole card is not an ace, so every ace is still in the shoe
+        ev = blackjack_odds.hit_once_ev(dealer_busts, packed, remaining, 20, False, 9)
+        self.assertAlmostEqual(ev, 2 * 3 / (remaining - 1) - 1)
+        # Against a six the hole card is any card, and is an ace 3 times in `remaining`
+        ace = (3 - 3 / remaining) / (remaining - 1)
+        ev = blackjack_odds.hit_once_ev(dealer_busts, packed, remaining, 20, False, 5)
+        self.assertAlmostEqual(ev, 2 * ace - 1)
+
+    def test_hints(self):
+        """Test hints follow the obvious plays"""
+        game = self.mid_shoe_games(1, 1)[0]
+        game.player_hand = hand(12, 24)  # King, queen
+        self.assertEqual(blackjack_odds.hand_odds(game)['hint'], 'stand')
+        game.player_hand = hand(1, 2)  # Hard 5 cannot bust
+        self.assertEqual(blackjack_odds.hand_odds(game)['hint'], 'hit')
+        game.player_hand = hand(4, 18)  # Hard 11
+        self.assertEqual(blackjack_odds.hand_odds(game)['hint'], 'hit')
+
+class TestBlackjackSim(SimpleTestCase):
+    """Test seeded strategy simulations"""
+
+    def test_play_hands_repeatable(self):
+        """Test a seed fixes the outcome of a table, and every hand is counted once"""
+        for strategy in blackjack_sim.STRATEGIES:
+            result = blackjack_sim.play_hands(strategy, 500, seed=20)
+            self.assertEqual(blackjack_sim.play_hands(strategy, 500, seed=20), result)
+            wins, losses, ties, blackjacks, busts = result
+            self.assertEqual(wins + losses + ties, 500)
+            self.assertLessEqual(busts, losses)
+            self.assertLessEqual(blackjacks, wins + ties)
+        self.assertNotEqual(blackjack_sim.play_hands('basic', 500, seed=21), blackjack_sim.play_hands('basic', 500, seed=20))
+        # Never-bust players stop before any card could take them over 21
+        self.assertEqual(blackjack_sim.play_hands('never-bust', 500, decks=6, penetration=0.8, seed=20)[4], 0)
+
+    def test_run_simulation(self):
+        """Test a pooled run streams one progress line per chunk and repeats under a seed"""
+        out = io.StringIO()
+        stats = blackjack_sim.run_simulation('basic', 2500, 1000, 2, seed=7, out=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len([line for line in lines if 'hands/s' in line and '|' in line]), 3)
+        self.assertIn('=== BASIC ===', lines)
+        self.assertTrue(lines[-1].startswith('Throughput:'))
+
+        # Chunks are seeded from the run seed, whichever worker finishes first
+        expected = [blackjack_sim.play_hands('basic', size, 1, 0.65, 7 + index) for index, size in enumerate((1000, 1000, 500))]
+        self.assertEqual((stats.wins, stats.losses, stats.ties, stats.blackjacks, stats.busts),
+                         tuple(map(sum, zip(*expected))))
+        again = blackjack_sim.run_simulation('basic', 2500, 1000, 2, seed=7, out=io.StringIO())
+        self.assertEqual(again.summary()['house_edge'], stats.summary()['house_edge'])
+
+        summary = stats.summary(elapsed=1.0)
+        self.assertEqual(set(summary), set(blackjack_sim.SimulationStats('basic').summary()))
+        self.assertEqual(summary['hands'], 2500)
+        self.assertAlmostEqual(summary['win_rate'] + summary['loss_rate'] + summary['tie_rate'], 1.0)
+        self.assertLessEqual(summary['ci_low'], summary['house_edge'])
+        self.assertLessEqual(summary['house_edge'], summary['ci_high'])
+        self.assertEqual(summary['hands_per_second'], 2500)
+
+    def test_arguments_validated(self):
+        """Test the command line rejects sizes that cannot run"""
+        for argv in (['--hands', '0'], ['--workers', '0'], ['--penetration', '1'], ['--strategy', 'martingale']):
+            with self.assertRaises(SystemExit), mock.patch('sys.stderr', io.StringIO()):
+                blackjack_sim.main(argv)
+
+class TestPlinkoDeployment(SimpleTestCase):
+    """Test the backend image ships every engine module the API imports"""
+
+    def test_dockerfile_copies_engine_modules(self):
+        """Test every module plinko.py loads from the repository root is copied into the image"""
+        from . import plinko
+        dockerfile = (Path(settings.BASE_DIR) / 'Dockerfile').read_text()
+        copied = set()
+        for line in dockerfile.splitlines():
+            if line.startswith('COPY '):
+                copied.update(line.split()[1:-1])
+
+        root = Path(plinko.REPO_ROOT)
+        imported = {
+            Path(module.__file__).name for module in list(sys.modules.values())
+            if getattr(module, '__file__', None) and Path(module.__file__).parent == root
+        }
+        self.assertIn('plinko_engine.py', imported)
+        self.assertLessEqual(imported, copied)
+
+PLINKO_ROUNDS = [
+    {'server_seed': f'server-{index}', 'client_seed': f'client-{index}', 'nonce': index if index % 3 else None}
+    for index in range(7)
+]
+
+@override_settings(PLINKO_VERIFY_INLINE_LIMIT=2, PLINKO_VERIFY_CHUNK_SIZE=3, PLINKO_VERIFY_WORKERS=2)
+class TestPlinkoVerify(SimpleTestCase):
+    """Test verification replays rounds exactly as the engine plays them"""
+
+    def setUp(self):
+        from . import plinko
+        self.plinko = plinko
+        self.engine = plinko.PlinkoEngine()
+        # The anonymous throttle counts through the cache
+        cache.clear()
+
+    def tearDown(self):
+        pool = self.plinko._pool
+        if pool is not None:
+            self.plinko._drop_pool(pool)
+
+    def assertMatchesEngine(self, results, rounds):
+        self.assertEqual(len(results), len(rounds))
+        for result, r in zip(results, rounds):
+            expected = self.engine.play_round(r['server_seed'], r['client_seed'], r['nonce'])
+            self.assertEqual(result['server_seed_hash'], self.plinko.hash_seed(r['server_seed']))
+            self.assertEqual(result['nonce'], r['nonce'])
+            for key in ('game_hash', 'bin_index', 'label', 'multiplier', 'ticks', 'capped'):
+                self.assertEqual(result[key], expected[key], key)
+            self.assertAlmostEqual(result['final_y'], expected['final_y'], places=6)
+
+    def test_inline_rounds(self):
+        """Test batches up to the inline limit are replayed from the cache"""
+        rounds = PLINKO_ROUNDS[:2]
+        self.assertMatchesEngine(self.plinko.verify_rounds(rounds), rounds)
+        self.assertIsNone(self.plinko._pool)
+
+    def test_chunked_rounds(self):
+        """Test larger batches are split over the pool and keep their order"""
+        self.assertMatchesEngine(self.plinko.verify_rounds(PLINKO_ROUNDS), PLINKO_ROUNDS)
+        self.assertIsNotNone(self.plinko._pool)
+
+    def test_view_verifies(self):
+        """Test the view returns one result per round"""
+        response = self.client.post('/api/games/plinko/verify/', {'rounds': PLINKO_ROUNDS}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['count'], len(PLINKO_ROUNDS))
+        self.assertMatchesEngine(response.json()['data']['results'], PLINKO_ROUNDS)
+
+    def test_view_rejects_invalid_body(self):
+        """Test empty, oversized and malformed batches get a 400"""
+        bodies = [
+            {},
+            {'rounds': []},
+            {'rounds': [{'server_seed': 'server-0'}]},
+            {'rounds': [{'server_seed': 'a', 'client_seed': 'b', 'nonce': -1}]},
+            {'rounds': [{'server_seed': 'a', 'client_seed': 'b'}] * (settings.PLINKO_VERIFY_MAX_ROUNDS + 1)}
+        ]
+        for body in bodies:
+            response = self.client.post('/api/games/plinko/verify/', body, content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()['status'], 'error')
+
+    def test_view_unavailable(self):
+        """Test a server deployed without the engine answers 503"""
+        with mock.patch('apps.games.views.get_plinko', return_value=None):
+            response = self.client.post('/api/games/plinko/verify/', {'rounds': PLINKO_ROUNDS[:1]}, content_type='application/json')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['status'], 'error')
+
+@override_settings(PLINKO_PATH_CHUNK_FRAMES=16)
+class TestPlinkoPath(SimpleTestCase):
+    """Test streamed round paths replay the engine"""
+
+    def setUp(self):
+        from . import plinko
+        self.plinko = plinko
+        self.engine = plinko.PlinkoEngine()
+        cache.clear()  # The anonymous throttle counts through the cache
+
+    def engine_path(self, server_seed, client_seed, nonce, start_y=None):
+        """Positions after every tick and the ticks that hit a peg, straight from the engine"""
+        kicks = self.plinko.round_kicks(server_seed, client_seed, nonce)
+        ball = self.engine.new_ball() if start_y is None else self.engine.new_ball(start_y)
+        positions = []
+        bounces = set()
+        hash_index = 0
+        while not self.engine.is_finished(ball) and len(positions) < self.engine.max_ticks:
+            next_index = self.engine.step(ball, kicks, hash_index)
+            positions.append((ball.x, ball.y))
+            if next_index != hash_index:
+                bounces.add(len(positions))
+            hash_index = next_index
+        return positions, bounces
+
+    def assertMatchesEngine(self, events, r, every):
+        scale = self.plinko.PATH_SCALE
+        positions, bounces = self.engine_path(r['server_seed'], r['client_seed'], r['nonce'])
+        expected = self.engine.play_round(r['server_seed'], r['client_seed'], r['nonce'])
+
+        names = [event for event, _ in events]
+        self.assertEqual(names[0], 'round')
+        self.assertEqual(names[-1], 'outcome')
+        self.assertEqual(set(names[1:-1]), {'keyframes'})
+
+        header = events[0][1]
+        self.assertEqual(header['game_hash'], expected['game_hash'])
+        self.assertEqual(header['ticks'], len(positions))
+        self.assertEqual(header['scale'], scale)
+
+        frames = [frame for _, payload in events[1:-1] for frame in payload['frames']]
+        self.assertTrue(all(len(payload['frames']) <= 16 for _, payload in events[1:-1]))
+        wanted = sorted({tick for tick in range(1, len(positions) + 1) if tick % every == 0} | bounces | {len(positions)})
+        self.assertEqual([tick for tick, _, _ in frames], wanted)
+        for tick, x, y in frames:
+            # Recordings keep 1/256 pixel, so a keyframe may round one step off
+            engine_x, engine_y = positions[tick - 1]
+            self.assertLessEqual(abs(x - engine_x * scale), 1)
+            self.assertLessEqual(abs(y - engine_y * scale), 1)
+
+        outcome = events[-1][1]
+        for key in ('bin_index', 'label', 'multiplier', 'capped'):
+            self.assertEqual(outcome[key], expected[key], key)
+        self.assertAlmostEqual(outcome['final_y'], expected['final_y'], places=6)
+        self.assertAlmostEqual(frames[-1][2] / scale, expected['final_y'], delta=1 / scale)
+
+    def test_keyframes_match_engine(self):
+        """Test keyframes follow the engine's ball and end in its bin"""
+        for r in PLINKO_ROUNDS[:4]:
+            for every in (1, 4, 15):
+                events = list(self.plinko.path_events(r['server_seed'], r['client_seed'], r['nonce'], every))
+                self.assertMatchesEngine(events, r, every)
+
+    def test_bounces_are_keyframes(self):
+        """Test every peg hit gets a keyframe whatever `every` is"""
+        # Rounds launch along the bottom edge and roll under the pegs, so start
+        # one among them to make the ball bounce
+        from plinko_engine import PEG_SPACING_Y  # Importable once plinko has added the repo root
+        r = PLINKO_ROUNDS[1]
+        start_y = PEG_SPACING_Y * 10
+        kicks = self.plinko.round_kicks(r['server_seed'], r['client_seed'], r['nonce'])
+        trajectory = self.plinko.record_round(self.engine, self.plinko.round_hash(r['server_seed'], r['client_seed'], r['nonce']), start_y, kicks)
+        positions, bounces = self.engine_path(r['server_seed'], r['client_seed'], r['nonce'], start_y)
+        self.assertGreater(len(bounces), 2)
+        self.assertEqual({tick for tick, _ in trajectory.collisions()}, bounces)
+
+        events = list(self.plinko._iter_path(trajectory, trajectory.outcome(self.engine), {}, 50))
+        frames = [frame for event, payload in events if event == 'keyframes' for frame in payload['frames']]
+        wanted = sorted({tick for tick in range(50, len(positions) + 1, 50)} | bounces | {len(positions)})
+        self.assertEqual([tick for tick, _, _ in frames], wanted)
+        for tick, x, y in frames:
+            engine_x, engine_y = positions[tick - 1]
+            self.assertLessEqual(abs(x - engine_x * self.plinko.PATH_SCALE), 1)
+            self.assertLessEqual(abs(y - engine_y * self.plinko.PATH_SCALE), 1)
+
+    def test_every_thins_keyframes(self):
+        """Test a larger `every` sends fewer frames but keeps every bounce"""
+        r = PLINKO_ROUNDS[1]
+        counts = [
+            sum(len(payload['frames']) for event, payload in self.plinko.path_events(r['server_seed'], r['client_seed'], r['nonce'], every)
+                if event == 'keyframes')
+            for every in (1, 4, 15)
+        ]
+        self.assertEqual(counts[0], self.engine.play_round(r['server_seed'], r['client_seed'], r['nonce'])['ticks'])
+        self.assertGreater(counts[0], counts[1])
+        self.assertGreater(counts[1], counts[2])
+
+    def test_ndjson_stream(self):
+        """Test the default stream is one JSON object per line, tagged with its event"""
+        r = PLINKO_ROUNDS[2]
+        response = self.client.post('/api/games/plinko/path/', dict(r, every=6), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        body = b''.join(response.streaming_content).decode()
+        self.assertTrue(body.endswith('\n'))
+        events = []
+        for line in body.splitlines():
+            payload = json.loads(line)
+            events.append((payload.pop('event'), payload))
+        self.assertMatchesEngine(events, r, 6)
+
+    def test_sse_stream(self):
+        """Test stream=sse frames each event as an EventSource message"""
+        r = PLINKO_ROUNDS[4]
+        response = self.client.get('/api/games/plinko/path/', {**r, 'every': 3, 'stream': 'sse'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['X-Accel-Buffering'], 'no')
+        body = b''.join(response.streaming_content).decode()
+        messages = body.split('\n\n')
+        self.assertEqual(messages[-1], '')
+        events = []
+        for message in messages[:-1]:
+            event_line, data_line = message.split('\n')
+            self.assertTrue(event_line.startswith('event: '))
+            self.assertTrue(data_line.startswith('data: '))
+            events.append((event_line[len('event: '):], json.loads(data_line[len('data: '):])))
+        self.assertMatchesEngine(events, r, 3)
+
+    def test_view_rejects_invalid_request(self):
+        """Test bad parameters get a 400, and a missing engine a 503"""
+        r = PLINKO_ROUNDS[1]
+        for params in ({**r, 'every': 0}, {**r, 'every': 61}, {**r, 'stream': 'websocket'}, {'client_seed': 'c'}):
+            response = self.client.post('/api/games/plinko/path/', params, content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+        with mock.patch('apps.games.views.get_plinko', return_value=None):
+            response = self.client.get('/api/games/plinko/path/', r)
+        self.assertEqual(response.status_code, 503)
+
+@override_settings(PLINKO_VERIFY_INLINE_LIMIT=2, PLINKO_VERIFY_CHUNK_SIZE=3, PLINKO_VERIFY_WORKERS=2)
+class TestPlinkoPool(SimpleTestCase):
+    """Test chunked verification survives a worker process dying"""
+
+    def setUp(self):
+        from . import plinko
+        self.plinko = plinko
+
+    def tearDown(self):
+        pool = self.plinko._pool
+        if pool is not None:
+            self.plinko._drop_pool(pool)
+
+    def test_broken_pool_rebuilt(self):
+        """Test a batch after a worker crash runs on a fresh pool"""
+        expected = self.plinko.verify_rounds(PLINKO_ROUNDS)
+        pool = self.plinko._get_pool()
+        with self.assertRaises(BrokenProcessPool):
+            pool.submit(os._exit, 1).result()
+
+        with self.assertLogs('apps.games.plinko', 'WARNING'):
+            self.assertEqual(self.plinko.verify_rounds(PLINKO_ROUNDS), expected)
+        self.assertIsNot(self.plinko._pool, pool)
@@ -3,12 +3,15 @@ Games app URL configuration
 """
 
 from django.urls import path
-from .views import BlackjackGameView, RoshamboGameView, GameStatsView
+from .views import BlackjackGameView, RoshamboGameView, PlinkoVerifyView, PlinkoPathView, GameMetricsView, GameStatsView
 
 app_name = 'games'
 
 urlpatterns = [
     path('blackjack/', BlackjackGameView.as_view(), name='blackjack'),
     path('roshambo/', RoshamboGameView.as_view(), name='roshambo'),
+    path('plinko/verify/', PlinkoVerifyView.as_view(), name='plinko_verify'),
+    path('plinko/path/', PlinkoPathView.as_view(), name='plinko_path'),
     path('stats/', GameStatsView.as_view(), name='game_stats'),
+    path('metrics/', GameMetricsView.as_view(), name='game_metrics'),
 ]
@@ -5,18 +5,45 @@ Games app views
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from django.conf import settings
+from django.http import StreamingHttpResponse
+import functools
+import json
 import uuid
 import logging
 from datetime import datetime
 
 from .game_logic import BlackjackGame, RoshamboGame
 from .models import GameSession
-from .serializers import BlackjackActionSerializer, RoshamboActionSerializer
+from .session_store import get_session_store
+from .serializers import BlackjackActionSerializer, RoshamboActionSerializer, PlinkoVerifySerializer, PlinkoPathSerializer
+from . import blackjack_odds, game_stats
 
 logger = logging.getLogger(__name__)
 
-# In-memory game storage (in production, use Redis or database)
-active_games = {}
+# Game sessions, in-process or shared through Redis depending on GAME_SESSION_BACKEND
+sessions = get_session_store()
+
+@functools.lru_cache(maxsize=None)
+def get_plinko():
+    """The Plinko verifier, or None when the engine modules are not deployed
+
+    The engine lives in the repository root next to BLinko.py, outside the
+    server's deploy directory, so it is imported on first use rather than
+    when the URLconf loads.
+    """
+    try:
+        from . import plinko
+    except ImportError as e:
+        logger.error(f"Plinko engine unavailable: {str(e)}")
+        return None
+    return plinko
+
+def plinko_unavailable():
+    return Response({
+        'status': 'error',
+        'message': 'Plinko verification is not available on this server'
+    }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
 class BlackjackGameView(APIView):
     """Handle blackjack game actions"""
@@ -33,34 +60,44 @@ class BlackjackGameView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
             
             action = serializer.validated_data['action']
-            session_id = serializer.validated_data.get('session_id')
+            # The client's session handle: the session id, or a signed game token
+            handle = serializer.validated_data.get('session_id')
+            hints = serializer.validated_data['hints']
             
             if action == 'start':
-                # Create new game
-                session_id = str(uuid.uuid4())
-                game = BlackjackGame()
+                # Deal the next round from the session's shoe, or create a new game
+                game = sessions.get(handle) if handle else None
+                new_session = game is None
+                if new_session:
+                    session_id = str(uuid.uuid4())
+                    game = BlackjackGame(settings.BLACKJACK_DECKS, settings.BLACKJACK_PENETRATION, sessions.shuffle_key)
+                else:
+                    session_id = sessions.session_id(handle)
                 game_state = game.start_new_game()
-                active_games[session_id] = game
+                handle = sessions.set(session_id, game)
+                if hints:
+                    self._add_odds(game, game_state)
                 
                 # Track session
-                self._track_session('blackjack', session_id, request)
+                if new_session:
+                    self._track_session('blackjack', session_id, request)
                 
                 return Response({
                     'status': 'success',
-                    'session_id': session_id,
+                    'session_id': handle,
                     'game_state': game_state
                 })
             
             else:
                 # Get existing game
-                if not session_id or session_id not in active_games:
+                game = sessions.get(handle) if handle else None
+                if game is None:
                     return Response({
                         'status': 'error',
                         'message': 'Invalid or expired session'
                     }, status=status.HTTP_400_BAD_REQUEST)
                 
-                game = active_games[session_id]
-                
+                session_id = sessions.session_id(handle)
                 if action == 'hit':
                     game_state = game.hit()
                 elif action == 'stand':
@@ -68,10 +105,13 @@ class BlackjackGameView(APIView):
                     # Update session stats when game ends
                     if game_state['game_over']:
                         self._update_session_stats(session_id, game_state)
+                handle = sessions.set(session_id, game)
+                if hints:
+                    self._add_odds(game, game_state)
                 
                 return Response({
                     'status': 'success',
-                    'session_id': session_id,
+                    'session_id': handle,
                     'game_state': game_state
                 })
                 
@@ -82,6 +122,11 @@ class BlackjackGameView(APIView):
                 'message': 'Game error occurred'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
+    def _add_odds(self, game, game_state):
+        """Attach estimated hit/stand EVs while the hand is still in play"""
+        if not game_state['game_over']:
+            game_state['odds'] = blackjack_odds.hand_odds(game)
+    
     def _track_session(self, game_type, session_id, request):
         """Track game session"""
         try:
@@ -95,6 +140,7 @@ class BlackjackGameView(APIView):
                 user_agent=user_agent
             )
             session.save()
+            game_stats.record_session(game_type, ip_address)
         except Exception as e:
             logger.error(f"Failed to track session: {str(e)}")
     
@@ -104,7 +150,9 @@ class BlackjackGameView(APIView):
             session = GameSession.objects(session_id=session_id).first()
             if session:
                 stats = game_state.get('stats', {})
-                session.total_rounds = stats.get('player_wins', 0) + stats.get('dealer_wins', 0) + stats.get('ties', 0)
+                total_rounds = stats.get('player_wins', 0) + stats.get('dealer_wins', 0) + stats.get('ties', 0)
+                game_stats.record_rounds(session.game_type, total_rounds - session.total_rounds)
+                session.total_rounds = total_rounds
                 session.player_wins = stats.get('player_wins', 0)
                 session.player_losses = stats.get('dealer_wins', 0)
                 session.ties = stats.get('ties', 0)
@@ -137,13 +185,15 @@ class RoshamboGameView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
             
             action = serializer.validated_data['action']
-            session_id = serializer.validated_data.get('session_id')
+            # The client's session handle: the session id, or a signed game token
+            handle = serializer.validated_data.get('session_id')
             
-            if action == 'reset' or not session_id or session_id not in active_games:
+            game = sessions.get(handle) if handle else None
+            if action == 'reset' or game is None:
                 # Create new game
                 session_id = str(uuid.uuid4())
-                game = RoshamboGame()
-                active_games[session_id] = game
+                game = RoshamboGame(adaptive=serializer.validated_data['adaptive'])
+                handle = sessions.set(session_id, game)
                 
                 # Track session
                 self._track_session('roshambo', session_id, request)
@@ -152,25 +202,36 @@ class RoshamboGameView(APIView):
                     result = game.reset_game()
                     return Response({
                         'status': 'success',
-                        'session_id': session_id,
+                        'session_id': handle,
                         'result': result
                     })
             
             if action == 'play':
                 choice = serializer.validated_data['choice']
-                game = active_games[session_id]
                 result = game.play_round(choice)
+                handle = sessions.set(sessions.session_id(handle), game)
+                
+                return Response({
+                    'status': 'success',
+                    'session_id': handle,
+                    'result': result
+                })
+            
+            if action == 'play_batch':
+                # Many rounds in one round trip, returned as columns
+                result = game.play_rounds(serializer.validated_data['choices'])
+                handle = sessions.set(sessions.session_id(handle), game)
                 
                 return Response({
                     'status': 'success',
-                    'session_id': session_id,
+                    'session_id': handle,
                     'result': result
                 })
             
             return Response({
                 'status': 'success',
-                'session_id': session_id,
-                'stats': active_games[session_id].get_stats()
+                'session_id': handle,
+                'stats': game.get_stats()
             })
                 
         except Exception as e:
@@ -193,6 +254,7 @@ class RoshamboGameView(APIView):
                 user_agent=user_agent
             )
             session.save()
+            game_stats.record_session(game_type, ip_address)
         except Exception as e:
             logger.error(f"Failed to track session: {str(e)}")
     
@@ -205,27 +267,119 @@ class RoshamboGameView(APIView):
             ip = request.META.get('REMOTE_ADDR')
         return ip
 
+class PlinkoVerifyView(APIView):
+    """Verify provably fair Plinko rounds"""
+    
+    def post(self, request):
+        """Replay one or many (server_seed, client_seed, nonce) rounds"""
+        try:
+            serializer = PlinkoVerifySerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response({
+                    'status': 'error',
+                    'message': 'Invalid request data',
+                    'errors': serializer.errors
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            plinko = get_plinko()
+            if plinko is None:
+                return plinko_unavailable()
+            
+            results = plinko.verify_rounds(serializer.validated_data['rounds'])
+            
+            return Response({
+                'status': 'success',
+                'data': {
+                    'count': len(results),
+                    'results': results
+                }
+            })
+            
+        except Exception as e:
+            logger.error(f"Plinko verification error: {str(e)}")
+            return Response({
+                'status': 'error',
+                'message': 'Verification failed'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class PlinkoPathView(APIView):
+    """Stream a Plinko round's path so browsers animate it without running physics"""
+    
+    def get(self, request):
+        """Stream a round from query parameters (EventSource only issues GET)"""
+        return self._stream(request.query_params)
+    
+    def post(self, request):
+        """Stream a round from a JSON body"""
+        return self._stream(request.data)
+    
+    def _stream(self, data):
+        try:
+            serializer = PlinkoPathSerializer(data=data)
+            if not serializer.is_valid():
+                return Response({
+                    'status': 'error',
+                    'message': 'Invalid request data',
+                    'errors': serializer.errors
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            plinko = get_plinko()
+            if plinko is None:
+                return plinko_unavailable()
+            
+            params = serializer.validated_data
+            events = plinko.path_events(params['server_seed'], params['client_seed'], params['nonce'], params['every'])
+            
+            if params['stream'] == 'sse':
+                body = (f"event: {event}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n" for event, payload in events)
+                response = StreamingHttpResponse(body, content_type='text/event-stream')
+            else:
+                body = (json.dumps({'event': event, **payload}, separators=(',', ':')) + '\n' for event, payload in events)
+                response = StreamingHttpResponse(body, content_type='application/x-ndjson')
+            response['Cache-Control'] = 'no-cache'
+            response['X-Accel-Buffering'] = 'no'
+            return response
+            
+        except Exception as e:
+            logger.error(f"Plinko path error: {str(e)}")
+            return Response({
+                'status': 'error',
+                'message': 'Failed to stream path'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class GameMetricsView(APIView):
+    """Expose live session and cache gauges"""
+    
+    def get(self, request):
+        """Get this worker's session store and Plinko cache gauges"""
+        try:
+            plinko = get_plinko()
+            return Response({
+                'status': 'success',
+                'data': {
+                    'sessions': sessions.stats(),
+                    'plinko_cache': plinko.cache_stats() if plinko else None,
+                    'blackjack_odds_cache': blackjack_odds.cache_stats()
+                }
+            })
+            
+        except Exception as e:
+            logger.error(f"Game metrics error: {str(e)}")
+            return Response({
+                'status': 'error',
+                'message': 'Failed to get metrics'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 class GameStatsView(APIView):
     """Get game statistics"""
     
     def get(self, request):
         """Get aggregated game statistics"""
         try:
-            # Get statistics for both games
-            blackjack_sessions = GameSession.objects(game_type='blackjack')
-            roshambo_sessions = GameSession.objects(game_type='roshambo')
-            
+            # Running counters, so this is one lookup per game whatever the history size
             stats = {
-                'blackjack': {
-                    'total_sessions': blackjack_sessions.count(),
-                    'total_rounds': sum([s.total_rounds for s in blackjack_sessions]),
-                    'unique_players': len(set([s.ip_address for s in blackjack_sessions]))
-                },
-                'roshambo': {
-                    'total_sessions': roshambo_sessions.count(),
-                    'total_rounds': sum([s.total_rounds for s in roshambo_sessions]),
-                    'unique_players': len(set([s.ip_address for s in roshambo_sessions]))
-                }
+                'blackjack': game_stats.read_stats('blackjack'),
+                'roshambo': game_stats.read_stats('roshambo')
             }
             
             return Response({
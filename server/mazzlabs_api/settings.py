@@ -102,6 +102,39 @@ REST_FRAMEWORK = {
     }
 }
 
+# Plinko verification
+PLINKO_VERIFY_MAX_ROUNDS = config('PLINKO_VERIFY_MAX_ROUNDS', default=50000, cast=int)
+PLINKO_VERIFY_INLINE_LIMIT = config('PLINKO_VERIFY_INLINE_LIMIT', default=64, cast=int)
+PLINKO_VERIFY_CHUNK_SIZE = config('PLINKO_VERIFY_CHUNK_SIZE', default=5000, cast=int)
+# Each gunicorn worker starts its own pool, so the process count is gunicorn
+# workers x PLINKO_VERIFY_WORKERS; keep it small unless one worker is serving
+PLINKO_VERIFY_WORKERS = config('PLINKO_VERIFY_WORKERS', default=2, cast=int)
+PLINKO_CACHE_ENTRIES = config('PLINKO_CACHE_ENTRIES', default=100000, cast=int)
+PLINKO_PATH_CACHE_ENTRIES = config('PLINKO_PATH_CACHE_ENTRIES', default=1024, cast=int)
+PLINKO_PATH_KEYFRAME_TICKS = config('PLINKO_PATH_KEYFRAME_TICKS', default=4, cast=int)
+PLINKO_PATH_CHUNK_FRAMES = config('PLINKO_PATH_CHUNK_FRAMES', default=64, cast=int)
+
+# Game sessions ('memory' keeps them per worker, 'redis' shares them,
+# 'token' hands the client a signed token holding the whole game)
+GAME_SESSION_BACKEND = config('GAME_SESSION_BACKEND', default='memory')
+GAME_SESSION_REDIS_URL = config('GAME_SESSION_REDIS_URL', default='redis://localhost:6379/0')
+GAME_SESSION_TTL = config('GAME_SESSION_TTL', default=3600, cast=int)
+GAME_SESSION_MAX = config('GAME_SESSION_MAX', default=10000, cast=int)
+# Token sessions can be replayed: until a token expires (GAME_SESSION_TTL), a
+# client may resend an older one and, say, stand on the hand before a bad hit.
+# Enable the ledger to keep a per-session round counter in GAME_SESSION_REDIS_URL
+# so only the latest token verifies; without it 'token' is unsafe for stakes.
+GAME_SESSION_TOKEN_LEDGER = config('GAME_SESSION_TOKEN_LEDGER', default=False, cast=bool)
+
+# Blackjack shoe: decks per shoe and the share dealt before the cut card.
+# The cut must leave enough cards for any round (Shoe.max_round_cards): at
+# most about 0.69 with one deck, 0.9 with six.
+BLACKJACK_DECKS = config('BLACKJACK_DECKS', default=1, cast=int)
+BLACKJACK_PENETRATION = config('BLACKJACK_PENETRATION', default=0.65, cast=float)
+
+# Most Roshambo rounds accepted in one play_batch request
+ROSHAMBO_BATCH_MAX_ROUNDS = config('ROSHAMBO_BATCH_MAX_ROUNDS', default=1000, cast=int)
+
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -22,6 +22,7 @@ sys.modules['pygame.font'] = Mock()
 
 # Import BLinko components after mocking pygame
 from BLinko import Ball, generate_pegs, define_payout_bins, generate_seed, hash_seed, Game
+from BLinko import PHYSICS_STEP_MS, MAX_SUBSTEPS_PER_FRAME, MAX_BALLS_IN_FLIGHT
 
 class TestBall(unittest.TestCase):
     """Test the Ball class functionality"""
@@ -323,6 +324,177 @@ class TestPhysicsSimulation(unittest.TestCase):
         expected_energy = original_energy * energy_retention**2
         self.assertLess(new_energy, original_energy)
 
+class TestFixedTimestep(unittest.TestCase):
+    """Test physics runs on a fixed step independent of frame rate"""
+    
+    def setUp(self):
+        with patch('pygame.display.set_mode'), \
+             patch('pygame.display.set_caption'), \
+             patch('pygame.time.Clock'):
+            self.game = Game()
+        self.game.start_round()
+    
+    def test_ticks_follow_elapsed_time(self):
+        """Test a long frame runs several ticks and a short one carries over"""
+        self.game.update(PHYSICS_STEP_MS * 3.5)
+        self.assertEqual(self.game.round_ticks, 3)
+        
+        self.game.update(PHYSICS_STEP_MS * 0.4)
+        self.assertEqual(self.game.round_ticks, 3)
+        self.game.update(PHYSICS_STEP_MS * 0.2)
+        self.assertEqual(self.game.round_ticks, 4)
+    
+    def test_substeps_capped_per_frame(self):
+        """Test a stalled frame cannot run unbounded catch-up ticks"""
+        self.game.update(10000)
+        self.assertEqual(self.game.round_ticks, MAX_SUBSTEPS_PER_FRAME)
+        self.assertLessEqual(self.game.physics_accumulator, PHYSICS_STEP_MS)
+    
+    def test_same_result_at_any_frame_rate(self):
+        """Test the round lands in the same place at 30 and 144 FPS"""
+        game_hash, kicks = self.game.game_hash, self.game.kicks
+        while self.game.game_state == "BALL_DROPPING":
+            self.game.update(1000 / 30)
+        slow = (self.game.round_ticks, self.game.result_info)
+        
+        self.game.start_round()
+        self.game.game_hash, self.game.kicks = game_hash, kicks
+        while self.game.game_state == "BALL_DROPPING":
+            self.game.update(1000 / 144)
+        self.assertEqual((self.game.round_ticks, self.game.result_info), slow)
+    
+    def test_tick_budget_ends_round(self):
+        """Test a round is settled once it exhausts the tick budget"""
+        self.game.engine.max_ticks = 5
+        balance = self.game.balance
+        for _ in range(5):
+            self.game.update()
+        self.assertEqual(self.game.game_state, "SHOWING_RESULT")
+        self.assertEqual(self.game.result_info['label'], '0.2x')
+        self.assertEqual(self.game.balance, balance + self.game.bet_amount * 0.2)
+
+class TestRenderCaching(unittest.TestCase):
+    """Test text is rendered once and frames only push dirty regions"""
+    
+    def setUp(self):
+        with patch('pygame.display.set_mode'), \
+             patch('pygame.display.set_caption'), \
+             patch('pygame.time.Clock'):
+            self.game = Game()
+    
+    def test_text_rendered_only_on_change(self):
+        """Test the same text is served from the cache"""
+        font = Mock()
+        first = self.game._text('balance', font, "Balance: $1.00", (255, 255, 255))
+        second = self.game._text('balance', font, "Balance: $1.00", (255, 255, 255))
+        self.assertIs(first, second)
+        self.assertEqual(font.render.call_count, 1)
+        
+        self.game._text('balance', font, "Balance: $2.00", (255, 255, 255))
+        self.assertEqual(font.render.call_count, 2)
+    
+    def test_full_redraw_only_on_first_frame(self):
+        """Test the first frame flips and later frames update dirty rects"""
+        self.game.background = Mock()
+        self.game.start_round()
+        display = sys.modules['BLinko'].pygame.display
+        with patch.object(display, 'flip') as flip, patch.object(display, 'update') as update:
+            self.game.draw()
+            self.game.draw()
+        self.assertEqual(flip.call_count, 1)
+        self.assertEqual(update.call_count, 1)
+        self.assertFalse(self.game.needs_full_redraw)
+        self.assertTrue(self.game.dirty_rects)
+
+class TestReplay(unittest.TestCase):
+    """Test rounds are recorded and replayed without re-simulating"""
+    
+    def setUp(self):
+        with patch('pygame.display.set_mode'), \
+             patch('pygame.display.set_caption'), \
+             patch('pygame.time.Clock'):
+            self.game = Game()
+        self.game.start_round()
+        self.game.ball.y = 300
+        while self.game.game_state == "BALL_DROPPING":
+            self.game.update()
+    
+    def test_round_recorded(self):
+        """Test the finished round leaves a recording of every tick"""
+        trajectory = self.game.last_trajectory
+        self.assertEqual(len(trajectory), self.game.round_ticks)
+        self.assertEqual(trajectory.game_hash, self.game.game_hash)
+    
+    def test_replay_reaches_recorded_result(self):
+        """Test the replay walks the recorded path and shows the same bin"""
+        # Some random drops miss every bin and leave no result label
+        label = self.game.result_info.get('label', '')
+        balance = self.game.balance
+        self.game.start_replay(self.game.last_trajectory)
+        frames = 0
+        while self.game.game_state == "REPLAYING":
+            self.game.update()
+            frames += 1
+        self.assertEqual(frames, len(self.game.last_trajectory) + 1)
+        self.assertEqual(self.game.result_info['label'], label)
+        self.assertEqual(self.game.balance, balance)
+    
+    def test_multi_ball_after_replay(self):
+        """Test switching to multi-ball after a replay draws without a payout to show"""
+        pygame = sys.modules['BLinko'].pygame
+        display = pygame.display
+        for key in (pygame.K_r, None, pygame.K_SPACE, pygame.K_m):
+            if key is None:
+                while self.game.game_state == "REPLAYING":
+                    self.game.update()
+                continue
+            with patch.object(pygame.event, 'get', return_value=[Mock(type=pygame.KEYDOWN, key=key)]):
+                self.assertTrue(self.game.handle_input())
+        self.assertTrue(self.game.multi_ball)
+        self.assertEqual(self.game.result_info, {})
+        self.game.background = Mock()
+        text = Mock(**{'get_width.return_value': 100})
+        with patch.object(display, 'flip'), patch.object(display, 'update'), \
+             patch.object(self.game, '_text', return_value=text):
+            self.game.draw()
+
+class TestMultiBall(unittest.TestCase):
+    """Test several balls in flight at once, each with its own bet"""
+    
+    def setUp(self):
+        with patch('pygame.display.set_mode'), \
+             patch('pygame.display.set_caption'), \
+             patch('pygame.time.Clock'):
+            self.game = Game()
+        self.game.multi_ball = True
+    
+    def test_drops_settle_independently(self):
+        """Test every drop is charged its own bet and paid on its own"""
+        self.game.drop_ball()
+        self.game.bet_amount = 20.0
+        self.game.drop_ball()
+        self.assertEqual(len(self.game.ball_pool), 2)
+        self.assertEqual(self.game.balance, 970.0)
+        
+        while len(self.game.ball_pool):
+            self.game.update()
+        # Default launches land in the 0.2x bin
+        self.assertAlmostEqual(self.game.balance, 970.0 + 10.0 * 0.2 + 20.0 * 0.2)
+        self.assertEqual(self.game.game_state, "AWAITING_BET")
+    
+    def test_drop_requires_balance(self):
+        """Test a drop is refused once the balance cannot cover the bet"""
+        self.game.balance = 5.0
+        self.assertFalse(self.game.drop_ball())
+        self.assertEqual(len(self.game.ball_pool), 0)
+    
+    def test_balls_in_flight_capped(self):
+        """Test the number of balls in flight is bounded"""
+        self.game.balance = 1e9
+        for _ in range(MAX_BALLS_IN_FLIGHT + 5):
+            self.game.drop_ball()
+        self.assertEqual(len(self.game.ball_pool), MAX_BALLS_IN_FLIGHT)
+
 class TestEdgeCases(unittest.TestCase):
     """Test edge cases and error conditions"""
     
@@ -479,6 +651,47 @@ def run_performance_test():
     collision_time = time.time() - start_time
     print(f"Collision detection (1000x): {collision_time:.4f}s")
 
+def run_memory_test():
+    """Measure memory of balls and pegs before and after compact storage"""
+    print("\n=== MEMORY FOOTPRINT ===")
+    
+    import tracemalloc
+    from plinko_engine import BALL_RADIUS, PEG_RADIUS, PEG_SPACING_X, PegGrid, PegTable
+    
+    class DictBall:
+        """Ball layout before __slots__, kept for comparison"""
+        def __init__(self, start_x, start_y):
+            self.x = float(start_x)
+            self.y = float(start_y)
+            self.vx = 2.0
+            self.vy = 0.0
+    
+    def measure(build):
+        tracemalloc.start()
+        kept = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del kept
+        return size
+    
+    count = 10000
+    before = measure(lambda: [DictBall(80, 570 - i % 500) for i in range(count)])
+    after = measure(lambda: [Ball(80, 570 - i % 500) for i in range(count)])
+    print(f"{count} balls: {before / 1024:.1f} KiB -> {after / 1024:.1f} KiB ({after / before:.0%})")
+    
+    pegs = generate_pegs()
+    boards = 100
+    before = measure(lambda: [[(x + 0.0, y + 0.0) for x, y in pegs] for _ in range(boards)])
+    after = measure(lambda: [PegTable(pegs) for _ in range(boards)])
+    print(f"{boards} boards of {len(pegs)} pegs: {before / 1024:.1f} KiB -> {after / 1024:.1f} KiB ({after / before:.0%})")
+    
+    # The collision grid lists each peg in nine cells; it is built over the table
+    # and shares one (x, y) tuple per peg between them
+    for rows, cell_size in ((None, PEG_SPACING_X), (300, BALL_RADIUS + PEG_RADIUS)):
+        table = PegTable(generate_pegs(rows=rows))
+        grid = measure(lambda: PegGrid(table, cell_size=cell_size))
+        print(f"Board of {len(table)} pegs: table {table.nbytes() / 1024:.1f} KiB, grid {grid / 1024:.1f} KiB")
+
 def run_integration_test():
     """Run integration tests simulating full game rounds"""
     print("\n=== INTEGRATION TESTS ===")
@@ -525,6 +738,7 @@ if __name__ == "__main__":
     
     # Run performance tests
     run_performance_test()
+    run_memory_test()
     
     # Run integration tests
     run_integration_test()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the Plinko outcome cache
+"""
+
+import unittest
+import sys
+import os
+
+# Add the current directory to the path to import plinko_cache
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from plinko_engine import PlinkoEngine, hash_seed
+from plinko_cache import OutcomeCache
+
+class FakeClock:
+    """Manually advanced clock for TTL tests"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestOutcomeCache(unittest.TestCase):
+    """Test memoization, bounds and counters"""
+
+    def setUp(self):
+        self.engine = PlinkoEngine()
+        self.clock = FakeClock()
+        self.cache = OutcomeCache(self.engine, max_entries=3, ttl=60, clock=self.clock)
+
+    def test_hit_returns_same_outcome(self):
+        """Test a repeated hash is served from the cache with the same result"""
+        game_hash = hash_seed("cached")
+        first = self.cache.simulate(game_hash)
+        second = self.cache.simulate(game_hash)
+
+        self.assertEqual(first, second)
+        self.assertEqual(first, self.engine.simulate(game_hash, digest=True))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_play_round_uses_seed_hash(self):
+        """Test play_round keys the cache by the combined seed hash"""
+        result = self.cache.play_round("server", "client")
+        self.assertIn(hash_seed("serverclient"), self.cache)
+        self.assertEqual(result['server_seed'], "server")
+        self.assertEqual(result['ticks'], self.engine.play_round("server", "client")['ticks'])
+
+    def test_stream_rounds_keyed_apart(self):
+        """Test a nonce round never shares an entry with a bare hash of the same value"""
+        result = self.cache.play_round("server", "client", 5)
+        self.assertEqual(result['ticks'], self.engine.play_round("server", "client", 5)['ticks'])
+        self.assertNotIn(result['game_hash'], self.cache)
+
+        self.cache.play_round("server", "client", 5)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_lru_eviction_by_count(self):
+        """Test the least recently used entry is evicted first"""
+        hashes = [hash_seed(f"lru{i}") for i in range(4)]
+        for game_hash in hashes[:3]:
+            self.cache.simulate(game_hash)
+        self.cache.simulate(hashes[0])
+        self.cache.simulate(hashes[3])
+
+        self.assertEqual(len(self.cache), 3)
+        self.assertNotIn(hashes[1], self.cache)
+        self.assertIn(hashes[0], self.cache)
+        self.assertEqual(self.cache.evictions, 1)
+
+    def test_eviction_by_bytes(self):
+        """Test the byte budget bounds the cache"""
+        cache = OutcomeCache(self.engine, max_entries=1000, max_bytes=1500)
+        for i in range(10):
+            cache.simulate(hash_seed(f"bytes{i}"))
+        self.assertLessEqual(cache.bytes_used, 1500)
+        self.assertGreater(cache.evictions, 0)
+        self.assertEqual(cache.stats()['entries'], len(cache))
+
+    def test_ttl_expiry(self):
+        """Test entries older than the TTL are recomputed"""
+        game_hash = hash_seed("ttl")
+        self.cache.simulate(game_hash)
+        self.clock.now = 61
+        self.cache.simulate(game_hash)
+
+        stats = self.cache.stats()
+        self.assertEqual(stats['expirations'], 1)
+        self.assertEqual(stats['misses'], 2)
+        self.assertEqual(stats['entries'], 1)
+
+    def test_invalid_bounds(self):
+        """Test the cache refuses non-positive bounds"""
+        with self.assertRaises(ValueError):
+            OutcomeCache(self.engine, max_entries=0)
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the headless Plinko engine
+Checks the engine reproduces the BLinko physics without pygame
+"""
+
+import unittest
+import sys
+import os
+import math
+import hmac
+import hashlib
+import time
+import tracemalloc
+
+# Add the current directory to the path to import plinko_engine
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import numpy as np
+    from plinko_batch import PlinkoBatch, BatchBallPool
+except ImportError:  # NumPy is optional for the scalar engine
+    np = None
+
+import plinko_engine
+from plinko_engine import (
+    Ball, BallPool, KickStream, PlinkoEngine, PegGrid, PegTable, generate_pegs, load_board, is_point_in_triangle, define_payout_bins, hash_seed, round_hash,
+    BALL_RADIUS, PEG_RADIUS, GRAVITY_X, MAX_SPEED, BOUNCE_ENERGY_RETENTION, SCREEN_HEIGHT,
+    START_X, START_Y,
+)
+
+def reference_tick(ball, pegs, game_hash, hash_index):
+    """The original BLinko.Game._update_simulation_tick (squares as products) for parity checks."""
+    ball.vx += GRAVITY_X
+    speed = math.sqrt(ball.vx * ball.vx + ball.vy * ball.vy)
+    if speed > MAX_SPEED:
+        ball.vx = (ball.vx / speed) * MAX_SPEED
+        ball.vy = (ball.vy / speed) * MAX_SPEED
+    ball.x += ball.vx
+    ball.y += ball.vy
+    if not (BALL_RADIUS < ball.y < SCREEN_HEIGHT - BALL_RADIUS):
+        ball.vy *= -0.4
+        ball.y = max(BALL_RADIUS, min(ball.y, SCREEN_HEIGHT - BALL_RADIUS))
+    for peg_x, peg_y in pegs:
+        dist_x, dist_y = ball.x - peg_x, ball.y - peg_y
+        distance = math.sqrt(dist_x * dist_x + dist_y * dist_y)
+        if distance < BALL_RADIUS + PEG_RADIUS:
+            hash_char = game_hash[hash_index % len(game_hash)]
+            random_kick = (int(hash_char, 16) - 7.5) / 15.0
+            norm_x, norm_y = dist_x / distance, dist_y / distance
+            dot_product = ball.vx * norm_x + ball.vy * norm_y
+            reflect_vx = ball.vx - 2 * dot_product * norm_x
+            reflect_vy = ball.vy - 2 * dot_product * norm_y
+            ball.vx = reflect_vx * BOUNCE_ENERGY_RETENTION
+            ball.vy = (reflect_vy + random_kick * 1) * BOUNCE_ENERGY_RETENTION
+            hash_index += 1
+            overlap = BALL_RADIUS + PEG_RADIUS - distance
+            ball.x += overlap * norm_x
+            ball.y += overlap * norm_y
+            break
+    return hash_index
+
+def reference_pegs():
+    """The original nested-loop BLinko.generate_pegs scan of the default board."""
+    point_a_x, point_a_y = 80, SCREEN_HEIGHT - 30
+    point_b_x, point_b_y = 800 - 150, 60
+    point_c_x = point_a_x + (point_a_y - point_b_y) / math.tan(math.radians(30))
+    point_c_y = point_a_y
+    pegs = []
+    current_y = point_b_y + 25
+    row = 0
+    while current_y <= point_a_y - 25:
+        progress = (current_y - point_b_y) / (point_a_y - point_b_y)
+        right_x = point_b_x + progress * (point_c_x - point_b_x)
+        current_x = point_a_x + 35 + (17.5 if row % 2 == 1 else 0)
+        while current_x < right_x - 15:
+            if is_point_in_triangle(current_x, current_y, point_a_x, point_a_y, point_b_x, point_b_y, point_c_x, point_c_y):
+                pegs.append((current_x, current_y))
+            current_x += 35
+        current_y += 30
+        row += 1
+    return pegs
+
+def start_heights(count):
+    """Spread launch heights across the board so balls actually hit pegs."""
+    return [100 + (i * 37) % 460 for i in range(count)]
+
+class TestPlinkoEngine(unittest.TestCase):
+    """Test the headless engine"""
+
+    def setUp(self):
+        self.engine = PlinkoEngine()
+
+    def test_no_pygame_dependency(self):
+        """Test the engine module never imports pygame"""
+        with open(plinko_engine.__file__) as source:
+            self.assertNotIn('import pygame', source.read())
+
+    def test_owns_board(self):
+        """Test engine builds the default board"""
+        self.assertEqual(list(self.engine.pegs), generate_pegs())
+        self.assertEqual(self.engine.bins, define_payout_bins())
+
+    def test_step_matches_reference(self):
+        """Test every tick matches the original pygame simulation bit for bit"""
+        for i, start_y in enumerate(start_heights(40)):
+            game_hash = hash_seed(f"parity{i}")
+            ball, expected = Ball(START_X, start_y), Ball(START_X, start_y)
+            hash_index = expected_index = 0
+            while not self.engine.is_finished(ball):
+                hash_index = self.engine.step(ball, game_hash, hash_index)
+                expected_index = reference_tick(expected, self.engine.pegs, game_hash, expected_index)
+                self.assertEqual((ball.x, ball.y, ball.vx, ball.vy, hash_index),
+                                 (expected.x, expected.y, expected.vx, expected.vy, expected_index))
+
+    def test_simulate_deterministic(self):
+        """Test the same hash always lands in the same place"""
+        game_hash = hash_seed("deterministic")
+        self.assertEqual(self.engine.simulate(game_hash), self.engine.simulate(game_hash))
+
+    def test_play_round_outcome(self):
+        """Test play_round reports bin, multiplier and tick count"""
+        result = self.engine.play_round("server", "client")
+        self.assertEqual(result['game_hash'], hash_seed("serverclient"))
+        self.assertEqual(result['server_seed'], "server")
+        self.assertEqual(result['client_seed'], "client")
+        self.assertGreater(result['ticks'], 0)
+
+        bin_info = self.engine.bins[result['bin_index']]
+        self.assertEqual(result['multiplier'], bin_info['multiplier'])
+        self.assertEqual(result['label'], bin_info['label'])
+        low, high = bin_info['range']
+        self.assertTrue(low <= result['final_y'] < high)
+
+    def test_round_hash_nonce(self):
+        """Test rounds without a nonce keep the original seed hash and nonces separate rounds"""
+        self.assertEqual(round_hash("server", "client"), hash_seed("serverclient"))
+        self.assertNotEqual(round_hash("server", "client", 0), round_hash("server", "client", 1))
+        self.assertEqual(self.engine.play_round("server", "client", 7)['game_hash'],
+                         round_hash("server", "client", 7))
+
+    def test_default_launch_lands_in_lowest_bin(self):
+        """Test a ball launched from Point A rolls under the last peg row"""
+        result = self.engine.simulate(hash_seed("point-a"))
+        self.assertEqual(result['final_y'], START_Y)
+        self.assertEqual(result['label'], '0.2x')
+        self.assertEqual(result['collisions'], 0)
+
+    def test_tick_budget_fallback(self):
+        """Test a round that runs out of ticks settles deterministically in the lowest bin"""
+        engine = PlinkoEngine(max_ticks=50)
+        result = engine.simulate(hash_seed("budget"))
+        self.assertTrue(result['capped'])
+        self.assertEqual(result['ticks'], 50)
+        self.assertEqual(result['label'], '0.2x')
+        self.assertEqual(result, engine.simulate(hash_seed("budget")))
+        self.assertFalse(self.engine.simulate(hash_seed("budget"))['capped'])
+
+    def test_find_bin_outside_board(self):
+        """Test positions above the top bin have no payout"""
+        self.assertIsNone(self.engine.find_bin(10))
+        self.assertEqual(self.engine.find_bin(60), 0)
+
+class TestKickStream(unittest.TestCase):
+    """Test the HMAC-SHA256 randomness stream"""
+
+    def setUp(self):
+        self.engine = PlinkoEngine()
+
+    def stream_hex(self, blocks):
+        """The documented scheme, computed independently"""
+        return ''.join(
+            hmac.new(b"server", f"client:3:{cursor}".encode(), hashlib.sha256).hexdigest()
+            for cursor in range(blocks)
+        )
+
+    def test_digits_follow_hmac_blocks(self):
+        """Test digit i is hex character i of the concatenated HMAC blocks"""
+        kicks = KickStream("server", "client", 3)
+        expected = self.stream_hex(3)
+        self.assertEqual([kicks[i] for i in range(len(expected))], [int(c, 16) for c in expected])
+        self.assertEqual(kicks.take(5), bytes(int(c, 16) for c in expected[:5]))
+        self.assertEqual(kicks.cursor, 3)
+
+    def test_step_matches_reference(self):
+        """Test stream kicks drive the same physics as the hex cycle they spell out"""
+        for start_y in start_heights(20):
+            kicks = KickStream("server", "client", 3)
+            hex_stream = self.stream_hex(16)
+            ball, expected = Ball(START_X, start_y), Ball(START_X, start_y)
+            hash_index = expected_index = 0
+            while not self.engine.is_finished(ball):
+                hash_index = self.engine.step(ball, kicks, hash_index)
+                expected_index = reference_tick(expected, self.engine.pegs, hex_stream, expected_index)
+                self.assertEqual((ball.x, ball.y, ball.vx, ball.vy, hash_index),
+                                 (expected.x, expected.y, expected.vx, expected.vy, expected_index))
+
+    def test_play_round_scheme(self):
+        """Test rounds with a nonce use the stream and rounds without keep the hash cycle"""
+        game_hash = round_hash("server", "client", 3)
+        self.assertEqual(self.engine.play_round("server", "client", 3)['ticks'],
+                         self.engine.simulate(game_hash, kicks=KickStream("server", "client", 3))['ticks'])
+        self.assertEqual(self.engine.play_round("server", "client")['ticks'],
+                         self.engine.simulate(hash_seed("serverclient"))['ticks'])
+
+class TestBoardGeneration(unittest.TestCase):
+    """Test the closed-form parametrised board generator"""
+
+    def test_default_board_unchanged(self):
+        """Test the default board matches the original point-by-point scan exactly"""
+        self.assertEqual(generate_pegs(), reference_pegs())
+
+    def test_rows_honoured(self):
+        """Test the requested number of rows is produced"""
+        for rows in list(range(1, 21)) + [40, 250]:
+            pegs = generate_pegs(rows=rows)
+            self.assertEqual(len({peg_y for _, peg_y in pegs}), rows)
+
+    def test_pegs_inside_triangle(self):
+        """Test every peg of small and large boards lies inside the triangle"""
+        point_a, point_b, point_c = plinko_engine.POINT_A, plinko_engine.POINT_B, plinko_engine.POINT_C
+        for rows in (2, 5, 15, 120):
+            for peg_x, peg_y in generate_pegs(rows=rows):
+                self.assertTrue(is_point_in_triangle(peg_x, peg_y, *point_a, *point_b, *point_c))
+
+    def test_custom_spacing(self):
+        """Test explicit spacing sets the distance between neighbouring pegs"""
+        pegs = generate_pegs(spacing_x=50, spacing_y=45)
+        row_ys = sorted({peg_y for _, peg_y in pegs})
+        last_row = [peg_x for peg_x, peg_y in pegs if peg_y == row_ys[-1]]
+        self.assertEqual(last_row[1] - last_row[0], 50)
+        self.assertEqual(row_ys[1] - row_ys[0], 45)
+
+    def test_invalid_rows(self):
+        """Test a board needs at least one row"""
+        with self.assertRaises(ValueError):
+            generate_pegs(rows=0)
+
+    def test_boards_cached(self):
+        """Test engines on the same board share one generated board"""
+        self.assertIs(PlinkoEngine().pegs, PlinkoEngine().pegs)
+        self.assertIs(load_board(rows=80), load_board(rows=80))
+        self.assertIsNot(generate_pegs(), generate_pegs())
+
+    def test_large_board_cost(self):
+        """Test a board with hundreds of rows builds quickly and stays a few MB"""
+        started = time.perf_counter()
+        pegs, grid = load_board(rows=310)
+        self.assertLess(time.perf_counter() - started, 2.0)
+        self.assertGreater(len(pegs), 70000)
+
+        tracemalloc.start()
+        try:
+            board = load_board(rows=290)
+            used = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        self.assertLess(used / len(board[0]), 300)
+
+    def test_board_cache_bounded_by_pegs(self):
+        """Test large boards evict each other instead of piling up"""
+        board = load_board(rows=300)
+        for rows in (301, 302):
+            load_board(rows=rows)
+        self.assertIsNot(load_board(rows=300), board)
+        self.assertIs(load_board(rows=300), load_board(rows=300))
+
+class TestCompactStorage(unittest.TestCase):
+    """Test the slot-based ball and column peg storage"""
+
+    def test_ball_has_no_dict(self):
+        """Test balls use __slots__ instead of a per-instance dict"""
+        ball = Ball(START_X, START_Y)
+        self.assertFalse(hasattr(ball, '__dict__'))
+        with self.assertRaises(AttributeError):
+            ball.colour = 'red'
+
+    def test_peg_table_round_trip(self):
+        """Test the peg columns hold the generated board unchanged"""
+        pegs = generate_pegs()
+        table = PegTable(pegs)
+        self.assertEqual(len(table), len(pegs))
+        self.assertEqual(list(table), pegs)
+        self.assertEqual(table[5], pegs[5])
+        self.assertEqual(table.nbytes(), len(pegs) * 16)
+
+class TestPegGrid(unittest.TestCase):
+    """Test the spatial index used for collision lookup"""
+
+    def setUp(self):
+        self.pegs = generate_pegs()
+        self.grid = PegGrid(self.pegs)
+
+    def test_nearby_covers_contact_distance(self):
+        """Test every peg the ball could touch is returned, in board order"""
+        contact = BALL_RADIUS + PEG_RADIUS
+        for x in range(0, 800, 7):
+            for y in range(0, 600, 7):
+                expected = [(px, py) for px, py in self.pegs
+                            if math.sqrt((x - px)**2 + (y - py)**2) < contact]
+                nearby = self.grid.nearby(float(x), float(y))
+                self.assertEqual([peg for peg in nearby if peg in expected], expected)
+
+    def test_nearby_is_local(self):
+        """Test a lookup visits only a handful of pegs"""
+        largest = max(len(pegs) for pegs in self.grid.neighbourhoods.values())
+        self.assertLess(largest, 16)
+        self.assertLess(largest, len(self.pegs))
+
+    def test_empty_space(self):
+        """Test lookups far from the board return nothing"""
+        self.assertEqual(self.grid.nearby(-500.0, -500.0), ())
+
+    def test_cell_size_too_small(self):
+        """Test the grid refuses cells smaller than the contact distance"""
+        with self.assertRaises(ValueError):
+            PegGrid(self.pegs, cell_size=BALL_RADIUS)
+
+def drain_pool(pool, game_hashes, heights):
+    """Drop every hash into the pool at once and collect the outcomes by index"""
+    for index, (game_hash, start_y) in enumerate(zip(game_hashes, heights)):
+        pool.add(game_hash, tag=index, start_y=start_y)
+    outcomes = {}
+    while len(pool):
+        for index, outcome in pool.tick():
+            outcomes[index] = outcome
+    return [outcomes[index] for index in range(len(game_hashes))]
+
+class TestBallPool(unittest.TestCase):
+    """Test many balls in flight settle exactly like single rounds"""
+
+    def setUp(self):
+        self.engine = PlinkoEngine(max_ticks=400)
+        self.heights = start_heights(40)
+        self.game_hashes = [hash_seed(f"pool{i}") for i in range(len(self.heights))]
+        self.expected = [self.engine.simulate(game_hash, start_y)
+                         for game_hash, start_y in zip(self.game_hashes, self.heights)]
+
+    def test_scalar_pool_matches_engine(self):
+        """Test the scalar pool settles every ball like PlinkoEngine.simulate"""
+        self.assertEqual(drain_pool(BallPool(self.engine), self.game_hashes, self.heights), self.expected)
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_batch_pool_matches_engine(self):
+        """Test the array pool grows past its capacity and still matches exactly"""
+        pool = BatchBallPool(PlinkoBatch(self.engine), capacity=4)
+        self.assertEqual(drain_pool(pool, self.game_hashes, self.heights), self.expected)
+        self.assertEqual(len(pool), 0)
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_batch_pool_rejects_mixed_hash_lengths(self):
+        """Test balls in one pool share a hash length"""
+        pool = BatchBallPool(PlinkoBatch(self.engine))
+        pool.add(hash_seed("a"))
+        with self.assertRaises(ValueError):
+            pool.add("abc")
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestPlinkoBatch(unittest.TestCase):
+    """Test the vectorized batch simulation against the scalar engine"""
+
+    def setUp(self):
+        self.engine = PlinkoEngine()
+        self.batch = PlinkoBatch(self.engine)
+
+    def test_outcomes_match_scalar_engine(self):
+        """Test batch results are bit for bit identical to the scalar path"""
+        heights = start_heights(300)
+        game_hashes = [hash_seed(f"batch{i}") for i in range(len(heights))]
+        expected = [self.engine.simulate(game_hash, start_y) for game_hash, start_y in zip(game_hashes, heights)]
+        actual = self.batch.outcomes(game_hashes, np.array(heights, dtype=np.float64))
+        self.assertEqual(actual, expected)
+
+    def test_simulate_arrays(self):
+        """Test the raw arrays line up with the payout table"""
+        game_hashes = [hash_seed(f"arrays{i}") for i in range(10)]
+        results = self.batch.simulate(game_hashes)
+        self.assertEqual(results['final_y'].shape, (10,))
+        self.assertTrue((results['bin_index'] == len(self.engine.bins) - 1).all())
+        self.assertTrue((results['multiplier'] == 0.2).all())
+        self.assertTrue((results['ticks'] == self.engine.simulate(game_hashes[0])['ticks']).all())
+
+    def test_tick_budget_matches_scalar_engine(self):
+        """Test capped rounds agree between the batch and scalar paths"""
+        engine = PlinkoEngine(max_ticks=200)
+        heights = start_heights(50)
+        game_hashes = [hash_seed(f"capped{i}") for i in range(len(heights))]
+        expected = [engine.simulate(game_hash, start_y) for game_hash, start_y in zip(game_hashes, heights)]
+        actual = PlinkoBatch(engine).outcomes(game_hashes, np.array(heights, dtype=np.float64))
+        self.assertEqual(actual, expected)
+        self.assertTrue(any(result['capped'] for result in actual))
+
+    def test_stream_outcomes_match_scalar_engine(self):
+        """Test batches of HMAC stream rounds, including ones past the first block, match exactly"""
+        heights = start_heights(120)
+        seeds = [(f"server{i}", "client", i) for i in range(len(heights))]
+        game_hashes = [round_hash(*seed) for seed in seeds]
+        expected = [self.engine.simulate(game_hash, start_y, kicks=KickStream(*seed))
+                    for game_hash, start_y, seed in zip(game_hashes, heights, seeds)]
+        actual = self.batch.outcomes(game_hashes, np.array(heights, dtype=np.float64),
+                                     kicks=[KickStream(*seed) for seed in seeds])
+        self.assertEqual(actual, expected)
+        self.assertTrue(any(result['collisions'] > 64 for result in expected))
+
+    def test_mixed_hash_lengths_rejected(self):
+        """Test a batch refuses hashes of different lengths"""
+        with self.assertRaises(ValueError):
+            self.batch.simulate([hash_seed("a"), "abc"])
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the BLinko Monte Carlo RTP analyzer
+"""
+
+import io
+import unittest
+import sys
+import os
+
+# Add the current directory to the path to import plinko_rtp
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from plinko_engine import define_payout_bins
+from plinko_rtp import RtpStats, run_analysis
+
+class TestRtpStats(unittest.TestCase):
+    """Test the running RTP totals"""
+
+    def setUp(self):
+        self.bins = define_payout_bins()
+        self.stats = RtpStats(self.bins)
+
+    def test_empty_summary(self):
+        """Test a run with no rounds reports zeros"""
+        self.assertEqual(self.stats.summary()['rounds'], 0)
+
+    def test_merge_chunks(self):
+        """Test chunks merge into frequencies, mean and variance"""
+        # Two 2x hits and two 0.2x hits
+        counts = [0, 0, 0, 0, 2, 2]
+        self.stats.add((counts, 0, 4.4, 8.08))
+        self.stats.add(([0] * len(self.bins), 1, 0.0, 0.0))
+
+        summary = self.stats.summary()
+        self.assertEqual(summary['rounds'], 5)
+        self.assertEqual(self.stats.misses, 1)
+        self.assertAlmostEqual(summary['rtp'], 0.88)
+        self.assertAlmostEqual(summary['house_edge'], 0.12)
+        self.assertAlmostEqual(summary['variance'], (8.08 / 5 - 0.88 ** 2) * 5 / 4)
+        self.assertLess(summary['ci_low'], summary['rtp'])
+        self.assertGreater(summary['ci_high'], summary['rtp'])
+
+    def test_report_lists_every_bin(self):
+        """Test the final report has a line per payout bin"""
+        self.stats.add(([1, 0, 0, 0, 0, 0], 0, 1000.0, 1000000.0))
+        report = self.stats.report()
+        for bin_info in self.bins:
+            self.assertIn(bin_info['label'], report)
+
+class TestRunAnalysis(unittest.TestCase):
+    """Test a small end-to-end run over the process pool"""
+
+    def test_streamed_run(self):
+        """Test progress is streamed per chunk and every round is counted"""
+        out = io.StringIO()
+        stats = run_analysis(rounds=250, chunk_size=100, workers=2, use_batch=False, out=out)
+        self.assertEqual(stats.rounds, 250)
+        self.assertEqual(out.getvalue().count('rounds/s'), 3)
+        self.assertIn('Expected return', out.getvalue())
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
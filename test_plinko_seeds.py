@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the BLinko seed pool
+"""
+
+import os
+import sys
+import time
+import unittest
+
+# Add the current directory to the path to import plinko_seeds
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from plinko_engine import hash_seed
+from plinko_seeds import SeedPool
+
+class TestSeedPool(unittest.TestCase):
+    """Test seeds are handed out with valid commitments and refilled"""
+
+    def test_pairs_carry_commitments(self):
+        """Test every seed comes with its SHA-256 commitment"""
+        pool = SeedPool(size=16, start=False)
+        seeds = set()
+        for _ in range(16):
+            seed, commitment = pool.take()
+            self.assertEqual(len(seed), 64)
+            self.assertEqual(commitment, hash_seed(seed))
+            seeds.add(seed)
+        self.assertEqual(len(seeds), 16)
+        self.assertEqual(pool.stats()['stalls'], 0)
+
+    def test_empty_pool_stalls_but_serves(self):
+        """Test an empty pool still returns a seed and counts the stall"""
+        pool = SeedPool(size=4, prefill=False, start=False)
+        seed, commitment = pool.take()
+        self.assertEqual(commitment, hash_seed(seed))
+        stats = pool.stats()
+        self.assertEqual((stats['taken'], stats['stalls'], stats['depth']), (1, 1, 0))
+
+    def test_background_refill(self):
+        """Test the refill thread tops the pool back up below the low-water mark"""
+        pool = SeedPool(size=32, refill_at=16)
+        try:
+            for _ in range(20):
+                pool.take()
+            deadline = time.time() + 5
+            while len(pool) < 32 and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(len(pool), 32)
+            self.assertGreaterEqual(pool.stats()['refills'], 2)
+        finally:
+            pool.stop()
+
+    def test_invalid_bounds(self):
+        """Test nonsensical pool sizes are rejected"""
+        with self.assertRaises(ValueError):
+            SeedPool(size=0, start=False)
+        with self.assertRaises(ValueError):
+            SeedPool(size=8, refill_at=8, start=False)
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test Suite for BLinko trajectory recordings
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the current directory to the path to import plinko_trajectory
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from plinko_engine import PlinkoEngine, hash_seed
+from plinko_trajectory import POSITION_SCALE, Trajectory, TrajectoryRecorder, record_round
+
+class TestTrajectory(unittest.TestCase):
+    """Test recordings round-trip and replay the simulated path"""
+
+    def setUp(self):
+        self.engine = PlinkoEngine()
+        self.game_hash = hash_seed("trajectory")
+        # Launch mid-board so the ball hits pegs
+        self.start_y = 300
+        self.trajectory = record_round(self.engine, self.game_hash, self.start_y)
+
+    def test_outcome_matches_simulation(self):
+        """Test the recorded outcome and digest match the engine"""
+        expected = self.engine.simulate(self.game_hash, self.start_y, digest=True)
+        self.assertEqual(self.trajectory.outcome(self.engine), expected)
+
+    def test_positions_follow_physics(self):
+        """Test decoded positions stay within the fixed-point resolution"""
+        ball = self.engine.new_ball(self.start_y)
+        hash_index = 0
+        events = []
+        for tick, (x, y) in enumerate(self.trajectory.positions(), start=1):
+            next_index = self.engine.step(ball, self.game_hash, hash_index)
+            if next_index != hash_index:
+                events.append((tick, hash_index))
+            hash_index = next_index
+            self.assertLessEqual(abs(x - ball.x), 0.5 / POSITION_SCALE)
+            self.assertLessEqual(abs(y - ball.y), 0.5 / POSITION_SCALE)
+        self.assertEqual(self.trajectory.collisions(), events)
+        self.assertGreater(len(events), 0)
+
+    def test_round_trip_bytes_and_file(self):
+        """Test a recording survives serialisation and saving"""
+        data = self.trajectory.to_bytes()
+        self.assertLess(len(data), len(self.trajectory) * 16)
+        restored = Trajectory.from_bytes(data)
+        self.assertEqual(list(restored.positions()), list(self.trajectory.positions()))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "round.plkt")
+            self.trajectory.save(path)
+            self.assertEqual(Trajectory.load(path).to_bytes(), data)
+
+    def test_rejects_bad_data(self):
+        """Test garbage and short hashes are refused"""
+        with self.assertRaises(ValueError):
+            Trajectory.from_bytes(b"not a recording" * 10)
+        with self.assertRaises(ValueError):
+            TrajectoryRecorder("abc")
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)